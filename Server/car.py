@@ -3,6 +3,7 @@ from ultrasonic import Ultrasonic
 from motor import tankMotor
 from servo import Servo
 from infrared import Infrared
+import math
 import time
 
 # Define the Car class to manage all components and functionalities
@@ -50,6 +51,24 @@ class Car:
         self.motor = None
         self.infrared = None
 
+    def turn_by(self, angle, duty=1500, timeout=3.0):
+        # Rotate in place by angle (radians, positive = left) using the odometry heading.
+        # Returns False without moving if the calibration gives no speed at this duty.
+        if self.motor.odometry.speed('left', duty) <= 0 or self.motor.odometry.speed('right', duty) <= 0:
+            print(f"turn_by: odometry has no speed for duty {duty}, recalibrate (python odometry.py)")
+            return False
+        start = self.motor.odometry.get_pose()[2]
+        direction = 1 if angle > 0 else -1
+        self.motor.setMotorModel(-direction * duty, direction * duty)
+        deadline = time.monotonic() + timeout
+        while abs(self.motor.odometry.get_pose()[2] - start) < abs(angle):
+            if time.monotonic() >= deadline:
+                print(f"turn_by: timed out after {timeout}s")
+                break
+            time.sleep(0.01)
+        self.motor.setMotorModel(0, 0)
+        return True
+
     def mode_ultrasonic(self):
         # Get distance from ultrasonic sensor
         distance = self.sonic.get_distance()
@@ -61,8 +80,10 @@ class Car:
             if distance < 45:
                 self.motor.setMotorModel(-1500, -1500)
                 time.sleep(0.4)
-                self.motor.setMotorModel(-1500, 1500)
-                time.sleep(0.2)
+                if not self.turn_by(math.radians(30)):
+                    # No usable calibration: fall back to the timed turn
+                    self.motor.setMotorModel(-1500, 1500)
+                    time.sleep(0.2)
             # Otherwise, move forward
             else:
                 self.motor.setMotorModel(1500, 1500)
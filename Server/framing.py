@@ -0,0 +1,172 @@
+# Command framing for the command server (port 5003)
+#
+# Two framings can be mixed on one connection:
+#   text:   CMD_MOTOR#2000#2000\n         (the original protocol, '#' separated, '\n' or '\r\n' terminated)
+#   binary: 0xFE | u16 length | u8 command id | int16 parameters...   (little-endian, length = bytes after the header)
+# Text commands always start with a letter, so the 0xFE marker byte tells the two apart.
+import struct
+
+# Binary command ids (see command.py for the names)
+COMMAND_IDS = {
+    "CMD_MOTOR": 1,
+    "CMD_LED": 2,
+    "CMD_SERVO": 3,
+    "CMD_ACTION": 4,
+    "CMD_SONIC": 5,
+    "CMD_MODE": 6,
+}
+COMMAND_NAMES = {value: key for key, value in COMMAND_IDS.items()}
+
+BINARY_MARKER = 0xFE
+BINARY_HEADER = struct.Struct('<BH')  # Marker, payload length
+TEXT_PREFIX = "CMD_"                  # Every text command name starts with this
+
+class ParsedCommand:
+    # One decoded command: name and integer parameters, like MessageParser.commandString / intParameter
+    __slots__ = ('name', 'params')
+
+    def __init__(self, name, params):
+        self.name = name
+        self.params = params
+
+    @property
+    def text(self):
+        # The command in text framing, without the line terminator
+        return "#".join([self.name] + [str(p) for p in self.params])
+
+    def __iter__(self):
+        # Allows: name, params = command
+        return iter((self.name, self.params))
+
+    def __repr__(self):
+        return f"ParsedCommand({self.name!r}, {self.params!r})"
+
+def parse_text(line):
+    # Parse 'CMD_X#a#b#' into a ParsedCommand (parameters rounded to int as in MessageParser)
+    fields = line.strip().split("#")
+    if not fields[0].startswith(TEXT_PREFIX):
+        raise ValueError(f"not a command: {fields[0]!r}")
+    return ParsedCommand(fields[0], [round(float(x)) for x in fields[1:] if x != ""])
+
+def encode_binary(name, params):
+    # Encode a command in binary framing (for clients)
+    payload = struct.pack(f'<B{len(params)}h', COMMAND_IDS[name], *params)
+    return BINARY_HEADER.pack(BINARY_MARKER, len(payload)) + payload
+
+class CommandDecoder:
+    # Per-connection decoder: receives into one reusable buffer, keeps partial
+    # messages until the rest arrives and returns complete commands only.
+    def __init__(self, buffer_size=4096, max_message=1024):
+        self.buffer = bytearray(buffer_size)
+        self.view = memoryview(self.buffer)
+        self.start = 0             # First unparsed byte
+        self.end = 0               # End of received data
+        self.max_message = max_message
+        self.errors = 0            # Messages dropped as malformed
+        self.discarding = False    # Dropping the rest of an oversized text line up to its '\n'
+        self.resyncing = False     # Skipping a broken binary frame up to the next marker or 'CMD_'
+
+    def recv_from(self, sock):
+        # Read what the socket has and return (bytes read, [ParsedCommand, ...]); 0 bytes = closed
+        if self.end == len(self.buffer):
+            self._compact()
+        count = sock.recv_into(self.view[self.end:])
+        self.end += count
+        return count, self._parse()
+
+    def feed(self, data):
+        # Same as recv_from for data that was already read
+        commands = []
+        data = memoryview(data)
+        while len(data):
+            if self.end == len(self.buffer):
+                self._compact()
+            count = min(len(data), len(self.buffer) - self.end)
+            self.buffer[self.end:self.end + count] = data[:count]
+            self.end += count
+            data = data[count:]
+            commands.extend(self._parse())
+        return commands
+
+    def _compact(self):
+        # Move the partial message to the front of the buffer
+        pending = self.end - self.start
+        if self.start == 0:
+            # A single message filled the whole buffer: it can never complete
+            self.errors += 1
+            print(f"Dropping oversized message ({pending} bytes)")
+            if self.buffer[0] != BINARY_MARKER:
+                self.discarding = True                             # Its tail is still on the way
+            self.start = self.end = 0
+            return
+        self.buffer[:pending] = self.buffer[self.start:self.end]
+        self.start, self.end = 0, pending
+
+    def _parse(self):
+        commands = []
+        buffer = self.buffer
+        while self.start < self.end:
+            if self.discarding:
+                newline = buffer.find(b'\n', self.start, self.end)
+                if newline < 0:
+                    self.start = self.end                          # Still inside the dropped line
+                    break
+                self.start = newline + 1
+                self.discarding = False
+                continue
+            if self.resyncing:
+                found = [i for i in (buffer.find(BINARY_MARKER, self.start, self.end),
+                                     buffer.find(TEXT_PREFIX.encode(), self.start, self.end)) if i >= 0]
+                if not found:
+                    self.start = max(self.start, self.end - len(TEXT_PREFIX) + 1)  # May be a split 'CMD_'
+                    break
+                self.start = min(found)
+                self.resyncing = False
+                continue
+            if buffer[self.start] == BINARY_MARKER:
+                if self.end - self.start < BINARY_HEADER.size:
+                    break                                          # Header incomplete
+                _, length = BINARY_HEADER.unpack_from(buffer, self.start)
+                frame_end = self.start + BINARY_HEADER.size + length
+                if length < 1 or length > self.max_message or length % 2 == 0:
+                    self.errors += 1                               # Not id + int16s: skip to the next
+                    self.start += 1                                # marker or text command
+                    self.resyncing = True
+                    continue
+                if frame_end > self.end:
+                    break                                          # Payload incomplete
+                values = struct.unpack_from(f'<B{(length - 1) // 2}h', buffer, self.start + BINARY_HEADER.size)
+                self.start = frame_end
+                name = COMMAND_NAMES.get(values[0])
+                if name is None:
+                    self.errors += 1
+                    continue
+                commands.append(ParsedCommand(name, list(values[1:])))
+            else:
+                newline = buffer.find(b'\n', self.start, self.end)
+                if newline < 0:
+                    if self.end - self.start > self.max_message:
+                        self.errors += 1                           # No terminator in sight: drop it,
+                        self.start = self.end                      # and whatever follows up to the '\n'
+                        self.discarding = True
+                    break                                          # Line incomplete
+                line = bytes(buffer[self.start:newline]).decode('utf-8', 'replace')
+                self.start = newline + 1
+                if not line.strip():
+                    continue
+                try:
+                    commands.append(parse_text(line))
+                except (ValueError, OverflowError):                # e.g. 'x' or 'inf' as a parameter
+                    self.errors += 1
+                    print(f"Error: Invalid command or parameter. msg:{line}")
+        if self.start == self.end:
+            self.start = self.end = 0                              # Buffer empty: start over at the front
+        return commands
+
+# Main program logic follows:
+if __name__ == '__main__':
+    decoder = CommandDecoder()
+    stream = b"CMD_MOTOR#2000#2000\nCMD_LE" + b"D#1#255#0#0#15#\r\n" + encode_binary("CMD_SERVO", [0, 90])
+    for i in range(0, len(stream), 5):                             # Feed in small pieces like TCP segments
+        for command in decoder.feed(stream[i:i + 5]):
+            print(command, command.text)
@@ -1,5 +1,4 @@
 import sys                                             # Import the sys module for system operations
-import struct                                          # Import the struct module for packing and unpacking binary data
 import time                                            # Import the time module for timing functions
 import signal                                          # Import the signal module for handling signals
 from PyQt5.QtWidgets import QMainWindow, QApplication  # Import QMainWindow and QApplication from PyQt5.QtWidgets
@@ -9,7 +8,7 @@ from server_ui import Ui_server_ui                     # Import the UI class fro
 from server import TankServer                           # Import the TankServer class from the server module
 import threading                                       # Import the threading module for creating threads
 import multiprocessing                                 # Import the multiprocessing module for creating processes
-from message import MessageParser                      # Import the MessageParser class from the message module
+import queue                                           # Import the queue module for queue.Empty
 from command import Command                             # Import the Command class from the command module
 from led import Led                                    # Import the Led class from the led module
 from camera import Camera                              # Import the Camera class from the camera module
@@ -38,10 +37,15 @@ class mywindow(QMainWindow, Ui_server_ui):
         self.led = Led()                               # Initialize the LED object
         self.car = Car()                               # Initialize the car object
         self.camera = Camera(stream_size=(400, 300))   # Initialize the camera with a stream size of 400x300
-        self.queue_cmd = multiprocessing.Queue()       # Create a queue for commands
-        self.cmd_parser = MessageParser()              # Initialize the command parser
-        self.queue_led = multiprocessing.Queue()       # Create a queue for LED commands
-        self.led_parser = MessageParser()              # Initialize the LED parser
+        self.queue_led = multiprocessing.Queue()       # Create a queue for LED commands (parameter lists for the LED process)
+        self.cmd_handlers = {                          # Command handlers, keyed by command string
+            self.command.CMD_LED: self.handle_cmd_led,
+            self.command.CMD_SONIC: self.handle_cmd_sonic,
+            self.command.CMD_SERVO: self.handle_cmd_servo,
+            self.command.CMD_MOTOR: self.handle_cmd_motor,
+            self.command.CMD_MODE: self.handle_cmd_mode,
+            self.command.CMD_ACTION: self.handle_cmd_action,
+        }
 
         self.cmd_thread = None                         # Initialize the command thread
         self.video_thread = None                       # Initialize the video thread
@@ -100,65 +104,67 @@ class mywindow(QMainWindow, Ui_server_ui):
                     self.cmd_thread = None             # Set the command thread to None
 
     def threading_cmd_receive(self):
+        cmd_queue = self.tcp_server.readDataFromCmdServer()              # Parsed commands from the command server
         while self.cmd_thread_is_running:
-            cmd_queue = self.tcp_server.readDataFromCmdServer()  # Read data from the command server
-            if cmd_queue.qsize() > 0:
-                client_address, all_message = cmd_queue.get()    # Get the client address and message from the queue
-                main_message = all_message.strip()               # Strip any leading/trailing whitespace from the message
-                if "\n" in main_message:
-                    for msg in main_message.split("\n"):
-                        self.queue_cmd.put(msg)                  # Put each message into the command queue
-                else:
-                    self.queue_cmd.put(main_message)             # Put the message into the command queue
-            while not self.queue_cmd.empty():
-                msg = self.queue_cmd.get()                       # Get a message from the command queue
-                self.cmd_parser.clearParameters()                # Clear the parameters in the command parser
-                self.cmd_parser.parser(msg)                      # Parse the message
-                # print(self.cmd_parser.stringParameter)         # Print the parsed string parameters (commented out)
-                if self.cmd_parser.commandString == self.command.CMD_LED:
-                    self.queue_led.put(msg)                      # Put LED commands into the LED queue
-                else:
-                    if self.cmd_parser.commandString == self.command.CMD_SONIC:
-                        pass                                                        # Placeholder for sonic commands
-                    elif self.cmd_parser.commandString == self.command.CMD_SERVO:
-                        if self.car_mode == 1 or self.car_mode == 2:   
-                            servo_index = int(self.cmd_parser.intParameter[0])      # Get the servo index
-                            servo_angle = int(self.cmd_parser.intParameter[1])      # Get the servo angle
-                            self.car.servo.setServoAngle(servo_index, servo_angle)  # Set the servo angle
-                        else:
-                            print("You can control the servo only in Move mode and Sonar mode")      # Print a message if the mode is not correct
-                    elif self.cmd_parser.commandString == self.command.CMD_MOTOR:
-                        self.left_wheel_speed = int(self.cmd_parser.intParameter[0])                 # Get the left wheel speed
-                        self.right_wheel_speed = int(self.cmd_parser.intParameter[1])                # Get the right wheel speed
-                        self.car.motor.setMotorModel(self.left_wheel_speed, self.right_wheel_speed)  # Set the motor model
-                    elif self.cmd_parser.commandString == self.command.CMD_MODE:
-                        if self.car.infrared_run_stop == False:   
-                            self.car.infrared_run_stop = True       # Set the infrared run stop state
-                            time.sleep(0.1)                         # Sleep for 0.1 seconds
-                        if self.cmd_parser.intParameter[0] == 0:
-                            self.car_mode = 1                       # Set the car mode to 1
-                            self.left_wheel_speed = 0               # Set the left wheel speed to 0
-                            self.right_wheel_speed = 0              # Set the right wheel speed to 0
-                            self.car.motor.setMotorModel(self.left_wheel_speed, self.right_wheel_speed)  # Set the motor model
-                        elif self.cmd_parser.intParameter[0] == 1:
-                            self.car_mode = 2                       # Set the car mode to 2
-                        elif self.cmd_parser.intParameter[0] == 2:
-                            self.car_mode = 3                       # Set the car mode to 3
-                            self.car.infrared_run_stop = False      # Set the infrared run stop state to False
-                        self.car_last_mode = self.car_mode          # Update the last car mode
-                    elif self.cmd_parser.commandString == self.command.CMD_ACTION:
-                        if self.car.infrared_run_stop == False:
-                            self.car.infrared_run_stop = True       # Set the infrared run stop state
-                            time.sleep(0.1)                         # Sleep for 0.1 seconds
-                        if self.cmd_parser.intParameter[0] == 0:
-                            self.car_mode = 4                       # Set the car mode to 4
-                        elif self.cmd_parser.intParameter[0] == 1:
-                            self.car_mode = 5                       # Set the car mode to 5
-                        elif self.cmd_parser.intParameter[0] == 2:
-                            self.car_mode = 6                       # Set the car mode to 6
-            if self.queue_cmd.empty():
-                time.sleep(0.001)                                   # Sleep for 0.001 seconds if the command queue is empty
-      
+            try:
+                client_address, command = cmd_queue.get(timeout=0.2)   # Block until a command arrives (wake up to check for shutdown)
+            except queue.Empty:
+                continue
+            handler = self.cmd_handlers.get(command.name)              # Look up the handler for this command
+            if handler is None:
+                print(f"Unknown command: {command.text}")
+                continue
+            try:
+                handler(command.params)                                # Run the handler with the already parsed parameters
+            except IndexError:
+                print(f"Missing parameters: {command.text}")
+
+    def handle_cmd_led(self, params):
+        self.queue_led.put(params)                                     # Hand LED commands to the LED process
+
+    def handle_cmd_sonic(self, params):
+        pass                                                           # Placeholder for sonic commands
+
+    def handle_cmd_servo(self, params):
+        if self.car_mode == 1 or self.car_mode == 2:
+            servo_index = int(params[0])                               # Get the servo index
+            servo_angle = int(params[1])                               # Get the servo angle
+            self.car.servo.setServoAngle(servo_index, servo_angle)     # Set the servo angle
+        else:
+            print("You can control the servo only in Move mode and Sonar mode")  # Print a message if the mode is not correct
+
+    def handle_cmd_motor(self, params):
+        self.left_wheel_speed = int(params[0])                         # Get the left wheel speed
+        self.right_wheel_speed = int(params[1])                        # Get the right wheel speed
+        self.car.motor.setMotorModel(self.left_wheel_speed, self.right_wheel_speed)  # Set the motor model
+
+    def handle_cmd_mode(self, params):
+        if self.car.infrared_run_stop == False:
+            self.car.infrared_run_stop = True                          # Set the infrared run stop state
+            time.sleep(0.1)                                            # Sleep for 0.1 seconds
+        if params[0] == 0:
+            self.car_mode = 1                                          # Set the car mode to 1
+            self.left_wheel_speed = 0                                  # Set the left wheel speed to 0
+            self.right_wheel_speed = 0                                 # Set the right wheel speed to 0
+            self.car.motor.setMotorModel(self.left_wheel_speed, self.right_wheel_speed)  # Set the motor model
+        elif params[0] == 1:
+            self.car_mode = 2                                          # Set the car mode to 2
+        elif params[0] == 2:
+            self.car_mode = 3                                          # Set the car mode to 3
+            self.car.infrared_run_stop = False                         # Set the infrared run stop state to False
+        self.car_last_mode = self.car_mode                             # Update the last car mode
+
+    def handle_cmd_action(self, params):
+        if self.car.infrared_run_stop == False:
+            self.car.infrared_run_stop = True                          # Set the infrared run stop state
+            time.sleep(0.1)                                            # Sleep for 0.1 seconds
+        if params[0] == 0:
+            self.car_mode = 4                                          # Set the car mode to 4
+        elif params[0] == 1:
+            self.car_mode = 5                                          # Set the car mode to 5
+        elif params[0] == 2:
+            self.car_mode = 6                                          # Set the car mode to 6
+
     def set_threading_car_task(self, state, close_time=0.3):
         if self.car_thread is None: 
             buf_state = False                         # Check if the car thread is None
@@ -242,16 +248,15 @@ class mywindow(QMainWindow, Ui_server_ui):
         while self.video_thread_is_running:                               # Keep running as long as the video thread is active
             if self.tcp_server.isVideoServerConnected():                  # Check if the video server is connected
                 self.camera.start_stream()                                # Start the camera stream
-                while self.tcp_server.isVideoServerConnected():           # Keep sending frames as long as the video server is connected
+                while self.video_thread_is_running and self.tcp_server.isVideoServerConnected():  # Keep sending frames as long as the video server is connected
                     frame = self.camera.get_frame()                       # Get a frame from the camera
-                    lenFrame = len(frame)                                 # Get the length of the frame
-                    lengthBin = struct.pack('<I', lenFrame)               # Pack the length into a binary format
                     try:
-                        self.tcp_server.sendDataToVideoClient(lengthBin)  # Send the frame length to the video client
-                        self.tcp_server.sendDataToVideoClient(frame)      # Send the frame data to the video client
-                    except:                                               # If an error occurs during sending
-                        break                                             # Break out of the loop
+                        self.tcp_server.sendFrameToVideoClient(frame)     # Hand the frame to the per-client senders (never blocks)
+                    except Exception as e:                                # Log and carry on with the next frame
+                        print(f"Video send error: {e}")
                 self.camera.stop_stream()                                 # Stop the camera stream when done
+            else:
+                time.sleep(0.1)                                           # Wait for a video client to connect
 
     def set_process_led_running(self, state, close_time=0.3):         # Method to start or stop the LED control process
         if self.led_process is None:                                  # Check if the LED process is not initialized
@@ -278,10 +283,7 @@ class mywindow(QMainWindow, Ui_server_ui):
         try:
             while self.led_process_is_running:                     # Keep running as long as the LED process is active
                 if not queue_led.empty():                          # If there are commands in the queue
-                    queue_buf_cmd = queue_led.get()                # Get the command from the queue
-                    self.led_parser.clearParameters()              # Clear the current parameters
-                    self.led_parser.parser(queue_buf_cmd)          # Parse the command
-                    led_parameters = self.led_parser.intParameter  # Update the LED parameters
+                    led_parameters = queue_led.get()               # Get the parsed LED parameters from the queue
                 while queue_led.empty():                           # While there are no commands in the queue
                     if led_parameters[0] == 1:                     # If the command is to control a specific LED
                         self.led.ledIndex(led_parameters[4], led_parameters[1], led_parameters[2], led_parameters[3])  # Control the specified LED
@@ -300,6 +302,7 @@ class mywindow(QMainWindow, Ui_server_ui):
                         self.led.rainbowCycle()                    # Perform the rainbow cycle
                     else:                                          # If the command is unknown or invalid
                         self.led.colorWipe((0, 0, 0), 10)          # Turn off all LEDs
+                        led_parameters = queue_led.get()           # Nothing to animate: block until the next command
                         break                                      # Exit the loop
         except KeyboardInterrupt:                                  # If a keyboard interrupt is detected
             print("LED process interrupted, cleaning up...")       # Print a cleanup message
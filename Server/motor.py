@@ -1,5 +1,6 @@
 # Import the Motor class from the gpiozero library
 from gpiozero import Motor
+from odometry import Odometry
 
 # Define the tankMotor class to control the motors of a tank-like robot
 class tankMotor:
@@ -7,6 +8,7 @@ class tankMotor:
         """Initialize the tankMotor class with GPIO pins for the left and right motors."""
         self.left_motor = Motor(24, 23)  # Initialize the left motor with GPIO pins 23 and 24
         self.right_motor = Motor(5, 6)   # Initialize the right motor with GPIO pins 6 and 5
+        self.odometry = Odometry()       # Dead-reckoned pose from the commanded duty
 
     def duty_range(self, duty1, duty2):
         """Ensure the duty cycle values are within the valid range (-4095 to 4095)."""
@@ -45,6 +47,7 @@ class tankMotor:
         duty1, duty2 = self.duty_range(duty1, duty2)  # Clamp the duty cycle values
         self.left_Wheel(duty1)   # Control the left wheel
         self.right_Wheel(duty2)  # Control the right wheel
+        self.odometry.update(duty1, duty2)  # Integrate the pose with the new duty
     
     def close(self):
         """Close the motors to release resources."""
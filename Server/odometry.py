@@ -0,0 +1,163 @@
+# Import necessary modules
+import json
+import math
+import os
+import threading
+import time
+from collections import deque
+
+class Odometry:
+    # Calibration file: duty -> ground speed (m/s) table per track
+    CALIBRATION_FILE = 'odometry.json'
+    # Distance between the track centres in metres
+    TRACK_WIDTH = 0.16
+    # Default ground speed at full duty (4095) in m/s
+    MAX_SPEED = 0.3
+
+    def __init__(self, history=256):
+        # Dead-reckoned pose: x, y in metres, theta in radians (counter-clockwise)
+        self.x = 0.0
+        self.y = 0.0
+        self.theta = 0.0
+        self.distance = 0.0           # Total path length in metres
+        self.duty = (0, 0)            # Duty in effect since self.timestamp
+        self.timestamp = None
+        self.history = deque(maxlen=history)  # (time, x, y, theta) at each duty change
+        self.lock = threading.Lock()
+        # Default table is linear with a stall deadband; replaced by the calibration file
+        default = [[0, 0.0], [600, 0.0], [4095, self.MAX_SPEED]]
+        self.table = {'left': default, 'right': default}
+        self.load_calibration()
+
+    def load_calibration(self, file_path=None):
+        # Load the duty -> speed table if a calibration has been saved
+        file_path = file_path or self.CALIBRATION_FILE
+        if not os.path.exists(file_path):
+            return False
+        try:
+            with open(file_path, 'r') as file:
+                table = json.load(file)
+            self.table = {'left': sorted(table['left']), 'right': sorted(table['right'])}
+            return True
+        except Exception as e:
+            print(f"Error reading odometry calibration: {e}")
+            return False
+
+    def save_calibration(self, file_path=None):
+        # Write the duty -> speed table
+        with open(file_path or self.CALIBRATION_FILE, 'w') as file:
+            json.dump(self.table, file, indent=4)
+
+    def speed(self, track, duty):
+        # Interpolate the ground speed (m/s) of one track; negative duty mirrors the table
+        points = self.table[track]
+        magnitude = abs(duty)
+        speed = points[-1][1]
+        for (d0, s0), (d1, s1) in zip(points, points[1:]):
+            if magnitude <= d1:
+                speed = s0 + (s1 - s0) * (magnitude - d0) / (d1 - d0) if d1 > d0 else s1
+                break
+        return math.copysign(speed, duty)
+
+    def _integrate(self, now):
+        # Advance the pose along the arc driven with the current duty
+        if self.timestamp is None or now <= self.timestamp:
+            return
+        dt = now - self.timestamp
+        left = self.speed('left', self.duty[0])
+        right = self.speed('right', self.duty[1])
+        v = (left + right) / 2                 # Linear speed
+        w = (right - left) / self.TRACK_WIDTH  # Turn rate
+        if abs(w) < 1e-6:
+            self.x += v * dt * math.cos(self.theta)
+            self.y += v * dt * math.sin(self.theta)
+        else:
+            theta = self.theta + w * dt
+            self.x += v / w * (math.sin(theta) - math.sin(self.theta))
+            self.y -= v / w * (math.cos(theta) - math.cos(self.theta))
+            self.theta = theta
+        self.distance += abs(v) * dt
+
+    def update(self, duty1, duty2, now=None):
+        # Called with every new motor duty (see tankMotor.setMotorModel)
+        now = now if now is not None else time.monotonic()
+        with self.lock:
+            self._integrate(now)
+            self.duty = (duty1, duty2)
+            self.timestamp = now
+            self.history.append((now, self.x, self.y, self.theta))
+
+    def get_pose(self):
+        # Current pose (x, y, theta), including the time spent on the current duty
+        with self.lock:
+            saved = (self.x, self.y, self.theta, self.distance, self.timestamp)
+            self._integrate(time.monotonic())
+            pose = (self.x, self.y, self.theta)
+            self.x, self.y, self.theta, self.distance, self.timestamp = saved
+        return pose
+
+    def reset(self):
+        # Make the current position the origin
+        with self.lock:
+            self.x = self.y = self.theta = 0.0
+            self.distance = 0.0
+            if self.timestamp is not None:
+                self.timestamp = time.monotonic()
+            self.history.clear()
+
+    def calibrate(self, motor, sonic, duties=(1000, 1500, 2000, 2500, 3000, 4095), duration=0.6, spin_up=0.5):
+        # Drive straight at a wall at each duty and measure speed from the ultrasonic distance.
+        # Needs about a metre of free space; both tracks get the same table.
+        # Returns False, keeping the current table, if fewer than two duties gave a speed.
+        points = [[0, 0.0]]
+        for duty in duties:
+            time.sleep(0.5)
+            motor.setMotorModel(duty, duty)
+            started = time.monotonic()
+            time.sleep(spin_up)                    # Let the tracks reach speed before measuring
+            before, before_time = self._timed_distance(sonic)
+            time.sleep(duration)
+            after, after_time = self._timed_distance(sonic)
+            motor.setMotorModel(0, 0)
+            driven = time.monotonic() - started
+            if before and after and after_time > before_time:
+                speed = (before - after) / 100 / (after_time - before_time)
+                print(f"Duty {duty}: {speed:.3f} m/s")
+                if speed > 0:
+                    points.append([duty, round(speed, 4)])
+            else:
+                print(f"Duty {duty}: no ultrasonic reading, skipped")
+            time.sleep(0.5)
+            motor.setMotorModel(-duty, -duty)      # Back to the start position
+            time.sleep(driven)
+            motor.setMotorModel(0, 0)
+        if len(points) < 3:
+            print("Calibration failed: fewer than two speeds measured, keeping the previous table")
+            return False
+        self.table = {'left': points, 'right': list(points)}
+        self.save_calibration()
+        return True
+
+    @staticmethod
+    def _timed_distance(sonic):
+        # Ultrasonic distance (cm) and the time halfway through the measurement
+        start = time.monotonic()
+        distance = sonic.get_distance()
+        return distance, (start + time.monotonic()) / 2
+
+# Main program logic follows:
+if __name__ == '__main__':
+    # Calibrate with the robot facing a wall about a metre away
+    from motor import tankMotor
+    from ultrasonic import Ultrasonic
+    print('Program is starting ... \n')
+    motor = tankMotor()
+    sonic = Ultrasonic()
+    try:
+        if motor.odometry.calibrate(motor, sonic):
+            print(motor.odometry.table)
+    except KeyboardInterrupt:
+        motor.setMotorModel(0, 0)
+    finally:
+        motor.close()
+        sonic.close()
@@ -2,13 +2,16 @@ import socket  # Import the socket module
 import fcntl  # Import the fcntl module
 import struct  # Import the struct module
 from tcp_server import TCPServer  # Import the TCPServer class from tcp_server module
+from framing import CommandDecoder  # Import the command framing decoder
+from video_sender import VideoSender  # Import the latest-frame-wins video sender
 
 class TankServer:
     def __init__(self):
         # Initialize the TankServer instance
         self.ip = self.get_interface_ip()  # Get the IP address of the network interface
-        self.cmdServer = TCPServer()  # Initialize the command server
-        self.videoServer = TCPServer()  # Initialize the video server
+        self.cmdServer = TCPServer(CommandDecoder)  # Initialize the command server (framed, queues parsed commands)
+        self.videoServer = TCPServer(send_buffer_size=64 * 1024)  # Initialize the video server (small kernel buffer keeps latency low)
+        self.videoSender = VideoSender(self.videoServer)  # Per-client video mailboxes on top of the video server
         self.cmdServerIsBusy = False  # Flag to indicate whether the command server is busy
         self.videoServerIsBusy = False  # Flag to indicate whether the video server is busy
 
@@ -61,6 +64,14 @@ class TankServer:
             self.videoServer.send_to_all_client(data)  # Send data to all connected clients of the video server
         self.set_video_server_busy(False)
 
+    def sendFrameToVideoClient(self, frame):
+        # Offer a JPEG frame to all video clients; slow clients skip frames instead of falling behind
+        self.videoSender.publish(frame)
+
+    def getVideoClientStats(self):
+        # Per-client video fps, bytes and dropped frames
+        return self.videoSender.get_stats()
+
     def readDataFromCmdServer(self):
         # Read data from the command server's message queue
         return self.cmdServer.message_queue
@@ -100,9 +111,9 @@ if __name__ == "__main__":
         while True:
             cmdQueue = server.readDataFromCmdServer()  # Get the command server's message queue
             if cmdQueue.qsize() > 0:  # Check if there are messages in the queue
-                client_address, message = cmdQueue.get()  # Get a message from the queue
-                print(client_address, message)  # Print the client address and message
-                server.cmdServer.send_to_client(client_address, message)  # Send the message back to the client
+                client_address, command = cmdQueue.get()  # Get a parsed command from the queue
+                print(client_address, command)  # Print the client address and command
+                server.cmdServer.send_to_client(client_address, command.text + "\n")  # Send the command back to the client
 
             videoQueue = server.readDataFromVideoServer()  # Get the video server's message queue
             if videoQueue.qsize() > 0:  # Check if there are messages in the queue
@@ -1,29 +1,71 @@
 import socket
-import select
+import selectors
 import threading
 import fcntl
+import itertools
 import struct
 import queue
+import time
+from collections import deque
+
+class ClientConnection:
+    # State of one connected client: socket, framing decoder and the outbound buffer
+    def __init__(self, sock, address, decoder=None):
+        self.sock = sock
+        self.address = address
+        self.decoder = decoder
+        self.outbound = deque()       # memoryviews waiting for the socket to become writable
+        self.pending = 0              # Bytes in outbound
+        self.lock = threading.Lock()  # Senders run on other threads than the event loop
+        self.closed = False
+        self.throttled = False        # Over the high watermark and not yet drained to the low one
+        self.throttled_since = None   # Time throttling started, None when not throttled
+        self.sent_bytes = 0
+        self.dropped = 0              # Messages refused because the client was over the high watermark
 
 class TCPServer:
-    def __init__(self):
+    # Single-threaded selectors event loop (epoll on Linux) for accepting, reading and
+    # flushing. Senders on other threads never block: data goes straight to the socket
+    # if it takes it, the rest is buffered per client and flushed when the socket is
+    # writable. A client whose buffer reaches high_watermark is throttled: further
+    # messages are refused (send_* return False) until it drains to low_watermark,
+    # and it is disconnected if it stays throttled for slow_client_timeout seconds.
+    def __init__(self, decoder=None, high_watermark=512 * 1024, low_watermark=64 * 1024, slow_client_timeout=5.0,
+                 send_buffer_size=None):
         # Initialize server and client sockets
         self.server_socket = None
-        self.client_sockets = {}
+        self.client_sockets = {}       # socket -> address
+        self.clients = {}              # socket -> ClientConnection
+        # Optional framing (e.g. framing.CommandDecoder): one decoder per client,
+        # message_queue then gets complete parsed commands instead of raw text chunks
+        self.decoder = decoder
         # Message queue for incoming messages
         self.message_queue = queue.Queue()
+        # Outbound buffer limits per client
+        self.high_watermark = high_watermark
+        self.low_watermark = low_watermark
+        self.slow_client_timeout = slow_client_timeout
+        # Kernel send buffer per client (SO_SNDBUF), None for the system default;
+        # small values keep latency-sensitive streams from queueing in the kernel
+        self.send_buffer_size = send_buffer_size
+        # Called as on_drained(client) from the event loop when a client's buffer empties
+        self.on_drained = None
         # Maximum number of clients allowed
         self.max_clients = 1
         # Current number of active connections
         self.active_connections = 0
-        # Thread for accepting new connections
+        # Thread running the event loop
         self.accept_thread = None
         # Event to signal the server to stop
         self.stop_event = threading.Event()
-        # Pipe for stopping the server
+        # Pipe for waking the event loop: b'\x00' stops it, b'\x01' means new data to flush
         self.stop_pipe_r, self.stop_pipe_w = socket.socketpair()
         self.stop_pipe_r.setblocking(0)
         self.stop_pipe_w.setblocking(0)
+        self.selector = selectors.DefaultSelector()
+        self.lock = threading.Lock()   # Guards the client dictionaries and the request sets
+        self._want_write = set()       # Clients with buffered data, registered for writing by the loop
+        self._want_close = set()       # Clients to close from the loop
 
     def start(self, ip, port, max_clients=1, listen_count=1):
         # Set the maximum number of clients
@@ -34,116 +76,279 @@ class TCPServer:
         self.server_socket.bind((ip, port))
         self.server_socket.listen(listen_count)
         self.server_socket.setblocking(0)
+        self.selector.register(self.server_socket, selectors.EVENT_READ)
+        self.selector.register(self.stop_pipe_r, selectors.EVENT_READ)
         print(f"Server started, listening on {ip}:{port}")
 
-        # Start the thread for accepting connections
+        # Start the event loop thread
         self.accept_thread = threading.Thread(target=self.accept_connections, daemon=True)
         self.accept_thread.start()
 
     def accept_connections(self):
-        # Accept new connections until the server is stopped
+        # Event loop: runs until the server is stopped
         while not self.stop_event.is_set():
-            # Use select to monitor the server socket and the stop pipe
-            readable, writable, exceptional = select.select([self.server_socket, self.stop_pipe_r] + list(self.client_sockets.keys()), [], [])
-            for s in readable:
-                if s == self.server_socket and self.active_connections < self.max_clients:
-                    # Accept a new connection if the maximum number of clients is not reached
-                    client_socket, client_address = s.accept()
-                    client_socket.setblocking(0)
-                    self.client_sockets[client_socket] = client_address
-                    self.active_connections += 1
-                    print(f"New connection from {client_address}, {self.active_connections} active connections.")
-                elif s == self.server_socket and self.active_connections >= self.max_clients:
-                    # Reject new connections if the maximum number of clients is reached
-                    client_socket, client_address = s.accept()
-                    client_socket.close()
-                    print(f"Rejected connection from {client_address}, max connections ({self.max_clients}) reached.")
-                elif s == self.stop_pipe_r:
-                    # Stop the server if the stop pipe is read
-                    self.stop_event.set()
-                    break
+            for key, events in self.selector.select(timeout=1.0):
+                s = key.fileobj
+                if s is self.server_socket:
+                    self._accept()
+                elif s is self.stop_pipe_r:
+                    self._handle_wakeup()
                 else:
-                    try:
-                        # Receive data from the client
-                        data = s.recv(1024)
-                        if data:
-                            client_address = self.client_sockets[s]
-                            self.message_queue.put((client_address, data.decode('utf-8')))
-                        else:
-                            # Remove the client if no data is received
-                            client_address = self.client_sockets[s]
-                            print(client_address, "disconnected")
-                            self.remove_client(s)
-                    except OSError as e:
-                        if e.errno == 9 or e.errno == 32:
-                            # Handle broken pipe errors
-                            client_address = self.client_sockets[s]
-                            print(client_address, "disconnected")
-                            self.remove_client(s)
-                        else:
-                            print(f"Unexpected error: {e}")
-            for s in exceptional:
-                # Handle exceptional conditions
-                client_address = self.client_sockets[s]
-                print(client_address, "disconnected")
-                self.remove_client(s)
+                    client = key.data
+                    if events & selectors.EVENT_READ and not client.closed:
+                        self._read(client)
+                    if events & selectors.EVENT_WRITE and not client.closed:
+                        self._flush(client)
+            self._drop_slow_clients()
         print("Closing accept_connections...")
 
+    def _accept(self):
+        try:
+            client_socket, client_address = self.server_socket.accept()
+        except BlockingIOError:
+            return
+        if self.active_connections >= self.max_clients:
+            # Reject new connections if the maximum number of clients is reached
+            client_socket.close()
+            print(f"Rejected connection from {client_address}, max connections ({self.max_clients}) reached.")
+            return
+        client_socket.setblocking(0)
+        if self.send_buffer_size:
+            client_socket.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, self.send_buffer_size)
+        client = ClientConnection(client_socket, client_address, self.decoder() if self.decoder is not None else None)
+        with self.lock:
+            self.clients[client_socket] = client
+            self.client_sockets[client_socket] = client_address
+            self.active_connections += 1
+        self.selector.register(client_socket, selectors.EVENT_READ, client)
+        print(f"New connection from {client_address}, {self.active_connections} active connections.")
+
+    def _handle_wakeup(self):
+        try:
+            data = self.stop_pipe_r.recv(4096)
+        except BlockingIOError:
+            data = b''
+        if b'\x00' in data:
+            # Stop the server if the stop pipe is read
+            self.stop_event.set()
+            return
+        with self.lock:
+            want_write, self._want_write = self._want_write, set()
+            want_close, self._want_close = self._want_close, set()
+        for client in want_close:
+            self._close_client(client)
+        for client in want_write:
+            if not client.closed:
+                self.selector.modify(client.sock, selectors.EVENT_READ | selectors.EVENT_WRITE, client)
+
+    def _read(self, client):
+        s = client.sock
+        try:
+            # Receive data from the client
+            if client.decoder is not None:
+                # Framed: only complete commands are queued, partial ones wait for more data
+                count, commands = client.decoder.recv_from(s)
+                for command in commands:
+                    self.message_queue.put((client.address, command))
+                data = count > 0
+            else:
+                data = s.recv(4096)
+                if data:
+                    self.message_queue.put((client.address, data.decode('utf-8', 'replace')))
+            if not data:
+                # Remove the client if no data is received
+                print(client.address, "disconnected")
+                self._close_client(client)
+        except BlockingIOError:
+            pass
+        except OSError as e:
+            print(client.address, "disconnected", f"({e})")
+            self._close_client(client)
+        except Exception as e:
+            # A decoder bug must only cost this client, not the event loop
+            print(f"Error reading from {client.address}: {e}")
+            self._close_client(client)
+
+    def _flush(self, client):
+        # Write as much buffered data as the socket takes, in one sendmsg per batch
+        failed = False
+        with client.lock:
+            while client.outbound:
+                try:
+                    sent = client.sock.sendmsg(list(itertools.islice(client.outbound, 64)))
+                except BlockingIOError:
+                    break
+                except OSError as e:
+                    print(f"Error sending data to {client.address}: {e}")
+                    failed = True
+                    break
+                self._consume(client, sent)
+            if client.throttled and client.pending <= self.low_watermark:
+                client.throttled = False
+                client.throttled_since = None
+            empty = not client.outbound
+        if failed:
+            self._close_client(client)
+        elif empty:
+            self.selector.modify(client.sock, selectors.EVENT_READ, client)
+            if self.on_drained is not None:
+                self.on_drained(client)
+
+    @staticmethod
+    def _consume(client, sent):
+        # Drop `sent` bytes from the front of the outbound buffer
+        client.sent_bytes += sent
+        client.pending -= sent
+        while sent:
+            head = client.outbound[0]
+            if sent >= len(head):
+                sent -= len(head)
+                client.outbound.popleft()
+            else:
+                client.outbound[0] = head[sent:]
+                sent = 0
+
+    def _drop_slow_clients(self):
+        now = time.monotonic()
+        for client in list(self.clients.values()):
+            since = client.throttled_since
+            if since is not None and now - since > self.slow_client_timeout:
+                print(f"Dropping slow client {client.address} ({client.pending} bytes unsent)")
+                self._close_client(client)
+
+    def _wake(self):
+        try:
+            self.stop_pipe_w.send(b'\x01')
+        except (BlockingIOError, OSError):
+            pass  # A wakeup is already pending, or the server is closed
+
+    def send_buffers(self, client, buffers):
+        # Queue buffers (bytes-like) to one client as a single message; never blocks.
+        # Returns False if the client is gone or over its high watermark.
+        with client.lock:
+            if client.closed:
+                return False
+            if client.throttled or client.pending >= self.high_watermark:
+                # Stays refused until _flush drains it to the low watermark
+                client.dropped += 1
+                if not client.throttled:
+                    client.throttled = True
+                    client.throttled_since = time.monotonic()
+                return False
+            total = sum(len(b) for b in buffers)
+            sent = 0
+            failed = False
+            if not client.outbound:
+                # Nothing queued: try the socket right away
+                try:
+                    sent = client.sock.sendmsg(buffers)
+                except BlockingIOError:
+                    sent = 0
+                except OSError as e:
+                    print(f"Error sending data to {client.address}: {e}")
+                    failed = True
+                client.sent_bytes += sent
+                if sent == total and not failed:
+                    return True
+            if not failed:
+                for buf in buffers:
+                    view = memoryview(buf).cast('B')
+                    if sent >= len(view):
+                        sent -= len(view)
+                        continue
+                    client.outbound.append(view[sent:])
+                    client.pending += len(view) - sent
+                    sent = 0
+                if client.pending >= self.high_watermark and not client.throttled:
+                    client.throttled = True
+                    client.throttled_since = time.monotonic()
+        if failed:
+            self.remove_client(client.sock)
+            return False
+        with self.lock:
+            self._want_write.add(client)
+        self._wake()
+        return True
+
     def stop_pipe(self):
         # Send a byte to the stop pipe to signal the server to stop
         self.stop_pipe_w.send(b'\x00')
 
+    def _encode(self, message):
+        # str, bytes-like, or a list/tuple of parts sent back to back as one message
+        if isinstance(message, str):
+            return [message.encode('utf-8')]
+        if isinstance(message, (list, tuple)):
+            return [part.encode('utf-8') if isinstance(part, str) else part for part in message]
+        return [message]
+
     def send_to_all_client(self, message):
         # Send a message to all connected clients
-        for client_socket in list(self.client_sockets.keys()):
-            try:
-                if isinstance(message, str):
-                    encoded_message = message.encode('utf-8')
-                else:
-                    encoded_message = message
-                client_socket.sendall(encoded_message)
-            except socket.error as e:
-                print(f"Error sending data to {self.client_sockets[client_socket]}: {e}")
-                self.remove_client(client_socket)
+        buffers = self._encode(message)
+        for client in list(self.clients.values()):
+            self.send_buffers(client, buffers)
 
     def send_to_client(self, client_address, message):
         # Send a message to a specific client
-        for client_socket, addr in self.client_sockets.items():
-            if addr == client_address:
-                try:
-                    if isinstance(message, str):
-                        encoded_message = message.encode('utf-8')
-                    else:
-                        encoded_message = message
-                    client_socket.sendall(encoded_message)
-                except socket.error as e:
-                    print(f"Error sending data to {client_address}: {e}")
-                    self.remove_client(client_socket)
-                return
+        for client in list(self.clients.values()):
+            if client.address == client_address:
+                return self.send_buffers(client, self._encode(message))
         print(f"Client at {client_address} not found.")
+        return False
 
-    def remove_client(self, client_socket):
-        # Remove a client from the server
-        if client_socket in self.client_sockets:
-            del self.client_sockets[client_socket]
-            client_socket.close()
+    def _close_client(self, client):
+        # Close a client from the event loop thread
+        with client.lock:
+            if client.closed:
+                return
+            client.closed = True
+            client.outbound.clear()
+            client.pending = 0
+        with self.lock:
+            self.clients.pop(client.sock, None)
+            self.client_sockets.pop(client.sock, None)
             self.active_connections -= 1
+            self._want_write.discard(client)
+        try:
+            self.selector.unregister(client.sock)
+        except (KeyError, ValueError):
+            pass
+        client.sock.close()
+
+    def remove_client(self, client_socket):
+        # Remove a client from the server (the event loop closes it)
+        client = self.clients.get(client_socket)
+        if client is None:
+            return
+        if threading.current_thread() is self.accept_thread:
+            self._close_client(client)
+        else:
+            with self.lock:
+                self._want_close.add(client)
+            self._wake()
 
     def close(self):
         # Close the server and all client connections
         self.stop_pipe()
         if self.accept_thread is not None:
             self.accept_thread.join()
+        for client in list(self.clients.values()):
+            self._close_client(client)
         if self.server_socket is not None:
+            self.selector.unregister(self.server_socket)
             self.server_socket.close()
-        for s in list(self.client_sockets):
-            s.close()
-        self.client_sockets.clear()
+        self.selector.close()
         print("Server stopped.")
 
     def get_client_ips(self):
         # Get a list of IP addresses of connected clients
-        return [addr[0] for addr in self.client_sockets.values()]
+        return [addr[0] for addr in list(self.client_sockets.values())]
+
+    def get_client_stats(self):
+        # Per-client outbound buffer state
+        return [{"address": c.address, "pending": c.pending, "sent_bytes": c.sent_bytes,
+                 "dropped": c.dropped, "throttled": c.throttled}
+                for c in list(self.clients.values())]
 
 def get_interface_ip():
     # Get the IP address of the specified network interface
@@ -159,11 +364,10 @@ if __name__ == "__main__":
     try:
         while True:
             # Process incoming messages
-            while not server.message_queue.empty():
-                client_address, message = server.message_queue.get()
-                print(f"Received message from {client_address}: {message}")
-                server.send_to_client(client_address, message)
+            client_address, message = server.message_queue.get()
+            print(f"Received message from {client_address}: {message}")
+            server.send_to_client(client_address, message)
     except KeyboardInterrupt:
         print("Server interrupted by user.")
     finally:
-        server.close()
\ No newline at end of file
+        server.close()
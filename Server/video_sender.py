@@ -0,0 +1,86 @@
+import struct
+import threading
+import time
+from collections import deque
+
+class ClientVideoSender:
+    # Video state of one client: a single-slot mailbox holding the newest frame
+    # that could not be sent yet, and per-client counters
+    def __init__(self, client):
+        self.client = client
+        self.mailbox = None            # (publish time, header, frame) or None
+        self.frames_sent = 0
+        self.bytes_sent = 0
+        self.frames_dropped = 0        # Replaced in the mailbox or refused by the server
+        self.max_wait = 0.0            # Longest time a frame waited in the mailbox (s)
+        self.send_times = deque(maxlen=30)
+
+    def fps(self):
+        if len(self.send_times) < 2:
+            return 0.0
+        return (len(self.send_times) - 1) / max(self.send_times[-1] - self.send_times[0], 1e-6)
+
+class VideoSender:
+    # Latest-frame-wins video fan-out on top of TCPServer. A client gets a new
+    # frame only once the previous one has fully left its buffer; frames that
+    # arrive meanwhile overwrite the mailbox, so a slow link sees a lower frame
+    # rate instead of a growing delay. Header and JPEG go out together with
+    # one sendmsg() (scatter-gather), without copying the frame.
+    def __init__(self, tcp_server):
+        self.tcp_server = tcp_server
+        self.senders = {}              # ClientConnection -> ClientVideoSender
+        self.lock = threading.Lock()
+        tcp_server.on_drained = self._on_drained
+
+    def _sender(self, client):
+        sender = self.senders.get(client)
+        if sender is None:
+            sender = self.senders[client] = ClientVideoSender(client)
+        return sender
+
+    def publish(self, frame):
+        # Offer a JPEG frame to every connected client (never blocks)
+        header = struct.pack('<I', len(frame))
+        now = time.monotonic()
+        clients = list(self.tcp_server.clients.values())
+        with self.lock:
+            for client in list(self.senders):
+                if client.closed:
+                    del self.senders[client]     # Forget disconnected clients
+            for client in clients:
+                sender = self._sender(client)
+                if sender.mailbox is not None:
+                    sender.frames_dropped += 1   # Never sent: replaced by a newer frame
+                sender.mailbox = (now, header, frame)
+        for client in clients:
+            self._try_send(client)
+
+    def _on_drained(self, client):
+        # Event loop: the previous frame is out, send the newest waiting one
+        self._try_send(client)
+
+    def _try_send(self, client):
+        with self.lock:
+            sender = self.senders.get(client)
+            if sender is None or sender.mailbox is None or client.pending:
+                return
+            published, header, frame = sender.mailbox
+            sender.mailbox = None
+        if not self.tcp_server.send_buffers(client, [header, frame]):
+            with self.lock:
+                sender.frames_dropped += 1
+            return
+        now = time.monotonic()
+        with self.lock:
+            sender.frames_sent += 1
+            sender.bytes_sent += len(header) + len(frame)
+            sender.max_wait = max(sender.max_wait, now - published)
+            sender.send_times.append(now)
+
+    def get_stats(self):
+        # Per-client frame rate, traffic and drops
+        with self.lock:
+            return [{"address": s.client.address, "fps": round(s.fps(), 1), "frames_sent": s.frames_sent,
+                     "bytes_sent": s.bytes_sent, "frames_dropped": s.frames_dropped,
+                     "max_wait_ms": round(s.max_wait * 1000, 1)}
+                    for s in self.senders.values() if not s.client.closed]
@@ -1,16 +1,101 @@
-from fastapi import APIRouter
+from typing import Optional
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect
 from fastapi.responses import StreamingResponse
+from app.core.config import settings
 from app.core.robot import robot
+from app.services.control_channel import ControlChannel
 
 router = APIRouter()
+control_channel = ControlChannel(robot.commands.submit)
 
 @router.get("/status")
 async def get_status():
     return {"status": "ok", "message": "Robot API is running"}
 
+@router.get("/startup")
+async def startup_timings():
+    # Per-subsystem init time in ms ("total" is the parallel startup wall time)
+    return robot.get_init_timings()
+
+@router.websocket("/control")
+async def control_socket(websocket: WebSocket):
+    # Binary joystick channel: packed (seq, x, y, flags) frames, see app.services.control_channel
+    await websocket.accept()
+
+    async def receive():
+        # Binary frames only; text frames are ignored
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(message.get("code", 1000))
+            if message.get("bytes") is not None:
+                return message["bytes"]
+
+    try:
+        await control_channel.serve(receive, websocket.send_bytes)
+    except WebSocketDisconnect:
+        pass
+
+@router.get("/control/stats")
+async def control_stats():
+    return {"sessions": control_channel.get_stats()}
+
+@router.get("/commands/stats")
+async def command_stats():
+    # Queue depth, coalesced/overflow drops and queueing delay per priority class
+    return robot.commands.get_stats()
+
+@router.get("/motion/stats")
+async def motion_stats():
+    # Control loop tick jitter, overruns and deadman watchdog trips
+    return robot.drive.get_stats()
+
+@router.get("/odometry")
+async def odometry():
+    # Dead-reckoned pose (m, degrees) and the recent pose history
+    history = robot.odometry.history()
+    return {"pose": robot.odometry.to_dict(), "history": history[-50:, 1:].round(3).tolist()}
+
+@router.post("/odometry/reset")
+async def odometry_reset():
+    robot.odometry.reset()
+    return robot.odometry.to_dict()
+
+@router.post("/odometry/calibrate")
+async def odometry_calibrate():
+    return await robot.calibrate_odometry()
+
+@router.get("/telemetry/stats")
+async def telemetry_stats():
+    # Flight recorder: records written, drops when the disk falls behind, current file
+    return robot.telemetry.get_stats() if robot.telemetry else {"enabled": False}
+
+@router.get("/sim")
+async def sim_stats():
+    # Ground-truth pose, distance and collisions of the simulated robot (SIMULATION=true)
+    if not settings.SIMULATION:
+        return {"simulation": False}
+    from app.sim.simulator import get_simulator
+    return get_simulator().get_stats()
+
+@router.get("/sensors/stats")
+async def sensor_stats():
+    # Ultrasonic sample rate, dropouts and out-of-range echoes per sensor
+    return {"ultrasonic": robot.ultrasonic.get_stats(), "infrared": robot.infrared.get_stats()}
+
+@router.get("/video/stats")
+async def video_stats():
+    # Per-viewer frame rate, drop counters and backpressure state
+    return {"clients": robot.camera_manager.get_stream_stats()}
+
+@router.get("/ai/stats")
+async def ai_stats():
+    # Inference counters: executed (full/ROI) vs skipped (static scene, superseded by budget)
+    return robot.ai_service.get_stats()
+
 @router.get("/video/{cam_type}")
-async def video_feed(cam_type: str):
+async def video_feed(cam_type: str, fps: Optional[float] = None, annotated: bool = False):
     return StreamingResponse(
-        robot.camera_manager.get_stream(cam_type), 
+        robot.camera_manager.stream(cam_type, fps, annotated),
         media_type="multipart/x-mixed-replace; boundary=frame"
     )
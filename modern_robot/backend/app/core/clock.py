@@ -0,0 +1,18 @@
+import time
+
+# Monotonic time source for everything that timestamps sensor data or motion
+# setpoints. It is time.monotonic on the robot; the simulation harness swaps in
+# a virtual clock so the control loops can run faster than real time.
+_source = time.monotonic
+
+def monotonic() -> float:
+    return _source()
+
+def use(source=None):
+    """Install `source()` as the time source (None restores time.monotonic)."""
+    global _source
+    _source = source or time.monotonic
+
+def is_virtual() -> bool:
+    """True while a virtual clock is installed; hardware threads are then stepped by the simulator."""
+    return _source is not time.monotonic
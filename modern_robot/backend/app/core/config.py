@@ -12,6 +12,91 @@ class Settings:
     # On Pi, defaults to False (real hardware) unless MOCK_MODE=true is set
     MOCK_MODE: bool = os.getenv("MOCK_MODE", str(not IS_RASPBERRY_PI)).lower() == "true"
 
+    # Camera frame ring: preallocated slots shared by capture and consumers
+    # (optionally in multiprocessing.shared_memory so other processes can attach)
+    CAMERA_RING_SLOTS: int = int(os.getenv("CAMERA_RING_SLOTS", "4"))
+    CAMERA_SHARED_MEMORY: bool = os.getenv("CAMERA_SHARED_MEMORY", "false").lower() == "true"
+
+    # Picamera2: let the camera pipeline encode JPEG for viewers and only build
+    # BGR arrays (at CAMERA_ARRAY_SIZE, WxH; keep the width a multiple of 64 so
+    # the YUV lores rows are unpadded) while AI/tracking asks for them
+    CAMERA_NATIVE_JPEG: bool = os.getenv("CAMERA_NATIVE_JPEG", "true").lower() == "true"
+    CAMERA_ARRAY_SIZE: tuple = tuple(int(v) for v in os.getenv("CAMERA_ARRAY_SIZE", "320x240").lower().split("x"))
+
+    # Default per-viewer frame-rate cap for /api/video (override with ?fps=)
+    VIDEO_MAX_FPS: float = float(os.getenv("VIDEO_MAX_FPS", "15"))
+
+    # Motion control loop: tick rate, deadman timeout for setpoints (clients must
+    # resend moves faster than this), track acceleration (1/s^2) and jerk (1/s^3) limits
+    MOTION_LOOP_HZ: float = float(os.getenv("MOTION_LOOP_HZ", "100"))
+    MOTION_SETPOINT_TTL: float = float(os.getenv("MOTION_SETPOINT_TTL", "0.3"))
+    MOTION_MAX_ACCEL: float = float(os.getenv("MOTION_MAX_ACCEL", "4.0"))
+    MOTION_MAX_JERK: float = float(os.getenv("MOTION_MAX_JERK", "200.0"))
+
+    # Ultrasonic sampler: sensors fire in turn, one per slot (s), filtered by a
+    # running median over this many samples followed by an EMA
+    ULTRASONIC_SLOT_TIME: float = float(os.getenv("ULTRASONIC_SLOT_TIME", "0.03"))
+    ULTRASONIC_MEDIAN: int = int(os.getenv("ULTRASONIC_MEDIAN", "3"))
+    ULTRASONIC_EMA_ALPHA: float = float(os.getenv("ULTRASONIC_EMA_ALPHA", "0.5"))
+
+    # World state: sensor readings older than this (s) are stale and safety checks
+    # refuse to act on them; samples kept per signal history ring
+    SENSOR_MAX_AGE: float = float(os.getenv("SENSOR_MAX_AGE", "0.5"))
+    WORLD_HISTORY: int = int(os.getenv("WORLD_HISTORY", "256"))
+
+    # Drivetrain geometry for dead reckoning from commanded track values:
+    # ground speed at full track value (m/s) and track centre distance (m)
+    DRIVE_MAX_SPEED: float = float(os.getenv("DRIVE_MAX_SPEED", "0.3"))
+    DRIVE_TRACK_WIDTH: float = float(os.getenv("DRIVE_TRACK_WIDTH", "0.16"))
+    # Per-track track value -> speed table written by the odometry calibration run
+    ODOM_CALIBRATION_FILE: str = os.getenv("ODOM_CALIBRATION_FILE", "odometry_calibration.json")
+
+    # Obstacle avoidance distances (cm): stop and scan, slow down, counts as free
+    AVOID_STOP_DISTANCE: float = float(os.getenv("AVOID_STOP_DISTANCE", "20"))
+    AVOID_SLOW_DISTANCE: float = float(os.getenv("AVOID_SLOW_DISTANCE", "40"))
+    AVOID_CLEAR_DISTANCE: float = float(os.getenv("AVOID_CLEAR_DISTANCE", "35"))
+
+    # Simulation backend (app.sim) instead of hardware/mock noise: map JSON
+    # (empty = built-in arena), video file played as the camera, noise seed
+    SIMULATION: bool = os.getenv("SIMULATION", "false").lower() == "true"
+    SIM_MAP: str = os.getenv("SIM_MAP", "")
+    SIM_VIDEO: str = os.getenv("SIM_VIDEO", "")
+    SIM_SEED: int = int(os.getenv("SIM_SEED", "0"))
+
+    # Telemetry flight recorder (app.services.telemetry): log directory, file
+    # rotation size and count, seconds between camera keyframes (0 = none)
+    TELEMETRY_ENABLED: bool = os.getenv("TELEMETRY_ENABLED", "false").lower() == "true"
+    TELEMETRY_DIR: str = os.getenv("TELEMETRY_DIR", "telemetry")
+    TELEMETRY_MAX_BYTES: int = int(os.getenv("TELEMETRY_MAX_BYTES", str(16 * 1024 * 1024)))
+    TELEMETRY_MAX_FILES: int = int(os.getenv("TELEMETRY_MAX_FILES", "10"))
+    TELEMETRY_KEYFRAME_INTERVAL: float = float(os.getenv("TELEMETRY_KEYFRAME_INTERVAL", "0"))
+
+    # Status broadcasts: state changes within the window are coalesced into one
+    # versioned patch; each Socket.IO client gets at most this many per second
+    STATUS_COALESCE_WINDOW: float = float(os.getenv("STATUS_COALESCE_WINDOW", "0.05"))
+    STATUS_CLIENT_MAX_RATE: float = float(os.getenv("STATUS_CLIENT_MAX_RATE", "10"))
+
+    # Binary control WebSocket (/api/control): batched ack period in seconds (0 = only on request)
+    CONTROL_ACK_INTERVAL: float = float(os.getenv("CONTROL_ACK_INTERVAL", "0.1"))
+
+    # Object detector: ultralytics | onnxruntime | opencv | stub | none (mock mode
+    # defaults to none), optional model file override and square input size
+    AI_BACKEND: str = os.getenv("AI_BACKEND", "none" if MOCK_MODE else "ultralytics")
+    AI_MODEL_PATH: str = os.getenv("AI_MODEL_PATH", "")
+    AI_INPUT_SIZE: int = int(os.getenv("AI_INPUT_SIZE", "640"))
+
+    # Detections older than this (seconds since frame capture) are not acted on
+    AI_RESULT_MAX_AGE: float = float(os.getenv("AI_RESULT_MAX_AGE", "1.0"))
+
+    # Inference scheduling: max detector runs per second, mean luma change (0-255)
+    # below which a frame counts as static, and forced full-frame pass interval (s)
+    AI_MAX_INFERENCE_RATE: float = float(os.getenv("AI_MAX_INFERENCE_RATE", "4"))
+    AI_MOTION_THRESHOLD: float = float(os.getenv("AI_MOTION_THRESHOLD", "3.0"))
+    AI_FULL_FRAME_INTERVAL: float = float(os.getenv("AI_FULL_FRAME_INTERVAL", "2.0"))
+
+    # Tracker: seconds a track coasts on its prediction without a matching detection
+    AI_TRACK_MAX_AGE: float = float(os.getenv("AI_TRACK_MAX_AGE", "1.0"))
+
 settings = Settings()
 
 
@@ -5,12 +5,15 @@ import sys
 import time
 from typing import Optional, Generator
 from app.core.config import settings
+from app.core.hardware.frame_ring import FrameRing
 import io
 import numpy as np
 
 # Try importing picamera2, adding system path if needed
 try:
     from picamera2 import Picamera2
+    from picamera2.encoders import JpegEncoder
+    from picamera2.outputs import FileOutput
     # Also try to import Transform from libcamera
     from libcamera import Transform
     PICAMERA_AVAILABLE = True
@@ -18,58 +21,211 @@ except ImportError:
     try:
         sys.path.append('/usr/lib/python3/dist-packages')
         from picamera2 import Picamera2
+        from picamera2.encoders import JpegEncoder
+        from picamera2.outputs import FileOutput
         from libcamera import Transform
         PICAMERA_AVAILABLE = True
     except ImportError:
         PICAMERA_AVAILABLE = False
         print("Picamera2/libcamera not found. Falling back to OpenCV.")
 
+class JpegCache:
+    """
+    Encode-once JPEG cache shared by all viewers of one stream variant.
+    Sync viewers block on the condition; async StreamClients get a notify().
+    """
+    def __init__(self, on_viewers_changed=None):
+        self.cond = threading.Condition()
+        self.jpeg = None
+        self.seq = 0
+        self.viewers = 0
+        self.clients = [] # async StreamClients notified on each new JPEG
+        self.on_viewers_changed = on_viewers_changed
+
+    def publish(self, seq, jpeg):
+        with self.cond:
+            if seq <= self.seq:
+                return
+            self.jpeg = jpeg
+            self.seq = seq
+            self.cond.notify_all()
+            clients = list(self.clients)
+        for client in clients:
+            client.notify()
+
+    def latest(self):
+        with self.cond:
+            return self.seq, self.jpeg
+
+    def wait(self, after_seq: int, timeout: Optional[float] = None):
+        """Block until a JPEG newer than `after_seq` is cached. Returns (seq, bytes) or (after_seq, None)."""
+        with self.cond:
+            if not self.cond.wait_for(lambda: self.seq > after_seq, timeout):
+                return after_seq, None
+            return self.seq, self.jpeg
+
+    def add_viewer(self, client: "StreamClient" = None):
+        with self.cond:
+            if client is not None:
+                self.clients.append(client)
+            self.viewers += 1
+        if self.on_viewers_changed:
+            self.on_viewers_changed()
+
+    def remove_viewer(self, client: "StreamClient" = None):
+        with self.cond:
+            if client is not None:
+                if client not in self.clients:
+                    return
+                self.clients.remove(client)
+            self.viewers = max(0, self.viewers - 1)
+        if self.on_viewers_changed:
+            self.on_viewers_changed()
+
+class _JpegSink(io.BufferedIOBase):
+    """FileOutput target for picamera2's JpegEncoder; hands each encoded frame to the stream."""
+    def __init__(self, cache: JpegCache):
+        self.cache = cache
+
+    def write(self, buf):
+        self.cache.publish(self.cache.seq + 1, bytes(buf))
+        return len(buf)
+
 class CameraStream:
     def __init__(self, camera_id: int):
         self.camera_id = camera_id
         self.cap = None
         self.picam2 = None
         self.is_running = False
-        self.frame = None
-        self.lock = threading.Lock()
+        self.ring = None # FrameRing of captured BGR frames, created on start
+        # Encode-once JPEG caches: plain video, and AI-annotated video which is
+        # only rendered while someone watches it
+        self.viewers_changed = threading.Event()
+        self.jpeg_cache = JpegCache(self._on_viewers_changed)
+        self.annotated_cache = JpegCache(self._on_annotated_viewers_changed)
+        self.overlay = None # callable(frame) -> annotated copy, set by the robot
+        self._annotated_arrays = False
         self.use_picamera = PICAMERA_AVAILABLE and camera_id == 0 # Only use Picamera2 for main camera (usually 0)
         self.zoom_factor = 1.0
         self.base_width = 400
         self.base_height = 300
+        # Native mode: picamera2 encodes JPEG for viewers itself and BGR arrays
+        # (downscaled lores stream) are only produced while someone asks for them
+        self.native_jpeg = False
+        self.array_size = settings.CAMERA_ARRAY_SIZE
+        self.array_stream = "lores"
+        self.array_consumers = 0
+        self.arrays_wanted = threading.Event()
+        self.viewers_changed_lock = threading.Lock()
+        self._threads = [] # capture/encode threads, joined on stop before the ring is released
 
     def set_zoom(self, factor: float):
         self.zoom_factor = max(1.0, min(factor, 5.0)) # Limit zoom 1x to 5x
+        if self.native_jpeg and self.picam2:
+            self._set_scaler_crop()
         print(f"Camera {self.camera_id} Zoom set to {self.zoom_factor}x")
 
-    def _apply_zoom(self, frame):
-        if self.zoom_factor <= 1.01:
-            return frame
-        
+    def _set_scaler_crop(self):
+        # Zoom in the ISP so both the JPEG and the array stream see it for free
         try:
-            h, w = frame.shape[:2]
+            x, y, w, h = self.picam2.camera_properties['ScalerCropMaximum']
             new_w = int(w / self.zoom_factor)
             new_h = int(h / self.zoom_factor)
-            
-            x1 = (w - new_w) // 2
-            y1 = (h - new_h) // 2
-            x2 = x1 + new_w
-            y2 = y1 + new_h
-            
-            # Crop
-            cropped = frame[y1:y2, x1:x2]
-            # Resize back to original
-            return cv2.resize(cropped, (w, h), interpolation=cv2.INTER_LINEAR)
+            crop = (x + (w - new_w) // 2, y + (h - new_h) // 2, new_w, new_h)
+            self.picam2.set_controls({"ScalerCrop": crop})
         except Exception as e:
             print(f"Zoom error: {e}")
-            return frame
+
+    def acquire_arrays(self):
+        """Register a consumer of BGR arrays (AI, tracking); starts the array stream in native mode."""
+        with self.viewers_changed_lock:
+            self.array_consumers += 1
+            self.arrays_wanted.set()
+
+    def release_arrays(self):
+        with self.viewers_changed_lock:
+            self.array_consumers = max(0, self.array_consumers - 1)
+            if self.array_consumers == 0:
+                self.arrays_wanted.clear()
+
+    def _on_viewers_changed(self):
+        self.viewers_changed.set()
+
+    def _on_annotated_viewers_changed(self):
+        # Annotated frames are drawn on arrays, so keep them flowing while watched
+        with self.viewers_changed_lock:
+            watching = self.annotated_cache.viewers > 0
+            changed = watching != self._annotated_arrays
+            self._annotated_arrays = watching
+        if changed:
+            if watching:
+                self.acquire_arrays()
+            else:
+                self.release_arrays()
+        self.viewers_changed.set()
+
+    def _publish(self, frame):
+        """Crop/resize the captured frame straight into the next ring slot and commit it."""
+        slot = self.ring.reserve()
+        h, w = slot.shape[:2]
+        try:
+            if self.zoom_factor > 1.01:
+                fh, fw = frame.shape[:2]
+                new_w = int(fw / self.zoom_factor)
+                new_h = int(fh / self.zoom_factor)
+                x1 = (fw - new_w) // 2
+                y1 = (fh - new_h) // 2
+                # Crop is a view; resize back to full size directly into the slot
+                frame = frame[y1:y1 + new_h, x1:x1 + new_w]
+                cv2.resize(frame, (w, h), dst=slot, interpolation=cv2.INTER_LINEAR)
+            elif frame.shape == slot.shape:
+                np.copyto(slot, frame)
+            else:
+                cv2.resize(frame, (w, h), dst=slot, interpolation=cv2.INTER_LINEAR)
+        except Exception as e:
+            print(f"Frame publish error: {e}")
+        self.ring.commit()
+
+    def _create_ring(self, width, height):
+        if self.ring is None:
+            self.ring = FrameRing((height, width, 3),
+                                  slots=settings.CAMERA_RING_SLOTS,
+                                  shared=settings.CAMERA_SHARED_MEMORY)
+
+    def _start_thread(self, target):
+        thread = threading.Thread(target=target, daemon=True)
+        self._threads.append(thread)
+        thread.start()
 
     def start(self):
+        if settings.SIMULATION:
+            self._create_ring(self.base_width, self.base_height)
+            self.is_running = True
+            self._start_thread(self._update_sim)
+            self._start_thread(self._encode_loop)
+            return
+
         if settings.MOCK_MODE:
+            self._create_ring(self.base_width, self.base_height)
             self.is_running = True
+            self._start_thread(self._update_mock)
+            self._start_thread(self._encode_loop)
             return
 
+        if self.use_picamera and settings.CAMERA_NATIVE_JPEG:
+            try:
+                self._start_picamera_native()
+                return
+            except Exception as e:
+                print(f"Failed to start Picamera2 native JPEG stream: {e}. Falling back to array capture.")
+                if self.picam2:
+                    self.picam2.close()
+                    self.picam2 = None
+                self.native_jpeg = False
+
         if self.use_picamera:
             try:
+                self._create_ring(self.base_width, self.base_height)
                 self.picam2 = Picamera2()
                 # Use specified resolution and flips
                 config = self.picam2.create_preview_configuration(
@@ -80,13 +236,15 @@ class CameraStream:
                 self.picam2.start()
                 self.is_running = True
                 print(f"Started Picamera2 for camera {self.camera_id} ({self.base_width}x{self.base_height}, H/V Flip)")
-                threading.Thread(target=self._update_picamera, daemon=True).start()
+                self._start_thread(self._update_picamera)
+                self._start_thread(self._encode_loop)
                 return
             except Exception as e:
                 print(f"Failed to start Picamera2: {e}. Falling back to OpenCV.")
                 self.use_picamera = False
 
         # Fallback or secondary camera
+        self._create_ring(self.base_width, self.base_height)
         self.cap = cv2.VideoCapture(self.camera_id)
         # Set resolution
         self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, self.base_width)
@@ -98,7 +256,40 @@ class CameraStream:
 
         self.is_running = True
         print(f"Started OpenCV capture for camera {self.camera_id} ({self.base_width}x{self.base_height})")
-        threading.Thread(target=self._update_opencv, daemon=True).start()
+        self._start_thread(self._update_opencv)
+        self._start_thread(self._encode_loop)
+
+    def _start_picamera_native(self):
+        """
+        Dual-stream mode (same approach as Server/camera.py): picamera2's JpegEncoder
+        encodes the main stream straight into the JPEG cache, and a downscaled YUV
+        lores stream is converted to BGR for the ring only while arrays are requested.
+        """
+        array_w, array_h = self.array_size
+        # lores must be smaller than main; otherwise arrays come from main itself
+        if array_w >= self.base_width or array_h >= self.base_height:
+            array_w, array_h = self.base_width, self.base_height
+            self.array_stream = "main"
+        self.picam2 = Picamera2()
+        streams = {"main": {"size": (self.base_width, self.base_height)}}
+        if self.array_stream == "lores":
+            streams["lores"] = {"size": (array_w, array_h), "format": "YUV420"}
+        config = self.picam2.create_video_configuration(**streams, transform=Transform(hflip=1, vflip=1))
+        self.picam2.configure(config)
+        # Use the size libcamera actually configured (it may align lores)
+        array_w, array_h = self.picam2.camera_config[self.array_stream]["size"]
+        self._create_ring(array_w, array_h)
+
+        self.native_jpeg = True
+        self.picam2.start_recording(JpegEncoder(), FileOutput(_JpegSink(self.jpeg_cache)))
+        if self.zoom_factor > 1.01:
+            self._set_scaler_crop()
+        self.is_running = True
+        print(f"Started Picamera2 native JPEG stream for camera {self.camera_id} "
+              f"({self.base_width}x{self.base_height}, arrays {array_w}x{array_h} on demand, H/V Flip)")
+        self._start_thread(self._update_picamera_arrays)
+        # Only needed for the annotated stream in this mode
+        self._start_thread(self._encode_loop)
 
     def _update_opencv(self):
         while self.is_running and self.cap.isOpened():
@@ -106,9 +297,7 @@ class CameraStream:
             if ret:
                 # Apply flips for OpenCV (hflip=True, vflip=True means flip code -1)
                 frame = cv2.flip(frame, -1)
-                frame = self._apply_zoom(frame)
-                with self.lock:
-                    self.frame = frame
+                self._publish(frame)
             else:
                 time.sleep(0.1)
 
@@ -119,39 +308,190 @@ class CameraStream:
                 frame = self.picam2.capture_array()
                 # Picamera2 returns RGB, OpenCV expects BGR
                 frame = cv2.cvtColor(frame, cv2.COLOR_RGB2BGR)
-                frame = self._apply_zoom(frame)
-                with self.lock:
-                    self.frame = frame
+                self._publish(frame)
             except Exception as e:
                 print(f"Picamera2 capture error: {e}")
                 time.sleep(0.1)
 
+    def _update_picamera_arrays(self):
+        while self.is_running:
+            if not self.arrays_wanted.wait(0.5):
+                continue
+            try:
+                request = self.picam2.capture_request()
+                try:
+                    frame = request.make_array(self.array_stream)
+                finally:
+                    request.release()
+                slot = self.ring.reserve()
+                if self.array_stream == "lores":
+                    # YUV420 planar -> BGR straight into the ring slot
+                    cv2.cvtColor(frame, cv2.COLOR_YUV2BGR_I420, dst=slot)
+                else:
+                    cv2.cvtColor(frame, cv2.COLOR_RGBA2BGR, dst=slot)
+                self.ring.commit()
+            except Exception as e:
+                print(f"Picamera2 array capture error: {e}")
+                time.sleep(0.1)
+
+    def _update_mock(self):
+        while self.is_running:
+            # Generate mock noise frame directly into the ring slot
+            slot = self.ring.reserve()
+            slot[:] = np.random.randint(0, 255, slot.shape, dtype=np.uint8)
+            cv2.putText(slot, f"MOCK CAM {self.camera_id} Z:{self.zoom_factor:.1f}x", (20, 150), cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 255, 255), 2)
+            self.ring.commit()
+            time.sleep(1 / 15)
+
+    def _update_sim(self):
+        """Recorded video (settings.SIM_VIDEO, looped at its own frame rate) or the simulator's top-down view."""
+        from app.sim.simulator import get_simulator
+        sim = get_simulator()
+        video = cv2.VideoCapture(settings.SIM_VIDEO) if settings.SIM_VIDEO else None
+        period = 1 / ((video.get(cv2.CAP_PROP_FPS) if video else 0) or 15)
+        while self.is_running:
+            if video is not None:
+                ret, frame = video.read()
+                if not ret:
+                    video.set(cv2.CAP_PROP_POS_FRAMES, 0) # loop
+                    ret, frame = video.read()
+                if not ret:
+                    print(f"Cannot read {settings.SIM_VIDEO}, using the simulator view")
+                    video = None
+                    continue
+                frame = cv2.resize(frame, (self.base_width, self.base_height))
+            else:
+                frame = sim.render(self.base_width, self.base_height)
+            slot = self.ring.reserve()
+            slot[:] = frame
+            self.ring.commit()
+            time.sleep(period)
+
+    def _encode_loop(self):
+        """Encode each new ring frame to JPEG exactly once per stream variant, only while watched."""
+        last_seq = 0
+        while self.is_running:
+            # Plain video comes straight from the camera encoder in native mode
+            plain = self.jpeg_cache.viewers > 0 and not self.native_jpeg
+            annotated = self.annotated_cache.viewers > 0 and self.overlay is not None
+            if not (plain or annotated):
+                self.viewers_changed.wait(0.5)
+                self.viewers_changed.clear()
+                continue
+            seq = self.ring.wait_for(last_seq, timeout=0.5)
+            if seq <= last_seq:
+                continue
+            last_seq = seq
+            if plain:
+                self._encode(seq, self.jpeg_cache)
+            if annotated:
+                self._encode(seq, self.annotated_cache, self.overlay)
+
+    def _encode(self, seq, cache, overlay=None):
+        frame = self.ring.get(seq)
+        if frame is None:
+            return None
+        if overlay is not None:
+            frame = overlay(frame)
+        ret, buffer = cv2.imencode('.jpg', frame)
+        # The slot may have been recycled while encoding; drop the result if so
+        if not ret or not self.ring.is_valid(seq):
+            return None
+        jpeg = buffer.tobytes()
+        cache.publish(seq, jpeg)
+        return jpeg
+
     def stop(self):
         self.is_running = False
+        self.viewers_changed.set()
+        self.arrays_wanted.set() # wake the array thread so it can exit
         if self.picam2:
-            self.picam2.stop()
+            if self.native_jpeg:
+                self.picam2.stop_recording()
+            else:
+                self.picam2.stop()
             self.picam2.close()
         if self.cap:
             self.cap.release()
+        for thread in self._threads:
+            thread.join(timeout=1.0)
+        self._threads = []
+        if self.ring is not None:
+            # We created the ring, so remove its /dev/shm segment too
+            self.ring.close(unlink=True)
+            self.ring = None
+
+    def get_latest(self):
+        """Return (seq, read-only view) of the newest frame without copying, or (0, None)."""
+        if self.ring is None:
+            return 0, None
+        return self.ring.latest()
 
     def get_frame(self):
-        if settings.MOCK_MODE:
-            # Generate mock noise frame
-            frame = np.random.randint(0, 255, (300, 400, 3), dtype=np.uint8)
-            cv2.putText(frame, f"MOCK CAM {self.camera_id} Z:{self.zoom_factor:.1f}x", (20, 150), cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 255, 255), 2)
-            ret, buffer = cv2.imencode('.jpg', frame)
-            return buffer.tobytes()
-
-        with self.lock:
-            if self.frame is None:
-                return None
-            ret, buffer = cv2.imencode('.jpg', self.frame)
-            return buffer.tobytes()
+        """Latest frame as JPEG bytes, reusing the cached encode when it is current."""
+        if self.native_jpeg:
+            return self.jpeg_cache.latest()[1]
+        seq, frame = self.get_latest()
+        if frame is None:
+            return None
+        cached_seq, jpeg = self.jpeg_cache.latest()
+        if cached_seq == seq:
+            return jpeg
+        return self._encode(seq, self.jpeg_cache)
+
+class StreamClient:
+    """
+    Per-viewer state for the async MJPEG stream.
+    The encoder thread only flags that a newer JPEG exists; the viewer always
+    sends the latest one, so frames that arrive while a slow client is still
+    sending are dropped instead of queued.
+    """
+    def __init__(self, cam_type: str, max_fps: float, annotated: bool = False):
+        self.loop = asyncio.get_running_loop()
+        self.event = asyncio.Event()
+        self.cam_type = cam_type
+        self.annotated = annotated
+        self.max_fps = max(0.5, min(max_fps, 60.0))
+        self.connected_at = time.monotonic()
+        self.last_seq = 0
+        self.pending = 0 # frames published since the last send
+        self.sent = 0
+        self.dropped = 0
+        self.bytes_sent = 0
+        self.last_send_time = 0.0 # seconds spent in the last send
+
+    def notify(self):
+        # Called from the encoder thread
+        self.loop.call_soon_threadsafe(self._on_frame)
+
+    def _on_frame(self):
+        self.pending += 1
+        self.event.set()
+
+    @property
+    def backpressured(self) -> bool:
+        # The client can't drain a frame within its own frame interval
+        return self.last_send_time > 1.0 / self.max_fps
+
+    def stats(self) -> dict:
+        elapsed = max(time.monotonic() - self.connected_at, 1e-6)
+        return {
+            "camera": self.cam_type,
+            "annotated": self.annotated,
+            "max_fps": self.max_fps,
+            "fps": round(self.sent / elapsed, 1),
+            "sent": self.sent,
+            "dropped": self.dropped,
+            "bytes_sent": self.bytes_sent,
+            "last_send_ms": round(self.last_send_time * 1000, 1),
+            "backpressured": self.backpressured,
+        }
 
 class CameraManager:
     def __init__(self):
         # Front Camera (0), Rear Camera (1)
         self.front_cam = CameraStream(0)
+        self.stream_clients = set()
         # self.rear_cam = CameraStream(1) # DISABLED 
     
     def set_zoom(self, camera_type: str, factor: float):
@@ -170,6 +510,11 @@ class CameraManager:
         self.front_cam.stop()
         # self.rear_cam.stop()
 
+    def set_overlay(self, cam_type: str, overlay):
+        """Install the callable that draws annotations for the annotated stream."""
+        if cam_type == "front":
+            self.front_cam.overlay = overlay
+
     def get_stream(self, cam_type: str):
         if cam_type == "front":
             camera = self.front_cam
@@ -180,19 +525,101 @@ class CameraManager:
             # if not camera.is_running:
             #     camera.start()
 
-        while True:
-            frame = camera.get_frame()
-            if frame:
+        cache = camera.jpeg_cache
+        cache.add_viewer()
+        try:
+            seq = 0
+            while True:
+                # Sleeps on the JPEG cache condition until the encoder publishes a new frame
+                seq, frame = cache.wait(seq, timeout=1.0)
+                if frame:
+                    yield (b'--frame\r\n'
+                           b'Content-Type: image/jpeg\r\n\r\n' + frame + b'\r\n')
+        finally:
+            cache.remove_viewer()
+
+    async def stream(self, cam_type: str, max_fps: float = None, annotated: bool = False):
+        """
+        Async MJPEG generator. Awaits new-frame notifications instead of
+        blocking a threadpool thread, caps the per-client frame rate, and
+        always sends the newest cached JPEG (stale frames are dropped).
+        With annotated=True the AI overlay is drawn (only while watched).
+        """
+        if cam_type != "front":
+            return # No rear camera
+        camera = self.front_cam
+        cache = camera.annotated_cache if annotated else camera.jpeg_cache
+
+        client = StreamClient(cam_type, max_fps or settings.VIDEO_MAX_FPS, annotated)
+        cache.add_viewer(client)
+        self.stream_clients.add(client)
+        try:
+            next_send = 0.0
+            while True:
+                await client.event.wait()
+                client.event.clear()
+
+                # Frame-rate cap: newer frames that arrive while we wait simply replace this one
+                now = time.monotonic()
+                if now < next_send:
+                    await asyncio.sleep(next_send - now)
+
+                seq, frame = cache.latest()
+                if frame is None or seq <= client.last_seq:
+                    continue
+                client.dropped += max(0, client.pending - 1)
+                client.pending = 0
+                client.last_seq = seq
+
+                start = time.monotonic()
+                next_send = start + 1.0 / client.max_fps
+                # Resumes once the ASGI server has taken the chunk, so this measures the client's drain time
                 yield (b'--frame\r\n'
                        b'Content-Type: image/jpeg\r\n\r\n' + frame + b'\r\n')
-            else:
-                time.sleep(0.1)
+                client.last_send_time = time.monotonic() - start
+                client.sent += 1
+                client.bytes_sent += len(frame)
+        finally:
+            cache.remove_viewer(client)
+            self.stream_clients.discard(client)
 
-    def get_latest_frame(self, cam_type="front"):
+    def get_stream_stats(self):
+        return [client.stats() for client in self.stream_clients]
+
+    def get_latest(self, cam_type="front"):
+        """
+        Borrow the newest frame as (seq, read-only view) without copying.
+        The view is recycled after CAMERA_RING_SLOTS newer frames; check
+        is_frame_valid(seq) after use or copy it if it must be kept.
+        """
         if cam_type == "front":
-            with self.front_cam.lock:
-                return self.front_cam.frame.copy() if self.front_cam.frame is not None else None
-        else:
-            return None
-            # with self.rear_cam.lock:
-            #     return self.rear_cam.frame.copy() if self.rear_cam.frame is not None else None
+            return self.front_cam.get_latest()
+        return 0, None
+
+    def acquire_frames(self, cam_type="front"):
+        """Ask the camera to produce BGR arrays (needed in native JPEG mode); pair with release_frames."""
+        if cam_type == "front":
+            self.front_cam.acquire_arrays()
+
+    def release_frames(self, cam_type="front"):
+        if cam_type == "front":
+            self.front_cam.release_arrays()
+
+    def get_frame_by_seq(self, seq: int, cam_type="front"):
+        if cam_type == "front" and self.front_cam.ring is not None:
+            return self.front_cam.ring.get(seq)
+        return None
+
+    def get_frame_time(self, seq: int, cam_type="front"):
+        """Capture time (time.monotonic()) of frame `seq`, or None if it was recycled."""
+        if cam_type == "front" and self.front_cam.ring is not None:
+            return self.front_cam.ring.timestamp(seq)
+        return None
+
+    def is_frame_valid(self, seq: int, cam_type="front") -> bool:
+        if cam_type == "front" and self.front_cam.ring is not None:
+            return self.front_cam.ring.is_valid(seq)
+        return False
+
+    def get_latest_frame(self, cam_type="front"):
+        return self.get_latest(cam_type)[1]
@@ -0,0 +1,142 @@
+import threading
+import time
+from multiprocessing import shared_memory
+from typing import Optional, Tuple
+import numpy as np
+
+class FrameRing:
+    """
+    Preallocated N-slot ring buffer of equally sized frames.
+
+    The capture thread (single writer) fills the next slot in place and commits
+    it under a new sequence number. Readers borrow a read-only view of a slot by
+    sequence id instead of copying it. A slot is recycled after `slots` further
+    commits, so a borrowed view is only trustworthy while `is_valid(seq)` holds;
+    callers that need to keep a frame longer must copy it themselves.
+
+    With `shared=True` the slots and their metadata live in a
+    multiprocessing.shared_memory block that another process can open with
+    `FrameRing.attach(ring.shm_name, shape, slots)`.
+    """
+
+    def __init__(self, shape: Tuple[int, ...], slots: int = 4, dtype=np.uint8, shared: bool = False, _shm_name: Optional[str] = None):
+        self.shape = tuple(shape)
+        self.slots = max(2, int(slots))
+        self.dtype = np.dtype(dtype)
+        self.cond = threading.Condition()
+        self.shm = None
+
+        frame_bytes = int(np.prod(self.shape)) * self.dtype.itemsize
+        # Layout: [slot seqs + latest seq (int64)] [slot timestamps (float64)] [frames]
+        meta_bytes = (self.slots + 1) * 8
+        ts_bytes = self.slots * 8
+        total = meta_bytes + ts_bytes + frame_bytes * self.slots
+
+        if shared or _shm_name:
+            if _shm_name:
+                self.shm = shared_memory.SharedMemory(name=_shm_name)
+            else:
+                self.shm = shared_memory.SharedMemory(create=True, size=total)
+            raw = self.shm.buf
+        else:
+            raw = bytearray(total)
+
+        self._meta = np.ndarray((self.slots + 1,), dtype=np.int64, buffer=raw, offset=0)
+        self._timestamps = np.ndarray((self.slots,), dtype=np.float64, buffer=raw, offset=meta_bytes)
+        self.buffer = np.ndarray((self.slots,) + self.shape, dtype=self.dtype, buffer=raw, offset=meta_bytes + ts_bytes)
+        if not _shm_name:
+            self._meta[:] = 0
+
+        # Read-only views handed out to consumers, built once
+        self._views = []
+        for i in range(self.slots):
+            view = self.buffer[i].view()
+            view.flags.writeable = False
+            self._views.append(view)
+
+        self._pending_slot = None
+
+    @classmethod
+    def attach(cls, name: str, shape: Tuple[int, ...], slots: int, dtype=np.uint8) -> "FrameRing":
+        """Open a ring created with shared=True in another process (read side)."""
+        return cls(shape, slots=slots, dtype=dtype, _shm_name=name)
+
+    @property
+    def shm_name(self) -> Optional[str]:
+        return self.shm.name if self.shm else None
+
+    @property
+    def latest_seq(self) -> int:
+        return int(self._meta[self.slots])
+
+    # --- Writer side ---
+
+    def reserve(self) -> np.ndarray:
+        """Return the writable slot the next frame should be written into."""
+        slot = (self.latest_seq + 1) % self.slots
+        # Invalidate the slot first so readers holding its old seq notice the overwrite
+        self._meta[slot] = 0
+        self._pending_slot = slot
+        return self.buffer[slot]
+
+    def commit(self, timestamp: Optional[float] = None) -> int:
+        """Publish the reserved slot under the next sequence number."""
+        slot = self._pending_slot
+        if slot is None:
+            raise RuntimeError("commit() called without reserve()")
+        self._pending_slot = None
+        seq = self.latest_seq + 1
+        with self.cond:
+            self._timestamps[slot] = timestamp if timestamp is not None else time.monotonic()
+            self._meta[slot] = seq
+            self._meta[self.slots] = seq
+            self.cond.notify_all()
+        return seq
+
+    def write(self, frame: np.ndarray, timestamp: Optional[float] = None) -> int:
+        np.copyto(self.reserve(), frame)
+        return self.commit(timestamp)
+
+    # --- Reader side ---
+
+    def is_valid(self, seq: int) -> bool:
+        return seq > 0 and int(self._meta[seq % self.slots]) == seq
+
+    def get(self, seq: int) -> Optional[np.ndarray]:
+        """Borrow a read-only view of frame `seq`, or None if it was already recycled."""
+        if not self.is_valid(seq):
+            return None
+        return self._views[seq % self.slots]
+
+    def latest(self) -> Tuple[int, Optional[np.ndarray]]:
+        """Return (seq, read-only view) of the newest frame, or (0, None) before the first frame."""
+        seq = self.latest_seq
+        if seq == 0:
+            return 0, None
+        return seq, self.get(seq)
+
+    def timestamp(self, seq: int) -> Optional[float]:
+        if not self.is_valid(seq):
+            return None
+        return float(self._timestamps[seq % self.slots])
+
+    def wait_for(self, after_seq: int, timeout: Optional[float] = None) -> int:
+        """Block until a frame newer than `after_seq` is committed; returns the latest seq."""
+        with self.cond:
+            self.cond.wait_for(lambda: self.latest_seq > after_seq, timeout)
+            return self.latest_seq
+
+    def close(self, unlink: bool = False):
+        """Release the shared block; the creator passes unlink=True to remove it from /dev/shm."""
+        if self.shm:
+            self._views = []
+            self.buffer = None
+            self._meta = None
+            self._timestamps = None
+            if unlink:
+                self.shm.unlink()
+            try:
+                self.shm.close()
+            except BufferError:
+                pass # a reader still borrows a view; the mapping goes away with it
+            self.shm = None
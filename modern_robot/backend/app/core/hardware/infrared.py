@@ -1,13 +1,41 @@
+import asyncio
+import threading
+from app.core import clock
 from app.core.config import settings
 try:
-    from gpiozero import LineSensor
+    from gpiozero import DigitalInputDevice
 except ImportError:
-    LineSensor = None
+    DigitalInputDevice = None
 
 class InfraredSystem:
+    """
+    Three IR line sensors tracked by edge interrupts instead of polling.
+
+    Pin callbacks update one packed 3-bit state, (Left << 2) | (Center << 1) | Right
+    as in the original read_all_infrared, together with the time it changed.
+    Reads are plain attribute loads; asyncio code can await the next change
+    with wait_for_change(), woken through loop.call_soon_threadsafe.
+    """
+    PINS = (16, 26, 21) # Left, Center, Right
+
     def __init__(self):
         self.sensors = []
-        if settings.MOCK_MODE or LineSensor is None:
+        self.state = 0          # packed bits, 1 = line / no reflection
+        self.changed_at = clock.monotonic()
+        self.edges = 0
+        self._lock = threading.Lock()
+        self._waiters = []      # (loop, future) awaiting the next change
+        self._listeners = []    # callables(state, timestamp), run on the pin thread
+
+        if settings.SIMULATION:
+            from app.sim.simulator import get_simulator
+            print("InfraredSystem reading the simulator")
+            sim = get_simulator()
+            sim.add_infrared_listener(self.set_mock_state)
+            self.set_mock_state(sim.ir_state)
+            return
+
+        if settings.MOCK_MODE or DigitalInputDevice is None:
             print("InfraredSystem started in MOCK mode")
             return
 
@@ -15,63 +43,104 @@ class InfraredSystem:
         # IR01 (Left) -> GPIO 16
         # IR02 (Center) -> GPIO 26 (Check version 2 mapping from infrared.py)
         # IR03 (Right) -> GPIO 21
-        
+
         # NOTE: Original infrared.py logic checks PCB version.
         # PCB 1: 16, 20, 21
         # PCB 2: 16, 26, 21
-        # We'll assume PCB 2 mostly, but can try-catch 20 if 26 fails or vice versa? 
+        # We'll assume PCB 2 mostly, but can try-catch 20 if 26 fails or vice versa?
         # Actually, let's just stick to the PCB 2 mapping (16, 26, 21) as it's "modern" robot.
-        
+
         try:
-            self.ir_left = LineSensor(16)
-            self.ir_center = LineSensor(26)
-            self.ir_right = LineSensor(21)
-            self.sensors = [self.ir_left, self.ir_center, self.ir_right]
+            # Plain digital inputs: LineSensor smooths over a sample queue, which
+            # delays its callbacks by tens of ms. Active (high) = line detected.
+            self.sensors = [DigitalInputDevice(pin, pull_up=False) for pin in self.PINS]
+            self.ir_left, self.ir_center, self.ir_right = self.sensors
+            for i, sensor in enumerate(self.sensors):
+                bit = 1 << (2 - i)
+                sensor.when_activated = lambda bit=bit: self._edge(bit, True)
+                sensor.when_deactivated = lambda bit=bit: self._edge(bit, False)
+            state = 0
+            for i, sensor in enumerate(self.sensors):
+                if sensor.is_active:
+                    state |= 1 << (2 - i)
+            self._update(0b111, state)
             print("Infrared Sensors initialized (GPIO 16, 26, 21)")
         except Exception as e:
             print(f"Failed to initialize Infrared sensors: {e}")
             self.sensors = []
 
+    def _edge(self, bit, active):
+        self._update(bit, bit if active else 0)
+
+    def _update(self, mask, bits):
+        """Replace the state bits in `mask` with `bits` and notify on change."""
+        with self._lock:
+            state = (self.state & ~mask) | bits
+            if state == self.state:
+                return
+            now = clock.monotonic()
+            self.state = state
+            self.changed_at = now
+            self.edges += 1
+            waiters, self._waiters = self._waiters, []
+        for loop, future in waiters:
+            try:
+                loop.call_soon_threadsafe(self._wake, future, state)
+            except RuntimeError:
+                pass # loop closed
+        for listener in self._listeners:
+            listener(state, now)
+
+    @staticmethod
+    def _wake(future, state):
+        if not future.done():
+            future.set_result(state)
+
+    def set_mock_state(self, state: int):
+        """Inject a sensor state (mock mode / simulation)."""
+        self._update(0b111, state & 0b111)
+
+    def add_listener(self, callback):
+        """Call `callback(state, timestamp)` on every change (from the GPIO callback thread)."""
+        self._listeners.append(callback)
+
+    async def wait_for_change(self, current: int = None, timeout: float = None):
+        """
+        Wait until the state differs from `current` (default: the state now) and
+        return the new state; returns the unchanged state on timeout.
+        """
+        with self._lock:
+            if current is not None and self.state != current:
+                return self.state
+            loop = asyncio.get_running_loop()
+            future = loop.create_future()
+            self._waiters.append((loop, future))
+        try:
+            # asyncio.wait rather than wait_for: wait_for can swallow a cancellation
+            # that races with the wakeup, which would keep a cancelled loop running
+            done, _ = await asyncio.wait((future,), timeout=timeout)
+            return future.result() if done else self.state
+        finally:
+            with self._lock:
+                if (loop, future) in self._waiters:
+                    self._waiters.remove((loop, future))
+
     def get_values(self):
         """
         Returns list of booleans [Left, Center, Right]
-        True means detecting black line (usually), but gpiozero LineSensor logic:
-        - When line is detected (active), value is 1.
-        - When no line (reflective surface), value is 0.
-        Wait, LineSensor by default:
-        - Active (line detected) -> value=1
-        Let's verify with original code.
-        Original: returns 1 if self.IR01_sensor.value else 0
+        True means detecting black line / no reflection (input high), as in the
+        original: returns 1 if self.IR01_sensor.value else 0
         """
-        if settings.MOCK_MODE or not self.sensors:
-            import random
-            # Randomly return values
-            return [random.choice([True, False]) for _ in range(3)]
-
-        return [sensor.is_active for sensor in self.sensors] # is_active is True when line is detected
+        state = self.state
+        return [bool(state & 4), bool(state & 2), bool(state & 1)]
 
     def read_all_infrared_byte(self):
-        """Mirror original read_all_infrared returning int"""
-        vals = self.get_values()
-        # Original: (Left << 2) | (Center << 1) | Right
-        # But wait, original code:
-        # IR01 (Left?), IR02 (Center?), IR03 (Right?)
-        # return (read(1)<<2) | (read(2)<<1) | read(3)
-        
-        # Let's map:
-        v1 = 1 if vals[0] else 0
-        v2 = 1 if vals[1] else 0
-        v3 = 1 if vals[2] else 0
-        
-        return (v1 << 2) | (v2 << 1) | v3
+        """Mirror original read_all_infrared returning int: (Left << 2) | (Center << 1) | Right"""
+        return self.state
+
+    def get_stats(self):
+        return {"state": self.state, "edges": self.edges, "age": round(clock.monotonic() - self.changed_at, 3)}
 
     def close(self):
         for sensor in self.sensors:
             sensor.close()
-
-
-
-
-
-
-
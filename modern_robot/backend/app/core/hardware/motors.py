@@ -8,7 +8,15 @@ except ImportError:
 class MotorController:
     def __init__(self):
         self.speed_scale = 1.0
-        
+        self.sim = None
+
+        if settings.SIMULATION:
+            from app.sim.simulator import get_simulator
+            print("MotorController driving the simulator")
+            self.sim = get_simulator()
+            self.pwm_L1 = None
+            return
+
         if settings.MOCK_MODE or GPIO is None:
             print("MotorController started in MOCK mode")
             self.pwm_L1 = None
@@ -59,24 +67,34 @@ class MotorController:
         self.speed_scale = max(0.0, min(1.0, scale))
         # print(f"Motor speed scale set to {self.speed_scale}")
 
+    @staticmethod
+    def mix(x: float, y: float):
+        """Arcade mix of turn x / throttle y into (left, right) track values in -1.0..1.0."""
+        # y is throttle (forward/back), x is turn (left/right)
+        left_val = max(-1.0, min(1.0, y + x))
+        right_val = max(-1.0, min(1.0, y - x))
+        return left_val, right_val
+
     def move(self, x: float, y: float):
         """
         Arcade drive control.
         x: Turn (-1.0 to 1.0)
         y: Throttle (-1.0 to 1.0)
         """
+        self.set_tracks(*self.mix(x, y))
+
+    def set_tracks(self, left: float, right: float):
+        """Drive each track directly (-1.0 to 1.0, before speed scaling)."""
+        if self.sim:
+            self.sim.set_tracks(max(-1.0, min(1.0, left)) * self.speed_scale,
+                                max(-1.0, min(1.0, right)) * self.speed_scale)
+            return
         if settings.MOCK_MODE or not self.pwm_L1:
             return
 
-        # Calculate raw speeds
-        # y is throttle (forward/back), x is turn (left/right)
-        # Standard arcade drive mixing
-        left_val = y + x
-        right_val = y - x
-
         # Normalize to -1.0 to 1.0
-        left_val = max(-1.0, min(1.0, left_val))
-        right_val = max(-1.0, min(1.0, right_val))
+        left_val = max(-1.0, min(1.0, left))
+        right_val = max(-1.0, min(1.0, right))
 
         # Apply speed scaling
         left_val *= self.speed_scale
@@ -109,6 +127,8 @@ class MotorController:
             pwm_back.ChangeDutyCycle(0)
 
     def stop(self):
+        if self.sim:
+            self.sim.set_tracks(0.0, 0.0)
         if self.pwm_L1:
             self.pwm_L1.ChangeDutyCycle(0)
             self.pwm_L2.ChangeDutyCycle(0)
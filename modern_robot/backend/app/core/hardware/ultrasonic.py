@@ -1,65 +1,221 @@
+import random
+import threading
+import time
+from collections import deque
+from app.core import clock
 from app.core.config import settings
 try:
-    from gpiozero import DistanceSensor
+    from gpiozero import DigitalInputDevice, DigitalOutputDevice
 except ImportError:
-    DistanceSensor = None
+    DigitalInputDevice = None
+    DigitalOutputDevice = None
 
-class UltrasonicSystem:
+SPEED_OF_SOUND = 343.26 # m/s
+MAX_DISTANCE = 3.0      # m, same range the DistanceSensor setup used
+
+class UltrasonicReading:
+    """Filtered distance of one sensor and when it was measured."""
+    __slots__ = ("distance", "raw", "timestamp")
+
+    def __init__(self, distance, raw, timestamp):
+        self.distance = distance   # cm, median + EMA filtered (None until the first echo)
+        self.raw = raw             # cm, last accepted sample
+        self.timestamp = timestamp # clock.monotonic() of that sample
+
+    @property
+    def age(self) -> float:
+        return clock.monotonic() - self.timestamp
+
+class _EchoSensor:
+    """
+    HC-SR04 timed from echo pin edge ticks, the way gpiozero's DistanceSensor
+    does it, but triggered only on request so sensors can take turns.
+    """
+    def __init__(self, echo, trigger):
+        self.trigger = DigitalOutputDevice(trigger)
+        self.echo = DigitalInputDevice(echo, pull_up=False)
+        self.factory = self.echo.pin_factory
+        self._rise = None
+        self._fall = None
+        self._done = threading.Event()
+        self.echo.pin.when_changed = self._echo_changed
+
+    def _echo_changed(self, ticks, state):
+        if state:
+            self._rise = ticks
+        elif self._rise is not None:
+            self._fall = ticks
+            self._done.set()
+
+    def measure(self, timeout):
+        """Distance in metres, MAX_DISTANCE if nothing echoed in range, None if no echo pulse started."""
+        self._rise = self._fall = None
+        self._done.clear()
+        self.trigger.on()
+        time.sleep(10e-6)
+        self.trigger.off()
+        if not self._done.wait(timeout):
+            return MAX_DISTANCE if self._rise is not None else None
+        return min(MAX_DISTANCE, self.factory.ticks_diff(self._fall, self._rise) * SPEED_OF_SOUND / 2)
+
+    def close(self):
+        self.trigger.close()
+        self.echo.close()
+
+class _MockEcho:
+    """Random-walk distance with sensor-like noise and occasional missing echoes."""
     def __init__(self):
-        self.front_sensor = None
-        self.rear_sensor = None
-        
-        if settings.MOCK_MODE or DistanceSensor is None:
+        self.value = random.uniform(0.5, 2.0)
+
+    def measure(self, timeout):
+        self.value = min(MAX_DISTANCE, max(0.05, self.value + random.gauss(0, 0.02)))
+        if random.random() < 0.02:
+            return None
+        return self.value + random.gauss(0, 0.01)
+
+    def close(self):
+        pass
+
+class _SimEcho:
+    """Range from the simulator's ray cast (see app.sim.simulator)."""
+    def __init__(self, sim, name):
+        self.sim = sim
+        self.name = name
+
+    def measure(self, timeout):
+        return self.sim.range(self.name)
+
+    def close(self):
+        pass
+
+class UltrasonicSystem:
+    """
+    Front and rear ultrasonic sensors sampled by one background thread.
+
+    The sensors are triggered in turn, one per `slot_time`, so one sensor's
+    echo has died down before the other fires (no cross-talk). Each sample
+    goes through a running median and an EMA, and the result is published
+    as a new UltrasonicReading object per sensor; readers just pick up the
+    current reference, so get_distances() never blocks.
+    """
+    SENSORS = (("front", 22, 27), ("rear", 18, 25)) # name, echo, trigger
+
+    def __init__(self, slot_time: float = None, median: int = None, ema_alpha: float = None):
+        self.slot_time = slot_time or settings.ULTRASONIC_SLOT_TIME
+        self.ema_alpha = ema_alpha or settings.ULTRASONIC_EMA_ALPHA
+        median = median or settings.ULTRASONIC_MEDIAN
+        self.sensors = {}
+        self.readings = {}
+        self._windows = {}
+        self.stats = {}
+        self._listeners = []
+
+        sim = None
+        mock = settings.MOCK_MODE or DigitalInputDevice is None
+        if settings.SIMULATION:
+            from app.sim.simulator import get_simulator
+            sim = get_simulator()
+            print("UltrasonicSystem reading the simulator")
+        elif mock:
             print("UltrasonicSystem started in MOCK mode")
-            return
+        for name, echo, trigger in self.SENSORS:
+            if sim:
+                self.sensors[name] = _SimEcho(sim, name)
+            elif mock:
+                self.sensors[name] = _MockEcho()
+            else:
+                try:
+                    self.sensors[name] = _EchoSensor(echo, trigger)
+                    print(f"{name.capitalize()} Ultrasonic Sensor initialized (Trigger {trigger}, Echo {echo})")
+                except Exception as e:
+                    print(f"Failed to initialize {name} ultrasonic: {e}")
+                    continue
+            self.readings[name] = UltrasonicReading(None, None, 0.0)
+            self._windows[name] = deque(maxlen=median)
+            self.stats[name] = {"samples": 0, "dropouts": 0, "out_of_range": 0, "rate_hz": 0.0}
 
-        # Initialize Front Sensor (Trigger 27, Echo 22)
-        try:
-            self.front_sensor = DistanceSensor(echo=22, trigger=27, max_distance=3)
-            print("Front Ultrasonic Sensor initialized")
-        except Exception as e:
-            print(f"Failed to initialize front ultrasonic: {e}")
+        self._rate_window = {name: deque(maxlen=20) for name in self.sensors}
+        # Echo timeout: round trip at max range plus margin, within the slot
+        self._timeout = min(self.slot_time, 2 * MAX_DISTANCE / SPEED_OF_SOUND + 0.005)
+        self._next_sensor = 0
+        self.is_running = True
+        self._thread = None
+        if not clock.is_virtual(): # on a virtual clock the simulator calls sample_next()
+            self._thread = threading.Thread(target=self._sample_loop, daemon=True)
+            self._thread.start()
 
-        # Initialize Rear Sensor (Trigger 25, Echo 18)
+    def sample_next(self):
+        """Trigger the next sensor in turn and record its reading (one slot)."""
+        names = list(self.sensors)
+        if not names:
+            return
+        name = names[self._next_sensor % len(names)]
+        self._next_sensor += 1
         try:
-            self.rear_sensor = DistanceSensor(echo=18, trigger=25, max_distance=3)
-            print("Rear Ultrasonic Sensor initialized")
-        except Exception as e:
-            print(f"Failed to initialize rear ultrasonic: {e}")
+            distance = self.sensors[name].measure(self._timeout)
+        except Exception:
+            distance = None
+        self._record(name, distance, clock.monotonic())
+
+    def _sample_loop(self):
+        if not self.sensors:
+            return
+        next_slot = clock.monotonic()
+        while self.is_running:
+            self.sample_next()
+
+            next_slot += self.slot_time
+            delay = next_slot - clock.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                next_slot = clock.monotonic()
+
+    def _record(self, name, distance, now):
+        stats = self.stats[name]
+        if distance is None:
+            stats["dropouts"] += 1
+            return
+        if distance >= MAX_DISTANCE:
+            stats["out_of_range"] += 1
+        stats["samples"] += 1
+        rate_window = self._rate_window[name]
+        rate_window.append(now)
+        if len(rate_window) > 1:
+            stats["rate_hz"] = round((len(rate_window) - 1) / (rate_window[-1] - rate_window[0]), 1)
+
+        raw = distance * 100
+        window = self._windows[name]
+        window.append(raw)
+        median = sorted(window)[len(window) // 2]
+        previous = self.readings[name].distance
+        filtered = median if previous is None else previous + self.ema_alpha * (median - previous)
+        # Single reference swap: readers see either the old or the new reading
+        reading = self.readings[name] = UltrasonicReading(round(filtered, 1), round(raw, 1), now)
+        for listener in self._listeners:
+            listener(name, reading)
+
+    def add_listener(self, callback):
+        """Call `callback(name, reading)` for every new reading (on the sampler thread)."""
+        self._listeners.append(callback)
 
     def get_distances(self):
-        """Returns dict with front and rear distances in cm"""
-        if settings.MOCK_MODE:
-            import random
-            return {
-                "front": round(random.uniform(10, 200), 1),
-                "rear": round(random.uniform(10, 200), 1)
-            }
-            
-        distances = {
-            "front": None,
-            "rear": None
-        }
-
-        if self.front_sensor:
-            try:
-                distances["front"] = round(self.front_sensor.distance * 100, 1)
-            except Exception:
-                pass
-                
-        if self.rear_sensor:
-            try:
-                distances["rear"] = round(self.rear_sensor.distance * 100, 1)
-            except Exception:
-                pass
-                
+        """Returns dict with front and rear distances in cm (latest filtered values, non-blocking)"""
+        distances = {"front": None, "rear": None}
+        for name, reading in self.readings.items():
+            distances[name] = reading.distance
         return distances
 
-    def close(self):
-        if self.front_sensor:
-            self.front_sensor.close()
-        if self.rear_sensor:
-            self.rear_sensor.close()
-
+    def get_readings(self):
+        """Latest UltrasonicReading per sensor, with timestamps."""
+        return dict(self.readings)
 
+    def get_stats(self):
+        return {name: dict(stats) for name, stats in self.stats.items()}
 
+    def close(self):
+        self.is_running = False
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+        for sensor in self.sensors.values():
+            sensor.close()
@@ -0,0 +1,183 @@
+import math
+import threading
+import time
+from collections import deque
+import numpy as np
+from app.core import clock
+from app.core.config import settings
+
+class MotionControlLoop:
+    """
+    Fixed-rate loop (settings.MOTION_LOOP_HZ) that owns the MotorController.
+
+    Producers never touch the motors: they write a setpoint with a time-to-live
+    via move()/set_tracks(). Every tick the loop
+    - zeroes the target once the setpoint has expired (deadman watchdog),
+    - moves each track towards its target under acceleration and jerk limits,
+    - writes the PWM only when the output actually changed.
+    halt() bypasses the ramp for emergency and cliff stops.
+    """
+    def __init__(self, motors, rate: float = None, ttl: float = None, max_accel: float = None, max_jerk: float = None):
+        self.motors = motors
+        self.rate = rate or settings.MOTION_LOOP_HZ
+        self.ttl = ttl or settings.MOTION_SETPOINT_TTL
+        self.max_accel = max_accel or settings.MOTION_MAX_ACCEL # track units / s^2
+        self.max_jerk = max_jerk or settings.MOTION_MAX_JERK    # track units / s^3
+
+        self.lock = threading.Lock()
+        self.target = (0.0, 0.0)   # (left, right) setpoint
+        self.expires_at = 0.0      # clock.monotonic() deadline of the setpoint
+        self.source = None
+        self._halt = False
+        self.output = [0.0, 0.0]   # current track values
+        self.accel = [0.0, 0.0]
+        self._written = None
+        self.watchdog_active = False
+        self._listeners = []
+
+        self.is_running = False
+        self._thread = None
+        self._jitter = deque(maxlen=1000) # tick lateness in seconds
+        self.stats = {"ticks": 0, "overruns": 0, "watchdog_trips": 0, "setpoints": 0, "writes": 0}
+
+    # --- Producers (any thread) ---
+
+    def set_tracks(self, left: float, right: float, ttl: float = None, source: str = None):
+        """Ask for track values (-1..1) for the next `ttl` seconds (default settings.MOTION_SETPOINT_TTL)."""
+        with self.lock:
+            self.target = (max(-1.0, min(1.0, left)), max(-1.0, min(1.0, right)))
+            self.expires_at = clock.monotonic() + (ttl if ttl is not None else self.ttl)
+            self.source = source
+            self.stats["setpoints"] += 1
+
+    def move(self, x: float, y: float, ttl: float = None, source: str = None):
+        """Arcade-drive setpoint, same convention as MotorController.move."""
+        self.set_tracks(*self.motors.mix(x, y), ttl=ttl, source=source)
+
+    def stop(self):
+        """Ramp down to standstill."""
+        with self.lock:
+            self.target = (0.0, 0.0)
+            self.expires_at = 0.0
+
+    def halt(self):
+        """Cut the motors now, without ramping."""
+        with self.lock:
+            self.target = (0.0, 0.0)
+            self.expires_at = 0.0
+            self._halt = True
+        if not self.is_running:
+            self._apply_halt()
+
+    def add_listener(self, callback):
+        """Call `callback(left, right, timestamp)` whenever new track values are written."""
+        self._listeners.append(callback)
+
+    def _notify(self, left, right):
+        now = clock.monotonic()
+        for listener in self._listeners:
+            listener(left, right, now)
+
+    # --- Loop ---
+
+    def start(self):
+        if self.is_running:
+            return
+        self.is_running = True
+        if clock.is_virtual():
+            return # the simulator calls tick() on the virtual clock
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        print(f"Motion control loop started at {self.rate:.0f} Hz")
+
+    def close(self):
+        self.is_running = False
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+        self._apply_halt()
+
+    def _apply_halt(self):
+        self.output = [0.0, 0.0]
+        self.accel = [0.0, 0.0]
+        self._written = (0.0, 0.0)
+        self.motors.stop()
+        self._notify(0.0, 0.0)
+
+    def _run(self):
+        period = 1.0 / self.rate
+        next_tick = clock.monotonic()
+        last = next_tick
+        while self.is_running:
+            now = clock.monotonic()
+            if now < next_tick:
+                time.sleep(next_tick - now)
+                now = clock.monotonic()
+            self._jitter.append(now - next_tick)
+            next_tick += period
+            if now - next_tick > period:
+                # Fell more than a tick behind: resync instead of bursting to catch up
+                self.stats["overruns"] += 1
+                next_tick = now + period
+            self.tick(now, now - last)
+            last = now
+
+    def tick(self, now: float, dt: float):
+        with self.lock:
+            target = self.target
+            expired = now >= self.expires_at
+            halt, self._halt = self._halt, False
+
+        self.stats["ticks"] += 1
+        if halt:
+            self._apply_halt()
+            return
+
+        if expired:
+            target = (0.0, 0.0)
+            if not self.watchdog_active and (self.output[0] or self.output[1]):
+                self.stats["watchdog_trips"] += 1
+                self.watchdog_active = True
+        else:
+            self.watchdog_active = False
+
+        dt = min(max(dt, 1e-4), 0.1)
+        for i in (0, 1):
+            self.output[i], self.accel[i] = self._ramp(self.output[i], self.accel[i], target[i], dt)
+
+        output = (round(self.output[0], 3), round(self.output[1], 3))
+        if output != self._written:
+            self.motors.set_tracks(*output)
+            self._written = output
+            self.stats["writes"] += 1
+            self._notify(*output)
+
+    def _ramp(self, value, accel, target, dt):
+        """One jerk- and acceleration-limited step of `value` towards `target`."""
+        error = target - value
+        max_step = self.max_jerk * dt
+        if abs(error) < 1e-3 and abs(accel) <= max_step:
+            # Close enough, and dropping the remaining acceleration is within one jerk step
+            return target, 0.0
+        # Highest acceleration from which the jerk limit still brings it back to zero
+        # by the time the target is reached (a^2 / 2J + a * dt = remaining distance,
+        # the a * dt allowing for the one-tick lag), so the ramp eases off early and
+        # lands on the target instead of arriving at full acceleration
+        J = self.max_jerk
+        braking = J * (math.sqrt(dt * dt + 2 * abs(error) / J) - dt)
+        wanted = min(self.max_accel, braking, abs(error) / dt)
+        wanted = math.copysign(wanted, error)
+        accel = accel + max(-max_step, min(max_step, wanted - accel))
+        value = max(-1.0, min(1.0, value + accel * dt))
+        return value, accel
+
+    def get_stats(self) -> dict:
+        jitter = np.array(self._jitter) * 1000 if self._jitter else np.zeros(1)
+        return dict(self.stats,
+                    rate_hz=self.rate,
+                    jitter_mean_ms=round(float(jitter.mean()), 3),
+                    jitter_p99_ms=round(float(np.percentile(jitter, 99)), 3),
+                    jitter_max_ms=round(float(jitter.max()), 3),
+                    output=list(self._written or (0.0, 0.0)),
+                    watchdog_active=self.watchdog_active,
+                    source=self.source)
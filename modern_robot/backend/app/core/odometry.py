@@ -0,0 +1,175 @@
+import asyncio
+import json
+import math
+import threading
+import numpy as np
+from app.core import clock
+from app.core.config import settings
+
+class CalibrationTable:
+    """
+    Commanded track value (-1..1) -> ground speed (m/s), per track, as
+    piecewise-linear tables of (value, speed) points for positive values;
+    negative values mirror them. The default is linear up to
+    settings.DRIVE_MAX_SPEED with a small deadband where the motors stall.
+    """
+    def __init__(self, left=None, right=None):
+        default = [(0.0, 0.0), (0.15, 0.0), (1.0, settings.DRIVE_MAX_SPEED)]
+        self.tables = {"left": sorted(left or default), "right": sorted(right or default)}
+
+    def speed(self, track, value):
+        points = self.tables[track]
+        xs = [p[0] for p in points]
+        ys = [p[1] for p in points]
+        return math.copysign(float(np.interp(abs(value), xs, ys)), value)
+
+    def set(self, track, points):
+        self.tables[track] = sorted((float(v), float(s)) for v, s in points)
+
+    @classmethod
+    def load(cls, path):
+        try:
+            with open(path) as f:
+                data = json.load(f)
+            return cls(data.get("left"), data.get("right"))
+        except (OSError, ValueError):
+            return cls()
+
+    def save(self, path):
+        with open(path, "w") as f:
+            json.dump(self.tables, f, indent=2)
+
+class Odometry:
+    """
+    Dead-reckoned pose (x, y in metres, theta in radians, counter-clockwise)
+    integrated from the commanded track values. Each update() integrates the
+    previous command over the elapsed time (the motors hold it until the next
+    write) along the exact arc for a differential drive.
+    """
+    def __init__(self, calibration: CalibrationTable = None, track_width: float = None, history: int = None):
+        self.calibration = calibration or CalibrationTable.load(settings.ODOM_CALIBRATION_FILE)
+        self.track_width = track_width or settings.DRIVE_TRACK_WIDTH
+        self.lock = threading.Lock()
+        self.x = self.y = self.theta = 0.0
+        self.distance = 0.0           # total path length (m)
+        self.command = (0.0, 0.0)     # track values in effect since `timestamp`
+        self.timestamp = None
+        size = history or settings.WORLD_HISTORY
+        self._history = np.zeros((size, 4), dtype=np.float64) # t, x, y, theta
+        self._index = 0
+        self._count = 0
+
+    def velocities(self, left, right):
+        """(linear m/s, angular rad/s) for a pair of track values."""
+        vl = self.calibration.speed("left", left)
+        vr = self.calibration.speed("right", right)
+        return (vl + vr) / 2, (vr - vl) / self.track_width
+
+    def _integrate(self, now):
+        if self.timestamp is None:
+            return
+        dt = now - self.timestamp
+        if dt <= 0:
+            return
+        v, w = self.velocities(*self.command)
+        if abs(w) < 1e-6:
+            self.x += v * dt * math.cos(self.theta)
+            self.y += v * dt * math.sin(self.theta)
+        else:
+            # Exact arc: radius v / w around the instantaneous centre
+            theta = self.theta + w * dt
+            self.x += v / w * (math.sin(theta) - math.sin(self.theta))
+            self.y -= v / w * (math.cos(theta) - math.cos(self.theta))
+            self.theta = theta
+        self.distance += abs(v) * dt
+
+    def update(self, left, right, timestamp=None):
+        """New commanded track values (MotionControlLoop listener signature)."""
+        now = timestamp if timestamp is not None else clock.monotonic()
+        with self.lock:
+            self._integrate(now)
+            self.command = (left, right)
+            self.timestamp = now
+            self._history[self._index] = (now, self.x, self.y, self.theta)
+            self._index = (self._index + 1) % len(self._history)
+            self._count = min(self._count + 1, len(self._history))
+
+    def pose(self, timestamp=None):
+        """(x, y, theta) at `timestamp` (default now), extrapolating the current command."""
+        now = timestamp if timestamp is not None else clock.monotonic()
+        with self.lock:
+            saved = (self.x, self.y, self.theta, self.distance, self.timestamp)
+            self._integrate(now)
+            pose = (self.x, self.y, self.theta)
+            self.x, self.y, self.theta, self.distance, self.timestamp = saved
+        return pose
+
+    @property
+    def heading(self) -> float:
+        return self.pose()[2]
+
+    def history(self):
+        """N x 4 array of (t, x, y, theta) at each command change, oldest first."""
+        with self.lock:
+            n = self._count
+            order = (np.arange(n) + self._index - n) % len(self._history)
+            return self._history[order].copy()
+
+    def reset(self, x=0.0, y=0.0, theta=0.0):
+        with self.lock:
+            self._integrate(clock.monotonic())
+            self.x, self.y, self.theta = x, y, theta
+            self.distance = 0.0
+            self.timestamp = clock.monotonic() if self.timestamp is not None else None
+
+    def to_dict(self) -> dict:
+        x, y, theta = self.pose()
+        return {"x": round(x, 3), "y": round(y, 3), "theta": round(math.degrees(theta) % 360, 1),
+                "distance": round(self.distance, 3)}
+
+async def calibrate(drive, front, values=(0.2, 0.4, 0.6, 0.8, 1.0), duration=0.6, settle=0.4):
+    """
+    Fill the calibration table from straight runs towards a wall.
+
+    For each track value the robot drives straight ahead; once the
+    motion loop's acceleration ramp is over (plus `settle` seconds for the
+    motors and the ultrasonic filter) it measures for `duration` seconds,
+    taking the speed from the change in the filtered front ultrasonic
+    distance (`front` is the world-state Signal) between the reading
+    timestamps. Then it backs up by the same amount. Needs about a metre
+    of free space in front of a flat wall. Both tracks get the same table;
+    per-track differences can be entered by hand in
+    settings.ODOM_CALIBRATION_FILE.
+
+    Returns None, leaving the saved calibration alone, if fewer than two
+    track values gave a speed.
+    """
+    points = [(0.0, 0.0)]
+    for value in values:
+        # Time for the jerk-limited ramp to reach `value`, which must not count as cruising
+        ramp = value / drive.max_accel + drive.max_accel / drive.max_jerk + settle
+        run = ramp + duration
+        await asyncio.sleep(settle)
+        drive.move(0, value, ttl=run)
+        await asyncio.sleep(ramp)
+        before, before_time = front.latest
+        await asyncio.sleep(duration)
+        after, after_time = front.latest
+        drive.stop()
+        if before is None or after is None or after_time <= before_time:
+            print(f"Calibration: no ultrasonic reading at {value}, skipped")
+        else:
+            speed = (before - after) / 100 / (after_time - before_time)
+            if speed > 0:
+                points.append((value, round(speed, 4)))
+            print(f"Calibration: track value {value} -> {speed:.3f} m/s")
+        await asyncio.sleep(settle)
+        drive.move(0, -value, ttl=run)
+        await asyncio.sleep(run)
+        drive.stop()
+    if len(points) < 3:
+        print("Calibration: fewer than two speeds measured, keeping the previous table")
+        return None
+    table = CalibrationTable(points, points)
+    table.save(settings.ODOM_CALIBRATION_FILE)
+    return table
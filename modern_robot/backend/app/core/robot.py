@@ -1,9 +1,18 @@
 from typing import Dict, Any, Optional
 import asyncio
+import threading
+import time
 from enum import Enum
+from app.core import clock
 from app.core.config import settings
 from app.services.ai_service import AIService
+from app.services.command_scheduler import CommandScheduler
+from app.services.obstacle_avoidance import ObstacleAvoidancePlanner, ESCAPE, SCAN
+from app.services.telemetry import TelemetryRecorder
 from app.core.hardware.motors import MotorController
+from app.core.motion_control import MotionControlLoop
+from app.core.odometry import Odometry, calibrate
+from app.core.world_state import WorldState
 from app.core.hardware.servos import ServoController
 from app.core.hardware.camera import CameraManager
 from app.core.hardware.ultrasonic import UltrasonicSystem
@@ -15,7 +24,34 @@ class AutonomyLevel(str, Enum):
     SEMI_AUTO = "semi"
     FULL_AUTO = "auto"
 
+class LazySubsystem:
+    """
+    Robot attribute whose subsystem is constructed on first access, so that
+    importing app.core.robot touches no hardware and loads no models.
+    """
+    def __init__(self, factory):
+        self.factory = factory
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, robot, owner=None):
+        if robot is None:
+            return self
+        return robot._subsystem(self.name, self.factory)
+
 class Robot:
+    # Hardware brought up concurrently during startup; everything else (AI) waits for first use
+    HARDWARE = ("motors", "servos", "camera_manager", "ultrasonic", "infrared", "leds")
+
+    motors = LazySubsystem(MotorController)
+    servos = LazySubsystem(ServoController)
+    camera_manager = LazySubsystem(CameraManager)
+    ultrasonic = LazySubsystem(UltrasonicSystem)
+    infrared = LazySubsystem(InfraredSystem)
+    leds = LazySubsystem(LedController)
+    ai_service = LazySubsystem(AIService)
+
     def __init__(self):
         self.state = {
             "autonomy_level": AutonomyLevel.MANUAL,
@@ -31,26 +67,105 @@ class Robot:
         self.line_tracking_task = None
         self.obstacle_avoidance_task = None
         
-        # Initialize subsystems
-        self.motors = MotorController()
-        self.servos = ServoController()
-        self.camera_manager = CameraManager()
-        self.ultrasonic = UltrasonicSystem()
-        self.infrared = InfraredSystem()
-        self.leds = LedController()
-        self.ai_service = AIService()
+        # Subsystems are created lazily (see LazySubsystem) or by initialize()
+        self._subsystems = {}
+        self._init_locks = {}
+        self._init_locks_lock = threading.Lock()
+        self.init_timings = {} # subsystem -> construction time in ms
         self.emit_status_callback = None
-        
-        print(f"Robot initialized in {'MOCK' if settings.MOCK_MODE else 'REAL'} mode.")
+        # Timestamped sensor/actuator signals, fed by the subsystems as they come up
+        self.world = WorldState()
+        self.world.battery.set(self.state["battery"])
+        # Dead-reckoned pose from the commanded track values
+        self.odometry = Odometry()
+        # Inbound commands go through here: priority classes, latest-wins moves
+        self.commands = CommandScheduler(self.execute_command)
+        # Flight recorder (settings.TELEMETRY_ENABLED), started in start()
+        self.telemetry = None
+        self._recorded_mode = None
+        self._last_keyframe = 0.0
+        self._keyframe_frames = False # holding acquire_frames() for keyframes
+
+    def _subsystem(self, name, factory):
+        subsystem = self._subsystems.get(name)
+        if subsystem is not None:
+            return subsystem
+        # One lock per subsystem so different subsystems can initialize in parallel
+        with self._init_locks_lock:
+            lock = self._init_locks.setdefault(name, threading.Lock())
+        with lock:
+            subsystem = self._subsystems.get(name)
+            if subsystem is None:
+                start = time.perf_counter()
+                subsystem = factory()
+                setup = getattr(self, f"_setup_{name}", None)
+                if setup:
+                    setup(subsystem)
+                self.init_timings[name] = round((time.perf_counter() - start) * 1000, 1)
+                self._subsystems[name] = subsystem
+        return subsystem
+
+    def _setup_motors(self, motors):
+        # The control loop is the only writer to the motors; see MotionControlLoop
+        self._drive = MotionControlLoop(motors)
+        self._drive.add_listener(self.world.on_motor_output)
+        self._drive.add_listener(self.odometry.update)
+
+    def _setup_ultrasonic(self, ultrasonic):
+        ultrasonic.add_listener(self.world.on_ultrasonic)
+
+    def _setup_infrared(self, infrared):
+        self.world.on_infrared(infrared.state, infrared.changed_at)
+        infrared.add_listener(self.world.on_infrared)
+
+    @property
+    def drive(self) -> MotionControlLoop:
+        """Motion setpoints go here (move/stop/halt), never to self.motors directly."""
+        # The loop is created by _setup_motors when the motors come up
+        self._subsystem("motors", MotorController)
+        return self._drive
+
+    def _setup_camera_manager(self, camera_manager):
+        # Annotated video draws the newest detections; only runs while that stream is watched
+        camera_manager.set_overlay('front', self._annotate_frame)
+
+    async def initialize(self, names=HARDWARE):
+        """Construct the given subsystems concurrently in executor threads."""
+        loop = asyncio.get_running_loop()
+        start = time.perf_counter()
+        await asyncio.gather(*(loop.run_in_executor(None, getattr, self, name) for name in names))
+        self.init_timings["total"] = round((time.perf_counter() - start) * 1000, 1)
+        print(f"Robot initialized in {'SIMULATION' if settings.SIMULATION else 'MOCK' if settings.MOCK_MODE else 'REAL'} mode "
+              f"({self.init_timings['total']} ms).")
+
+    def get_init_timings(self) -> Dict[str, Any]:
+        timings = dict(self.init_timings)
+        ai_service = self._subsystems.get("ai_service")
+        if ai_service is not None and ai_service.load_time_ms is not None:
+            timings["ai_backend"] = ai_service.load_time_ms
+        return timings
 
     def set_emit_status_callback(self, callback):
         self.emit_status_callback = callback
 
     async def start(self):
+        if settings.TELEMETRY_ENABLED and self.telemetry is None:
+            self.telemetry = TelemetryRecorder()
+            self.telemetry.start()
+            self.world.subscribe(self.telemetry.on_signal)
+            self._record_mode()
+        await self.initialize()
         self.is_running = True
+        self.drive.start()
         print("Robot systems started.")
-        self.camera_manager.start()
+        # Opening the camera blocks for a while; keep it off the event loop
+        await asyncio.get_running_loop().run_in_executor(None, self.camera_manager.start)
+        if self.telemetry and settings.TELEMETRY_KEYFRAME_INTERVAL > 0:
+            # Keyframes are BGR arrays, which native JPEG mode only builds while someone asks
+            self.camera_manager.acquire_frames('front')
+            self._keyframe_frames = True
         await self.leds.start()
+        # Starts the inference worker only; the model itself loads on the first detection
         await self.ai_service.start()
         
         # Set default LED state
@@ -61,13 +176,22 @@ class Robot:
 
     async def stop(self):
         self.is_running = False
-        await self.ai_service.stop()
-        self.camera_manager.stop()
-        self.motors.stop()
-        self.servos.stop()
-        self.ultrasonic.close()
-        self.infrared.close()
-        await self.leds.stop()
+        await self.commands.stop()
+        # Only shut down what was actually brought up
+        subsystems = self._subsystems
+        if "ai_service" in subsystems: await subsystems["ai_service"].stop()
+        if self._keyframe_frames:
+            subsystems["camera_manager"].release_frames('front')
+            self._keyframe_frames = False
+        if "camera_manager" in subsystems: subsystems["camera_manager"].stop()
+        if "motors" in subsystems:
+            self._drive.close()
+            subsystems["motors"].stop()
+        if "servos" in subsystems: subsystems["servos"].stop()
+        if "ultrasonic" in subsystems: subsystems["ultrasonic"].close()
+        if "infrared" in subsystems: subsystems["infrared"].close()
+        if "leds" in subsystems: await subsystems["leds"].stop()
+        if self.telemetry: self.telemetry.close()
         print("Robot systems stopped.")
 
     def get_state(self) -> Dict[str, Any]:
@@ -77,6 +201,7 @@ class Robot:
         if level in [l.value for l in AutonomyLevel]:
             old_level = self.state["autonomy_level"]
             self.state["autonomy_level"] = level
+            self._record_mode()
             print(f"Autonomy level set to: {level}")
             
             # Transition Logic
@@ -85,33 +210,41 @@ class Robot:
                  print("Entering FULL_AUTO: Starting Obstacle Avoidance")
                  # We use create_task because this isn't an async method
                  loop = asyncio.get_event_loop()
-                 loop.create_task(self.execute_command({'command': 'obstacle_avoidance'}))
+                 loop.create_task(self.commands.submit({'command': 'obstacle_avoidance'}))
                  
             elif old_level == AutonomyLevel.FULL_AUTO and level != AutonomyLevel.FULL_AUTO:
                  # Stop any auto tasks when leaving Auto
                  print("Leaving FULL_AUTO: Stopping tasks")
                  loop = asyncio.get_event_loop()
                  loop.create_task(self._cancel_tasks())
-                 self.motors.stop()
+                 self.drive.stop()
                  
         else:
             print(f"Invalid autonomy level: {level}")
 
+    def _annotate_frame(self, frame):
+        # Don't pull the AI service in just to draw nothing
+        ai_service = self._subsystems.get("ai_service")
+        result = ai_service.latest_result if ai_service is not None else None
+        if result is None or result.age > settings.AI_RESULT_MAX_AGE:
+            return frame
+        return ai_service.annotate(frame, result.detections)
+
     def _check_cliff(self) -> bool:
         """
         Returns True if any infrared sensor detects a cliff (no reflection/active).
         Note: LineSensor logic -> Active (True) = Black/No Reflection.
         In normal usage (white table), active means Cliff or Black Line.
         """
-        sensors = self.infrared.get_values()
-        # If any sensor is True (Active), it means no reflection -> Cliff
-        if any(sensors):
-            return True
-        return False
+        # If any sensor is Active (bit set), it means no reflection -> Cliff.
+        # The packed state is kept current by edge interrupts, so this is just a read.
+        return self.infrared.state != 0
 
     async def execute_command(self, command_data: Dict[str, Any]):
         cmd = command_data.get('command')
         params = command_data.get('params', {})
+        if self.telemetry:
+            self.telemetry.command(command_data)
         
         # print(f"Executing command: {cmd} with params: {params}")
         
@@ -123,8 +256,11 @@ class Robot:
                 print(f"Ignored manual command '{cmd}' in FULL_AUTO mode")
                 return
 
+        if cmd == "emergency_stop":
+            await self._stop_movement()
+
         # Stop special tasks if manual move
-        if cmd == "move":
+        elif cmd == "move":
             await self._cancel_tasks()
             await self._handle_move(params)
             
@@ -158,7 +294,7 @@ class Robot:
             if self.tracking_task and not self.tracking_task.done():
                 self.tracking_task.cancel()
                 self.tracking_task = None
-                self.state["status"] = "standby"
+                self._set_status("standby")
                 if self.emit_status_callback: await self.emit_status_callback(self.state)
             else:
                 await self._cancel_tasks()
@@ -168,7 +304,7 @@ class Robot:
              if self.line_tracking_task and not self.line_tracking_task.done():
                  self.line_tracking_task.cancel()
                  self.line_tracking_task = None
-                 self.state["status"] = "standby"
+                 self._set_status("standby")
              else:
                  await self._cancel_tasks()
                  self.line_tracking_task = asyncio.create_task(self._line_tracking_loop())
@@ -177,7 +313,7 @@ class Robot:
              if self.obstacle_avoidance_task and not self.obstacle_avoidance_task.done():
                  self.obstacle_avoidance_task.cancel()
                  self.obstacle_avoidance_task = None
-                 self.state["status"] = "standby"
+                 self._set_status("standby")
              else:
                  await self._cancel_tasks()
                  self.obstacle_avoidance_task = asyncio.create_task(self._obstacle_avoidance_loop())
@@ -217,7 +353,7 @@ class Robot:
         # Allow reversing (y < 0) to escape cliff.
         if (y > 0 or (x != 0 and y == 0)) and self._check_cliff():
             print("Cliff detected! Stopping/Preventing movement.")
-            self.motors.stop()
+            self.drive.halt()
             # Maybe back up slightly automatically?
             # self.motors.move(0, -0.2)
             # await asyncio.sleep(0.1)
@@ -226,27 +362,33 @@ class Robot:
         
         # Situational Awareness / Collision Avoidance for Manual Mode if in Semi/Auto
         if self.state["autonomy_level"] in [AutonomyLevel.SEMI_AUTO, AutonomyLevel.FULL_AUTO]:
-            distances = self.state["sensors"].get("ultrasonic", {})
-            front_dist = distances.get("front")
-            rear_dist = distances.get("rear")
+            front = self.world.ultrasonic_front
+            rear = self.world.ultrasonic_rear
+            # Don't drive towards a side whose sensor has gone quiet or never reported
+            if (y > 0 and not front.is_fresh()) or (y < 0 and not rear.is_fresh()):
+                print("Ultrasonic data stale. Refusing movement.")
+                self.drive.halt()
+                return
+            front_dist = front.get()
+            rear_dist = rear.get()
             
             # Stop if too close (< 15cm)
             if y > 0 and front_dist is not None and front_dist < 15:
                 # Allow reversing
-                self.motors.stop()
+                self.drive.halt()
                 return
 
             if y < 0 and rear_dist is not None and rear_dist < 15:
                 # Allow going forward
-                self.motors.stop()
+                self.drive.halt()
                 return
 
         if x == 0 and y == 0:
-             self.state["status"] = "standby"
-             self.motors.stop()
+             self._set_status("standby")
+             self.drive.stop()
         else:
-             self.state["status"] = "moving"
-             self.motors.move(x, y)
+             self._set_status("moving")
+             self.drive.move(x, y)
              
         if self.emit_status_callback:
             await self.emit_status_callback(self.state)
@@ -261,7 +403,7 @@ class Robot:
         joint = params.get('joint') # 'lift' or 'claw'
         value = params.get('value') # 0-180
         
-        self.state["status"] = "operating arm"
+        self._set_status("operating arm")
         if self.emit_status_callback: await self.emit_status_callback(self.state)
         
         servo_map = {'lift': 'arm_lift', 'claw': 'claw'}
@@ -269,12 +411,12 @@ class Robot:
             self.servos.set_angle(servo_map[joint], value)
             
         await asyncio.sleep(0.5)
-        self.state["status"] = "standby"
+        self._set_status("standby")
         if self.emit_status_callback: await self.emit_status_callback(self.state)
 
     async def _handle_drop(self):
         print("Dropping object...")
-        self.state["status"] = "dropping"
+        self._set_status("dropping")
         if self.emit_status_callback: await self.emit_status_callback(self.state)
 
         # 1. Lower Arm
@@ -294,12 +436,12 @@ class Robot:
             self.servos.set_angle("arm_lift", i)
             await asyncio.sleep(0.01)
             
-        self.state["status"] = "standby"
+        self._set_status("standby")
         if self.emit_status_callback: await self.emit_status_callback(self.state)
 
     async def _auto_pickup_sequence(self):
         print("Starting auto pickup sequence...")
-        self.state["status"] = "pickup_approach"
+        self._set_status("pickup_approach")
         if self.emit_status_callback: await self.emit_status_callback(self.state)
         
         try:
@@ -308,7 +450,7 @@ class Robot:
                 # CLIFF CHECK
                 if self._check_cliff():
                     print("Cliff detected during pickup! Stopping.")
-                    self.motors.stop()
+                    self.drive.halt()
                     break
 
                 distances = self.ultrasonic.get_distances()
@@ -319,21 +461,21 @@ class Robot:
                     continue
                 
                 if dist <= 5:
-                    self.motors.move(0, -0.4) # Backup slowly
+                    self.drive.move(0, -0.4) # Backup slowly
                 elif dist > 5 and dist < 7.5:
-                     self.motors.move(0, -0.3) # Backup very slowly
+                     self.drive.move(0, -0.3) # Backup very slowly
                 elif dist >= 7.5 and dist <= 8.5:
-                     self.motors.stop()
+                     self.drive.stop()
                      break # In position
                 elif dist > 8.5 and dist < 15:
-                     self.motors.move(0, 0.3) # Forward slowly
+                     self.drive.move(0, 0.3) # Forward slowly
                 elif dist >= 15:
-                     self.motors.move(0, 0.5) # Forward
+                     self.drive.move(0, 0.5) # Forward
                      
                 await asyncio.sleep(0.1)
             
-            self.motors.stop()
-            self.state["status"] = "pickup_lifting"
+            self.drive.stop()
+            self._set_status("pickup_lifting")
             if self.emit_status_callback: await self.emit_status_callback(self.state)
             
             # 2. Lift Sequence
@@ -360,222 +502,216 @@ class Robot:
                 await asyncio.sleep(0.01)
                 
             print("Pickup complete")
-            self.state["status"] = "holding"
+            self._set_status("holding")
             if self.emit_status_callback: await self.emit_status_callback(self.state)
 
         except asyncio.CancelledError:
             print("Pickup sequence cancelled")
-            self.motors.stop()
-            self.state["status"] = "standby"
+            self.drive.stop()
+            self._set_status("standby")
         except Exception as e:
             print(f"Pickup error: {e}")
-            self.motors.stop()
-            self.state["status"] = "error"
+            self.drive.stop()
+            self._set_status("error")
 
     async def _track_face_loop(self):
         print("Starting face tracking...")
-        self.state["status"] = "tracking_face"
+        self._set_status("tracking_face")
         self.leds.set_mode("blink", (0, 0, 255)) # Blink Blue
         if self.emit_status_callback: await self.emit_status_callback(self.state)
         
+        last_seq = 0
+        self.ai_service.scheduler.target_label = 'person'
+        self.ai_service.scheduler.reset()
+        self.ai_service.tracker.reset()
+        # In native JPEG mode the camera only produces arrays while someone asks
+        self.camera_manager.acquire_frames('front')
         try:
             while True:
                 # CLIFF CHECK
                 if self._check_cliff():
                     print("Cliff detected during face tracking! Stopping.")
-                    self.motors.stop()
+                    self.drive.halt()
                     await asyncio.sleep(0.5)
                     # Back up a bit?
-                    self.motors.move(0, -0.3)
+                    self.drive.move(0, -0.3, ttl=0.5)
                     await asyncio.sleep(0.5)
-                    self.motors.stop()
+                    self.drive.stop()
                     continue
 
-                frame = self.camera_manager.get_latest_frame('front')
-                if frame is None:
-                    await asyncio.sleep(0.1)
-                    continue
-                
-                _, detections = self.ai_service.process_frame(frame)
-                target = next((d for d in detections if d['label'] == 'person'), None)
+                # Feed the newest camera frame (borrowed ring view, no copy) to the
+                # inference worker; it runs at its own pace off the event loop
+                seq, frame = self.camera_manager.get_latest('front')
+                if frame is not None and seq != last_seq:
+                    last_seq = seq
+                    self.ai_service.submit(seq, frame, self.camera_manager.get_frame_time(seq),
+                                           self.camera_manager.is_frame_valid)
+
+                # Steer from the tracker's prediction at the control rate; it carries
+                # the person between detector runs and drops them once they go stale
+                result = self.ai_service.latest_result
+                target = self.ai_service.track('person')
                 
-                if target:
-                    bbox = target['bbox']
+                if result is not None and target is not None:
+                    _, bbox = target
                     center_x = (bbox[0] + bbox[2]) / 2
-                    frame_width = frame.shape[1]
+                    frame_width = result.frame_shape[1]
                     offset_x = (center_x - frame_width / 2) / (frame_width / 2)
                     
                     if abs(offset_x) < 0.2:
-                        self.motors.move(0, 0)
+                        self.drive.move(0, 0)
                     else:
-                        turn_speed = offset_x * 0.5
-                        self.motors.move(turn_speed, 0)
+                        turn_speed = max(-0.5, min(0.5, offset_x * 0.5))
+                        self.drive.move(turn_speed, 0)
                 else:
-                    self.motors.stop()
+                    self.drive.stop()
                 
-                await asyncio.sleep(0.1)
+                await asyncio.sleep(0.05)
 
         except asyncio.CancelledError:
             print("Tracking cancelled")
-            self.motors.stop()
+            self.drive.stop()
             self.leds.set_mode("static", (0, 255, 0)) # Back to Green
-            self.state["status"] = "standby"
+            self._set_status("standby")
         except Exception as e:
-            self.motors.stop()
+            self.drive.stop()
+        finally:
+            self.camera_manager.release_frames('front')
 
     async def _line_tracking_loop(self):
         print("Starting line tracking...")
-        self.state["status"] = "line_tracking"
+        self._set_status("line_tracking")
         self.leds.set_mode("static", (255, 255, 0)) # Yellow
         if self.emit_status_callback: await self.emit_status_callback(self.state)
         
         try:
             while True:
-                # Logic from infrared.py / car.py
+                # Logic from infrared.py / car.py (packed state, updated by edge interrupts)
                 ir_val = self.infrared.read_all_infrared_byte()
                 
                 # Using somewhat standardized move params
                 if ir_val == 2: # 010 - Forward
-                    self.motors.move(0, 0.4)
+                    self.drive.move(0, 0.4)
                 elif ir_val == 4: # 100 - Left
-                    self.motors.move(-0.4, 0.2)
+                    self.drive.move(-0.4, 0.2)
                 elif ir_val == 1: # 001 - Right
-                    self.motors.move(0.4, 0.2)
+                    self.drive.move(0.4, 0.2)
                 elif ir_val == 6: # 110 - Sharp Left
-                    self.motors.move(-0.6, 0.1)
+                    self.drive.move(-0.6, 0.1)
                 elif ir_val == 3: # 011 - Sharp Right
-                    self.motors.move(0.6, 0.1)
+                    self.drive.move(0.6, 0.1)
                 elif ir_val == 7: # 111 - Stop (All Black/Line)
-                    self.motors.move(0, 0)
+                    self.drive.move(0, 0)
                 else:
-                    self.motors.move(0, 0)
+                    self.drive.move(0, 0)
                     
-                await asyncio.sleep(0.05)
+                # React to the next sensor edge right away; the timeout keeps the
+                # motion setpoint fresh while the state holds
+                await self.infrared.wait_for_change(ir_val, timeout=0.1)
                 
         except asyncio.CancelledError:
             print("Line tracking cancelled")
-            self.motors.stop()
+            self.drive.stop()
             self.leds.set_mode("static", (0, 255, 0))
-            self.state["status"] = "standby"
+            self._set_status("standby")
 
     async def _obstacle_avoidance_loop(self):
         print("Starting smart obstacle avoidance...")
-        self.state["status"] = "obstacle_avoidance"
+        self._set_status("obstacle_avoidance")
         self.leds.set_mode("static", (255, 0, 0)) # Red
         if self.emit_status_callback: await self.emit_status_callback(self.state)
         
+        # Reactive planner: keeps sampling while it turns instead of stop-and-scan sleeps
+        planner = ObstacleAvoidancePlanner()
+        world = self.world
         try:
             while True:
-                # CLIFF CHECK
-                if self._check_cliff():
-                    print("Cliff detected! Backing up from edge.")
-                    self.motors.stop()
-                    await asyncio.sleep(0.2)
-                    self.motors.move(0, -0.3)
-                    await asyncio.sleep(0.5)
-                    self.motors.move(0.5, 0) # Spin away
-                    await asyncio.sleep(0.5)
-                    continue
-
-                distances = self.ultrasonic.get_distances()
-                front_dist = distances.get("front", 0)
-                rear_dist = distances.get("rear", 0)
-                
-                # Default slow speed
-                speed = 0.25
-                
-                if front_dist and front_dist < 40:
-                    # SLOW DOWN ZONE
-                    speed = 0.15
-                    
-                    if front_dist < 20:
-                        # CRITICAL ZONE - STOP AND THINK
-                        print(f"Obstacle detected at {front_dist}cm. Stopping.")
-                        self.motors.stop()
-                        await asyncio.sleep(0.5)
-                        
-                        # Check Rear for backing up space
-                        can_backup = rear_dist and rear_dist > 30
-                        
-                        # Scan Left (Turn Left briefly)
-                        self.motors.move(-0.3, 0.3) # Rotate Left
-                        await asyncio.sleep(0.4)
-                        self.motors.stop()
-                        await asyncio.sleep(0.2)
-                        distances = self.ultrasonic.get_distances()
-                        left_space = distances.get("front", 0)
-                        
-                        # Scan Right (Turn Right past center)
-                        self.motors.move(0.3, 0.3) # Rotate Right
-                        await asyncio.sleep(0.8) # Double time to go right
-                        self.motors.stop()
-                        await asyncio.sleep(0.2)
-                        distances = self.ultrasonic.get_distances()
-                        right_space = distances.get("front", 0)
-                        
-                        # Re-center (roughly)
-                        self.motors.move(-0.3, 0.3) # Rotate Left back to center
-                        await asyncio.sleep(0.4)
-                        self.motors.stop()
-                        
-                        print(f"Scan Result: Left={left_space}, Right={right_space}")
-                        
-                        # Decision
-                        if left_space > 25 and left_space > right_space:
-                            # Turn Left
-                            print("Turning Left")
-                            self.motors.move(-0.4, 0.3)
-                            await asyncio.sleep(0.6)
-                        elif right_space > 25:
-                            # Turn Right
-                            print("Turning Right")
-                            self.motors.move(0.4, 0.3)
-                            await asyncio.sleep(0.6)
-                        else:
-                            # Trapped or Wall -> Back up and Spin
-                            print("Path blocked. Backing up.")
-                            if can_backup:
-                                self.motors.move(0, -0.25)
-                                await asyncio.sleep(0.8)
-                            
-                            # Spin 180 (approx)
-                            self.motors.move(0.5, 0) # Rotate in place
-                            await asyncio.sleep(0.8)
-                            
-                        continue # Restart loop
-                
-                # Move Forward
-                self.motors.move(0, speed)
-                await asyncio.sleep(0.1)
+                state = planner.state
+                x, y = planner.step(clock.monotonic(),
+                                    world.ultrasonic_front.latest,
+                                    world.ultrasonic_rear.latest,
+                                    self._check_cliff(),
+                                    self.odometry.heading)
+                if planner.state != state and planner.state in (ESCAPE, SCAN):
+                    # Cliff or obstacle ahead: cut the motors instead of ramping down towards it
+                    self.drive.halt()
+                self.drive.move(x, y)
+                await asyncio.sleep(planner.period)
                 
         except asyncio.CancelledError:
             print("Obstacle avoidance cancelled")
-            self.motors.stop()
+            self.drive.stop()
             self.leds.set_mode("static", (0, 255, 0))
-            self.state["status"] = "standby"
+            self._set_status("standby")
+
+    async def calibrate_odometry(self):
+        """Straight runs against a wall to fill the odometry speed table (robot must face a wall)."""
+        await self._cancel_tasks()
+        self._set_status("calibrating")
+        try:
+            table = await calibrate(self.drive, self.world.ultrasonic_front)
+        finally:
+            self.drive.stop()
+            self._set_status("standby")
+        if table is None:
+            return {"error": "not enough ultrasonic speed readings; calibration unchanged"}
+        self.odometry.calibration = table
+        return table.tables
 
     async def _stop_movement(self):
         print("Stopping all movement")
-        self.motors.stop()
+        self.drive.halt()
         await self._cancel_tasks()
-        self.state["status"] = "standby"
+        self._set_status("standby")
         if self.emit_status_callback:
             await self.emit_status_callback(self.state)
         
     async def _sensor_loop(self):
         """Updates sensor data periodically"""
         while self.is_running:
-            # Update Ultrasonic
-            self.state["sensors"]["ultrasonic"] = self.ultrasonic.get_distances()
-            self.state["sensors"]["infrared"] = self.infrared.get_values()
+            # Publish the world state; no sensor I/O here (stale readings show as None)
+            world = self.world
+            self.state["sensors"]["ultrasonic"] = {
+                "front": world.ultrasonic_front.get(),
+                "rear": world.ultrasonic_rear.get(),
+            }
+            ir = world.infrared.value or 0
+            self.state["sensors"]["infrared"] = [bool(ir & 4), bool(ir & 2), bool(ir & 1)]
+            self.state["pose"] = self.odometry.to_dict()
             
             # Simulate battery drain or read from ADC if implemented
-            self.state["battery"] = max(0, self.state["battery"] - 0.001)
+            world.battery.set(max(0, world.battery.value - 0.001))
+            self.state["battery"] = world.battery.value
+            if self.telemetry:
+                self._record_keyframe()
             
             if self.emit_status_callback:
                 await self.emit_status_callback(self.state)
                 
             await asyncio.sleep(0.5) # Update rate 2Hz
 
-# Global Robot Instance
+    def _set_status(self, status):
+        self.state["status"] = status
+        self._record_mode()
+
+    def _record_mode(self):
+        """Log a mode transition to the flight recorder as it happens."""
+        if not self.telemetry:
+            return
+        mode = (self.state["status"], self.state["autonomy_level"])
+        if mode != self._recorded_mode:
+            self._recorded_mode = mode
+            self.telemetry.mode(status=mode[0], autonomy_level=mode[1])
+
+    def _record_keyframe(self):
+        """Periodic camera keyframes for the flight recorder."""
+        interval = settings.TELEMETRY_KEYFRAME_INTERVAL
+        now = clock.monotonic()
+        if interval and now - self._last_keyframe >= interval and "camera_manager" in self._subsystems:
+            seq, frame = self.camera_manager.get_latest('front')
+            if frame is not None:
+                self._last_keyframe = now
+                self.telemetry.keyframe(frame.copy())
+
+# Global Robot Instance (cheap: subsystems come up in robot.start())
 robot = Robot()
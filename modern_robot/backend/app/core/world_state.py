@@ -0,0 +1,117 @@
+import numpy as np
+from app.core import clock
+from app.core.config import settings
+
+class Signal:
+    """
+    One timestamped sensor/actuator value with a bounded history ring.
+
+    The latest (value, timestamp) pair is swapped in as a single tuple, so a
+    reader on another thread never sees a value with the wrong timestamp.
+    Each signal has a single writer.
+    """
+    __slots__ = ("name", "latest", "max_age", "_times", "_values", "_index", "_count", "_subscribers")
+
+    def __init__(self, name: str, max_age: float = None, history: int = 64):
+        self.name = name
+        self.latest = (None, 0.0)
+        self.max_age = max_age # None: value stays valid until replaced (event-driven signals)
+        self._times = np.zeros(history, dtype=np.float64)
+        self._values = np.zeros(history, dtype=np.float64)
+        self._index = 0
+        self._count = 0
+        self._subscribers = []
+
+    def set(self, value, timestamp: float = None):
+        timestamp = timestamp if timestamp is not None else clock.monotonic()
+        self.latest = (value, timestamp)
+        i = self._index
+        self._times[i] = timestamp
+        self._values[i] = np.nan if value is None else value
+        self._index = (i + 1) % len(self._times)
+        self._count = min(self._count + 1, len(self._times))
+        for callback in self._subscribers:
+            callback(self.name, value, timestamp)
+
+    @property
+    def value(self):
+        return self.latest[0]
+
+    @property
+    def age(self) -> float:
+        """Seconds since the last update (inf if never set)."""
+        timestamp = self.latest[1]
+        return clock.monotonic() - timestamp if timestamp else float("inf")
+
+    def is_fresh(self, max_age: float = None) -> bool:
+        max_age = max_age if max_age is not None else self.max_age
+        if not self.latest[1]:
+            return False
+        return max_age is None or self.age <= max_age
+
+    def is_stale(self, max_age: float = None) -> bool:
+        """Was updated at some point but not within `max_age` (a sensor that went quiet)."""
+        return bool(self.latest[1]) and not self.is_fresh(max_age)
+
+    def get(self, max_age: float = None):
+        """The latest value, or None if it is older than `max_age` (default: the signal's threshold)."""
+        return self.latest[0] if self.is_fresh(max_age) else None
+
+    def with_age(self):
+        """(value, age in seconds) of the latest update."""
+        value, timestamp = self.latest
+        return value, (clock.monotonic() - timestamp) if timestamp else float("inf")
+
+    def history(self):
+        """(timestamps, values) oldest first, as copies."""
+        n = self._count
+        order = (np.arange(n) + self._index - n) % len(self._times)
+        return self._times[order].copy(), self._values[order].copy()
+
+    def subscribe(self, callback):
+        """Call `callback(name, value, timestamp)` on every update (on the writer's thread)."""
+        self._subscribers.append(callback)
+
+class WorldState:
+    """
+    The robot's current picture of itself and its surroundings, fed by the
+    sensor services and the motion loop. Loops read from here instead of
+    touching sensors; safety checks use get(max_age) to refuse stale data.
+    """
+    __slots__ = ("ultrasonic_front", "ultrasonic_rear", "infrared", "motor_left", "motor_right", "battery")
+
+    def __init__(self, history: int = None):
+        history = history or settings.WORLD_HISTORY
+        sensor_age = settings.SENSOR_MAX_AGE
+        self.ultrasonic_front = Signal("ultrasonic_front", sensor_age, history)
+        self.ultrasonic_rear = Signal("ultrasonic_rear", sensor_age, history)
+        self.infrared = Signal("infrared", None, history)     # packed L/C/R bits, edge-driven
+        self.motor_left = Signal("motor_left", None, history)  # commanded track values
+        self.motor_right = Signal("motor_right", None, history)
+        self.battery = Signal("battery", None, history)
+
+    def signals(self):
+        return [getattr(self, name) for name in self.__slots__]
+
+    def subscribe(self, callback, *names):
+        """Subscribe to the named signals (all if none given)."""
+        for signal in self.signals():
+            if not names or signal.name in names:
+                signal.subscribe(callback)
+
+    def snapshot(self) -> dict:
+        """{name: (value, age)} for every signal."""
+        return {signal.name: signal.with_age() for signal in self.signals()}
+
+    # --- Feeds ---
+
+    def on_ultrasonic(self, name, reading):
+        signal = self.ultrasonic_front if name == "front" else self.ultrasonic_rear
+        signal.set(reading.distance, reading.timestamp)
+
+    def on_infrared(self, state, timestamp):
+        self.infrared.set(state, timestamp)
+
+    def on_motor_output(self, left, right, timestamp):
+        self.motor_left.set(left, timestamp)
+        self.motor_right.set(right, timestamp)
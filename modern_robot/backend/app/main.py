@@ -5,6 +5,7 @@ import socketio
 import asyncio
 from app.core.robot import robot
 from app.api import router as api_router
+from app.services.status_publisher import StatusPublisher
 
 # Initialize FastAPI
 app = FastAPI(title="Modern Robot Command Center", version="1.0.0")
@@ -22,18 +23,19 @@ app.add_middleware(
 sio = socketio.AsyncServer(async_mode='asgi', cors_allowed_origins='*')
 socket_app = socketio.ASGIApp(sio, app)
 
-async def broadcast_status(state):
-    await sio.emit('status', {'robot_state': state})
+# Versioned, delta-compressed status broadcasts (see StatusPublisher)
+status_publisher = StatusPublisher(sio.emit, robot.get_state)
 
 @app.on_event("startup")
 async def startup_event():
     print("Starting Robot System...")
-    robot.set_emit_status_callback(broadcast_status)
+    robot.set_emit_status_callback(status_publisher.publish)
     await robot.start()
 
 @app.on_event("shutdown")
 async def shutdown_event():
     print("Shutting down Robot System...")
+    await status_publisher.stop()
     await robot.stop()
 
 # Include API Routes
@@ -43,16 +45,24 @@ app.include_router(api_router, prefix="/api")
 @sio.event
 async def connect(sid, environ):
     print(f"Client connected: {sid}")
-    await sio.emit('status', {'status': 'connected', 'robot_state': robot.get_state()}, to=sid)
+    # Full snapshot; later updates arrive as 'status_patch' against its version
+    await status_publisher.add_client(sid, status='connected')
 
 @sio.event
 async def disconnect(sid):
     print(f"Client disconnected: {sid}")
+    status_publisher.remove_client(sid)
+
+@sio.on('status_resync')
+async def status_resync(sid, data=None):
+    # Client missed a patch (version gap): send it a fresh snapshot
+    await status_publisher.add_client(sid)
 
 @sio.on('control_command')
 async def handle_control(sid, data):
     # data: {'command': 'move', 'params': {'x': 0.5, 'y': 0.5}}
-    await robot.execute_command(data)
+    # Queued by priority (moves coalesce); the ack confirms acceptance, not completion
+    await robot.commands.submit(data)
     await sio.emit('robot_response', {'status': 'ok', 'action': data.get('command')}, to=sid)
 
 @sio.on('set_autonomy')
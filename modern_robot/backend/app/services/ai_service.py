@@ -1,75 +1,236 @@
 import asyncio
+import threading
+import time
 import cv2
 import numpy as np
 from app.core.config import settings
+from app.services.detections import Detections
+from app.services.inference_backends import create_backend
+from app.services.inference_scheduler import InferenceScheduler
+from app.services.tracker import BoxTracker
+
+class InferenceResult:
+    """Detections for one camera frame, tagged so consumers can judge staleness."""
+    __slots__ = ("seq", "frame_time", "done_time", "latency", "frame_shape", "detections", "source")
+
+    def __init__(self, seq, frame_time, done_time, latency, frame_shape, detections, source="full"):
+        self.seq = seq                  # camera frame sequence number
+        self.frame_time = frame_time    # time.monotonic() when the frame was captured
+        self.done_time = done_time      # time.monotonic() when inference finished
+        self.latency = latency          # seconds spent in the model
+        self.frame_shape = frame_shape
+        self.detections = detections
+        self.source = source            # 'full', 'roi', or 'reused' (static scene, previous detections)
+
+    @property
+    def age(self) -> float:
+        """Seconds since the frame behind these detections was captured."""
+        return time.monotonic() - self.frame_time
 
 class AIService:
-    def __init__(self):
+    def __init__(self, backend=None):
         self.is_running = False
-        self.model = None
-        
-        # Load model only if not in mock mode or if requested
-        # Using a tiny model for Pi optimization
-        if not settings.MOCK_MODE:
-            try:
-                from ultralytics import YOLO
-                self.model = YOLO('yolov8n.pt') 
-                print("YOLO model loaded.")
-            except ImportError:
-                print("Ultralytics not installed. AI features disabled.")
-            except Exception as e:
-                print(f"Failed to load YOLO model: {e}")
+        # Detector backend (settings.AI_BACKEND): ultralytics, onnxruntime, opencv or stub.
+        # Loaded on first use by load_backend() unless one is passed in.
+        self.backend = backend
+        self._backend_loaded = backend is not None
+        self._backend_lock = threading.Lock()
+        self.load_time_ms = None
+
+        # Latest-frame-wins input slot for the inference worker
+        self._cond = threading.Condition()
+        self._pending = None  # (seq, frame, frame_time, is_valid)
+        self._input = None    # worker-owned copy of the frame being inferred
+        self._worker = None
+        self._loop = None
+        self._result_event = None
+        self.latest_result = None
+        # "superseded" counts frames dropped while waiting for the worker or the inference budget
+        self.stats = {"submitted": 0, "superseded": 0, "stale_input": 0, "inferences": 0, "last_latency_ms": 0.0}
+        self.scheduler = InferenceScheduler()
+        self.tracker = BoxTracker()
+
+    def load_backend(self):
+        """
+        Load and warm up the configured model (settings.AI_BACKEND is "none" in
+        mock mode) on the first call; later calls just return it.
+        """
+        if not self._backend_loaded:
+            with self._backend_lock:
+                if not self._backend_loaded:
+                    start = time.perf_counter()
+                    self.backend = create_backend()
+                    self.load_time_ms = round((time.perf_counter() - start) * 1000, 1)
+                    self._backend_loaded = True
+        return self.backend
 
     async def start(self):
         self.is_running = True
+        self._loop = asyncio.get_running_loop()
+        self._result_event = asyncio.Event()
+        self._worker = threading.Thread(target=self._worker_loop, daemon=True)
+        self._worker.start()
         print("AI Service Started")
 
     async def stop(self):
         self.is_running = False
+        with self._cond:
+            self._cond.notify_all()
+        if self._worker is not None:
+            # Let an inference in progress finish before the camera ring and model go away
+            await asyncio.to_thread(self._worker.join, 2.0)
+            if self._worker.is_alive():
+                print("AI worker still busy after 2 s, not waiting for it")
+            self._worker = None
         print("AI Service Stopped")
 
-    def process_frame(self, frame):
+    def submit(self, seq, frame, frame_time=None, is_valid=None):
         """
-        Run inference on a single frame.
-        Returns the annotated frame and a list of detections.
+        Hand a frame to the inference worker without blocking. Only the newest
+        submission is kept; an older one still waiting is dropped. `frame` may be
+        a borrowed camera-ring view: the worker copies it when it picks it up and
+        uses `is_valid(seq)` to discard it if the slot was recycled meanwhile.
         """
-        if self.model is None or frame is None:
-            return frame, []
+        with self._cond:
+            if self._pending is not None:
+                self.stats["superseded"] += 1
+            self._pending = (seq, frame, frame_time or time.monotonic(), is_valid)
+            self.stats["submitted"] += 1
+            self._cond.notify()
 
-        try:
-            results = self.model(frame, stream=True, verbose=False)
-            
-            detections = []
-            annotated_frame = frame.copy()
-
-            for result in results:
-                # Plot results on the frame
-                annotated_frame = result.plot()
-                
-                # Extract detection data
-                for box in result.boxes:
-                    cls_id = int(box.cls[0])
-                    conf = float(box.conf[0])
-                    label = result.names[cls_id]
-                    
-                    detections.append({
-                        "label": label,
-                        "confidence": conf,
-                        "bbox": box.xyxy[0].tolist()
-                    })
-            
-            return annotated_frame, detections
+    def _worker_loop(self):
+        while self.is_running:
+            with self._cond:
+                self._cond.wait_for(lambda: self._pending is not None or not self.is_running)
+                # Respect the inference budget; newer frames replace the pending one meanwhile.
+                # submit() notifies on every frame, so re-check the budget after each wakeup.
+                delay = self.scheduler.time_until_allowed()
+                while delay > 0 and self.is_running:
+                    self._cond.wait(delay)
+                    delay = self.scheduler.time_until_allowed()
+                if not self.is_running:
+                    break
+                seq, frame, frame_time, is_valid = self._pending
+                self._pending = None
+
+            if self._input is None or self._input.shape != frame.shape:
+                self._input = np.empty_like(frame)
+            np.copyto(self._input, frame)
+            if is_valid is not None and not is_valid(seq):
+                # Slot was overwritten while we copied it; wait for a fresh submission
+                self.stats["stale_input"] += 1
+                continue
 
+            plan = self.scheduler.plan(self._input)
+            if plan.kind == "skip":
+                # Static scene: the previous detections still describe this frame. They are
+                # not fed to the tracker again, so tracks of objects that left still age out.
+                previous = self.latest_result
+                if previous is not None:
+                    self._publish(InferenceResult(seq, frame_time, time.monotonic(), 0.0, frame.shape,
+                                                  previous.detections, "reused"))
+                continue
+
+            start = time.monotonic()
+            if plan.kind == "roi":
+                x1, y1, x2, y2 = plan.roi
+                detections = self.detect(self._input[y1:y2, x1:x2])
+                # Back to full-frame coordinates
+                detections.data[:, [0, 2]] += x1
+                detections.data[:, [1, 3]] += y1
+            else:
+                detections = self.detect(self._input)
+            done = time.monotonic()
+            self.scheduler.update(detections)
+            self.tracker.update(detections, frame_time)
+            self.stats["inferences"] += 1
+            self.stats["last_latency_ms"] = round((done - start) * 1000, 1)
+            self._publish(InferenceResult(seq, frame_time, done, done - start, frame.shape, detections, plan.kind))
+
+    def track(self, label, timestamp=None):
+        """
+        (track_id, xyxy box) for `label` propagated to `timestamp` (default now)
+        by the tracker, so callers get a box between detector runs. None if lost.
+        """
+        return self.tracker.target(label, timestamp)
+
+    def get_stats(self) -> dict:
+        return dict(self.stats, scheduler=self.scheduler.stats(), load_ms=self.load_time_ms)
+
+    def _publish(self, result):
+        self.latest_result = result
+        if self._loop is not None:
+            try:
+                self._loop.call_soon_threadsafe(self._result_event.set)
+            except RuntimeError:
+                pass # event loop already closed
+
+    async def next_result(self, after_seq=0, timeout=None):
+        """Await a result for a frame newer than `after_seq` (None on timeout)."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            result = self.latest_result
+            if result is not None and result.seq > after_seq:
+                return result
+            self._result_event.clear()
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                return None
+            try:
+                await asyncio.wait_for(self._result_event.wait(), remaining)
+            except asyncio.TimeoutError:
+                return None
+
+    async def results(self, after_seq=0):
+        """Async stream of inference results, newest only (intermediate results are skipped)."""
+        while self.is_running:
+            result = await self.next_result(after_seq)
+            after_seq = result.seq
+            yield result
+
+    def detect(self, frame) -> Detections:
+        """Run inference on a single frame and return detections only (no rendering)."""
+        backend = self.load_backend()
+        if backend is None or frame is None:
+            return Detections()
+
+        try:
+            return backend.infer(frame)
         except Exception as e:
             print(f"Inference error: {e}")
+            return Detections()
+
+    def benchmark(self, frames) -> dict:
+        """Latency percentiles of the active backend over `frames`."""
+        backend = self.load_backend()
+        if backend is None:
+            return {"backend": None, "frames": 0}
+        return backend.benchmark(frames)
+
+    def annotate(self, frame, detections: Detections):
+        """Draw detections on a copy of the frame. Only needed for the annotated video stream."""
+        annotated_frame = frame.copy()
+        for i in range(len(detections)):
+            x1, y1, x2, y2 = (int(v) for v in detections.data[i, :4])
+            cv2.rectangle(annotated_frame, (x1, y1), (x2, y2), (0, 255, 0), 2)
+            cv2.putText(annotated_frame, f"{detections.label(i)} {detections.data[i, 4]:.2f}",
+                        (x1, max(y1 - 5, 10)), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 0), 1)
+        return annotated_frame
+
+    def process_frame(self, frame):
+        """
+        Run inference on a single frame.
+        Returns the annotated frame and a list of detections.
+        """
+        detections = self.detect(frame)
+        if frame is None:
             return frame, []
+        return self.annotate(frame, detections), detections.to_list()
 
     def detect_person(self, frame):
-        _, detections = self.process_frame(frame)
-        return any(d['label'] == 'person' for d in detections)
+        return self.detect(frame).has('person')
 
     def detect_trash(self, frame):
         # Simply check for common trash items
         trash_labels = ['bottle', 'cup', 'can']
-        _, detections = self.process_frame(frame)
-        return any(d['label'] in trash_labels for d in detections)
+        return self.detect(frame).has(*trash_labels)
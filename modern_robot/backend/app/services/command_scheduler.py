@@ -0,0 +1,173 @@
+import asyncio
+import time
+from collections import deque
+
+# Priority classes, highest first
+EMERGENCY, SAFETY, MOTION, ACTUATORS, COSMETIC = range(5)
+CLASS_NAMES = ("emergency", "safety", "motion", "actuators", "cosmetic")
+
+PRIORITIES = {
+    "emergency_stop": EMERGENCY,
+    "set_speed": SAFETY,
+    "move": MOTION,
+    "track_face": MOTION,
+    "line_tracking": MOTION,
+    "obstacle_avoidance": MOTION,
+    "pickup": ACTUATORS,
+    "drop": ACTUATORS,
+    "arm_control": ACTUATORS,
+    "camera_pan": ACTUATORS,
+    "set_zoom": ACTUATORS,
+    "set_led": COSMETIC,
+}
+
+# Drive commands and slow actuators run on separate lanes, so a move never
+# waits behind an arm movement (emergency_stop bypasses both)
+LANES = ((SAFETY, MOTION), (ACTUATORS, COSMETIC))
+
+def coalesce_key(command_data):
+    """
+    Commands with the same key replace each other while still queued (latest
+    wins). None means every instance is executed.
+    """
+    cmd = command_data.get('command')
+    params = command_data.get('params') or {}
+    if cmd in ("move", "set_led", "camera_pan"):
+        return cmd
+    if cmd == "arm_control":
+        return cmd, params.get('joint')
+    if cmd == "set_zoom":
+        return cmd, params.get('camera', 'front')
+    return None
+
+class QueuedCommand:
+    __slots__ = ("data", "priority", "key", "queued_at")
+
+    def __init__(self, data, priority, key):
+        self.data = data
+        self.priority = priority
+        self.key = key
+        self.queued_at = time.monotonic()
+
+class CommandScheduler:
+    """
+    Priority queue in front of Robot.execute_command. submit() never waits
+    for execution: emergency_stop runs at once and discards queued drive and
+    actuator commands; everything else is queued by priority class and run by
+    one worker per lane. A queued command with the same coalesce_key() is
+    replaced in place, so bursts of joystick moves or slider updates collapse
+    to the newest value.
+    """
+    def __init__(self, execute, max_depth: int = 32):
+        self.execute = execute
+        self.max_depth = max_depth
+        self.queues = [deque() for _ in CLASS_NAMES]
+        self.pending = {} # coalesce key -> queued command
+        self._wake = None
+        self._workers = []
+        self.stats = {
+            "submitted": 0,
+            "executed": [0] * len(CLASS_NAMES),
+            "coalesced": [0] * len(CLASS_NAMES),
+            "overflow": [0] * len(CLASS_NAMES),
+            "flushed": 0,
+            "errors": 0,
+            "last_wait_ms": [0.0] * len(CLASS_NAMES),
+        }
+
+    def _ensure_workers(self):
+        if not self._workers:
+            self._wake = [asyncio.Event() for _ in LANES]
+            self._workers = [asyncio.create_task(self._worker(i)) for i in range(len(LANES))]
+
+    def _lane_of(self, priority):
+        for i, lane in enumerate(LANES):
+            if priority in lane:
+                return i
+        return len(LANES) - 1
+
+    async def submit(self, command_data):
+        self._ensure_workers()
+        self.stats["submitted"] += 1
+        priority = PRIORITIES.get(command_data.get('command'), ACTUATORS)
+
+        if priority == EMERGENCY:
+            self._flush(MOTION, ACTUATORS)
+            self.stats["executed"][EMERGENCY] += 1
+            await self._run(command_data)
+            return
+
+        key = coalesce_key(command_data)
+        queued = self.pending.get(key) if key is not None else None
+        if queued is not None:
+            # Keep the queue position, take the newest value
+            queued.data = command_data
+            self.stats["coalesced"][priority] += 1
+            return
+
+        queue = self.queues[priority]
+        if len(queue) >= self.max_depth:
+            dropped = queue.popleft()
+            self.pending.pop(dropped.key, None)
+            self.stats["overflow"][priority] += 1
+        entry = QueuedCommand(command_data, priority, key)
+        queue.append(entry)
+        if key is not None:
+            self.pending[key] = entry
+        self._wake[self._lane_of(priority)].set()
+
+    def _flush(self, *priorities):
+        for priority in priorities:
+            queue = self.queues[priority]
+            self.stats["flushed"] += len(queue)
+            for entry in queue:
+                self.pending.pop(entry.key, None)
+            queue.clear()
+
+    def _next(self, lane):
+        for priority in LANES[lane]:
+            queue = self.queues[priority]
+            if queue:
+                entry = queue.popleft()
+                if entry.key is not None:
+                    self.pending.pop(entry.key, None)
+                return entry
+        return None
+
+    async def _run(self, command_data):
+        try:
+            await self.execute(command_data)
+        except Exception as e:
+            self.stats["errors"] += 1
+            print(f"Command '{command_data.get('command')}' failed: {e}")
+
+    async def _worker(self, lane):
+        wake = self._wake[lane]
+        while True:
+            entry = self._next(lane)
+            if entry is None:
+                wake.clear()
+                await wake.wait()
+                continue
+            self.stats["last_wait_ms"][entry.priority] = round((time.monotonic() - entry.queued_at) * 1000, 1)
+            self.stats["executed"][entry.priority] += 1
+            await self._run(entry.data)
+
+    async def stop(self):
+        for worker in self._workers:
+            worker.cancel()
+        self._workers = []
+        self._flush(*range(len(CLASS_NAMES)))
+
+    def get_stats(self) -> dict:
+        per_class = {}
+        for priority, name in enumerate(CLASS_NAMES):
+            per_class[name] = {
+                "depth": len(self.queues[priority]),
+                "executed": self.stats["executed"][priority],
+                "coalesced": self.stats["coalesced"][priority],
+                "overflow": self.stats["overflow"][priority],
+                "last_wait_ms": self.stats["last_wait_ms"][priority],
+            }
+        return {"submitted": self.stats["submitted"], "flushed": self.stats["flushed"],
+                "errors": self.stats["errors"], "classes": per_class}
@@ -0,0 +1,124 @@
+import asyncio
+import struct
+import time
+from app.core.config import settings
+
+# Client -> robot: seq (uint32), x, y (float32, -1..1), flags (uint16); several may be sent in one message
+MOVE_FRAME = struct.Struct("<IffH")
+# Robot -> client: last applied seq, moves superseded so far, flags (echoes FLAG_PING)
+ACK_FRAME = struct.Struct("<IIH")
+
+FLAG_ACK = 0x1   # acknowledge this frame as soon as it is applied
+FLAG_STOP = 0x2  # stop now; x/y are ignored
+FLAG_PING = 0x4  # no motion, echo immediately (RTT probe)
+
+class ControlSession:
+    """
+    One binary control connection. Incoming move frames land in a single
+    latest-wins slot; the dispatcher only ever applies the newest one, so a
+    backlog of stale joystick positions is never replayed. Acks carry the
+    last applied seq and are sent on request (FLAG_ACK / FLAG_PING) or batched
+    every `ack_interval` seconds, letting the client measure RTT by seq.
+    """
+    def __init__(self, send, execute, ack_interval: float = None):
+        self.send = send         # async send(bytes)
+        self.execute = execute   # async execute(command_data), e.g. robot.commands.submit
+        self.ack_interval = ack_interval if ack_interval is not None else settings.CONTROL_ACK_INTERVAL
+        self.last_seq = 0        # newest seq received
+        self.applied_seq = 0     # newest seq applied to the robot
+        self.acked_seq = 0
+        self._pending = None     # (seq, x, y, flags)
+        self._wake = asyncio.Event()
+        self._send_lock = asyncio.Lock()
+        self.moving = False
+        self.connected_at = time.monotonic()
+        self.stats = {"frames": 0, "applied": 0, "superseded": 0, "stale": 0, "malformed": 0, "acks": 0, "errors": 0}
+
+    async def feed(self, data: bytes):
+        """Handle one binary message (one or more packed frames)."""
+        if not data or len(data) % MOVE_FRAME.size:
+            self.stats["malformed"] += 1
+            return
+        for seq, x, y, flags in MOVE_FRAME.iter_unpack(data):
+            self.stats["frames"] += 1
+            if flags & FLAG_PING:
+                await self._ack(seq, FLAG_PING)
+                continue
+            if seq <= self.last_seq:
+                self.stats["stale"] += 1
+                continue
+            self.last_seq = seq
+            if self._pending is not None:
+                self.stats["superseded"] += 1
+            self._pending = (seq, x, y, flags)
+            self._wake.set()
+
+    async def _ack(self, seq, flags=0):
+        async with self._send_lock:
+            await self.send(ACK_FRAME.pack(seq, self.stats["superseded"] & 0xFFFFFFFF, flags))
+        self.stats["acks"] += 1
+
+    async def dispatch_loop(self):
+        while True:
+            await self._wake.wait()
+            self._wake.clear()
+            pending, self._pending = self._pending, None
+            if pending is None:
+                continue
+            seq, x, y, flags = pending
+            if flags & FLAG_STOP:
+                x = y = 0.0
+            x = max(-1.0, min(1.0, x))
+            y = max(-1.0, min(1.0, y))
+            try:
+                await self.execute({'command': 'move', 'params': {'x': x, 'y': y}})
+            except Exception as e:
+                # Keep the session alive; the next frame gets another try
+                self.stats["errors"] += 1
+                print(f"Control dispatch error: {e}")
+                continue
+            self.moving = x != 0 or y != 0
+            self.applied_seq = seq
+            self.stats["applied"] += 1
+            if flags & FLAG_ACK:
+                self.acked_seq = seq
+                await self._ack(seq)
+
+    async def ack_loop(self):
+        while True:
+            await asyncio.sleep(self.ack_interval)
+            if self.applied_seq > self.acked_seq:
+                self.acked_seq = self.applied_seq
+                await self._ack(self.applied_seq)
+
+    async def close(self):
+        # Never leave the robot driving on the last joystick position of a dead link
+        if self.moving:
+            await self.execute({'command': 'move', 'params': {'x': 0, 'y': 0}})
+            self.moving = False
+
+class ControlChannel:
+    """Tracks binary control sessions (GET /api/control/stats)."""
+    def __init__(self, execute):
+        self.execute = execute
+        self.sessions = []
+
+    async def serve(self, receive, send):
+        """Run a session until `receive()` raises (disconnect)."""
+        session = ControlSession(send, self.execute)
+        self.sessions.append(session)
+        tasks = [asyncio.create_task(session.dispatch_loop())]
+        if session.ack_interval > 0:
+            tasks.append(asyncio.create_task(session.ack_loop()))
+        try:
+            while True:
+                await session.feed(await receive())
+        finally:
+            for task in tasks:
+                task.cancel()
+            self.sessions.remove(session)
+            await session.close()
+
+    def get_stats(self):
+        return [dict(s.stats, last_seq=s.last_seq, applied_seq=s.applied_seq,
+                     connected_for=round(time.monotonic() - s.connected_at, 1)) for s in self.sessions]
@@ -0,0 +1,59 @@
+import numpy as np
+
+class Detections:
+    """
+    Array-backed detections: an N x 6 float32 array of rows
+    (x1, y1, x2, y2, confidence, class_id) plus the model's class-name table.
+    """
+    __slots__ = ("data", "names")
+    EMPTY = np.zeros((0, 6), dtype=np.float32)
+
+    def __init__(self, data=None, names=None):
+        self.data = self.EMPTY if data is None else data
+        self.names = names or {}
+
+    def __len__(self):
+        return len(self.data)
+
+    @property
+    def boxes(self):
+        return self.data[:, :4]
+
+    @property
+    def confidences(self):
+        return self.data[:, 4]
+
+    @property
+    def class_ids(self):
+        return self.data[:, 5].astype(np.int32)
+
+    def label(self, i) -> str:
+        return self.names.get(int(self.data[i, 5]), str(int(self.data[i, 5])))
+
+    def _class_id(self, label):
+        for cls_id, name in self.names.items():
+            if name == label:
+                return cls_id
+        return None
+
+    def has(self, *labels) -> bool:
+        ids = [self._class_id(label) for label in labels]
+        return bool(np.isin(self.data[:, 5], [i for i in ids if i is not None]).any())
+
+    def best(self, label):
+        """Row index of the most confident detection of `label`, or None."""
+        cls_id = self._class_id(label)
+        if cls_id is None:
+            return None
+        rows = np.flatnonzero(self.data[:, 5] == cls_id)
+        if len(rows) == 0:
+            return None
+        return int(rows[np.argmax(self.data[rows, 4])])
+
+    def to_list(self):
+        """Detections as a list of dicts (JSON friendly)."""
+        return [{
+            "label": self.label(i),
+            "confidence": float(self.data[i, 4]),
+            "bbox": self.data[i, :4].tolist()
+        } for i in range(len(self.data))]
@@ -0,0 +1,243 @@
+import time
+from abc import ABC, abstractmethod
+import cv2
+import numpy as np
+from app.core.config import settings
+from app.services.detections import Detections
+
+COCO_NAMES = {i: name for i, name in enumerate([
+    'person', 'bicycle', 'car', 'motorcycle', 'airplane', 'bus', 'train', 'truck', 'boat', 'traffic light',
+    'fire hydrant', 'stop sign', 'parking meter', 'bench', 'bird', 'cat', 'dog', 'horse', 'sheep', 'cow',
+    'elephant', 'bear', 'zebra', 'giraffe', 'backpack', 'umbrella', 'handbag', 'tie', 'suitcase', 'frisbee',
+    'skis', 'snowboard', 'sports ball', 'kite', 'baseball bat', 'baseball glove', 'skateboard', 'surfboard',
+    'tennis racket', 'bottle', 'wine glass', 'cup', 'fork', 'knife', 'spoon', 'bowl', 'banana', 'apple',
+    'sandwich', 'orange', 'broccoli', 'carrot', 'hot dog', 'pizza', 'donut', 'cake', 'chair', 'couch',
+    'potted plant', 'bed', 'dining table', 'toilet', 'tv', 'laptop', 'mouse', 'remote', 'keyboard', 'cell phone',
+    'microwave', 'oven', 'toaster', 'sink', 'refrigerator', 'book', 'clock', 'vase', 'scissors', 'teddy bear',
+    'hair drier', 'toothbrush'])}
+
+class InferenceBackend(ABC):
+    """
+    Common interface for object detectors. Subclasses implement load() and
+    infer(frame) -> Detections; warm-up and benchmarking are shared.
+    """
+    name = "base"
+    default_model = None
+
+    def __init__(self, model_path=None, input_size=None, conf_threshold=0.25, iou_threshold=0.45):
+        self.model_path = model_path or settings.AI_MODEL_PATH or self.default_model
+        self.input_size = input_size or settings.AI_INPUT_SIZE
+        self.conf_threshold = conf_threshold
+        self.iou_threshold = iou_threshold
+        self.names = COCO_NAMES
+
+    def load(self):
+        pass
+
+    @abstractmethod
+    def infer(self, frame) -> Detections:
+        """Detections for one BGR frame, boxes in frame pixels."""
+
+    def warmup(self, runs: int = 2):
+        """Run a few dummy inferences so the first real frame doesn't pay for lazy init."""
+        dummy = np.zeros((self.input_size, self.input_size, 3), dtype=np.uint8)
+        for _ in range(runs):
+            self.infer(dummy)
+
+    def benchmark(self, frames, warmup: int = 2) -> dict:
+        """Time infer() over `frames` and report latency percentiles in milliseconds."""
+        frames = list(frames)
+        if frames:
+            for _ in range(warmup):
+                self.infer(frames[0])
+        latencies = []
+        for frame in frames:
+            start = time.perf_counter()
+            self.infer(frame)
+            latencies.append((time.perf_counter() - start) * 1000)
+        if not latencies:
+            return {"backend": self.name, "frames": 0}
+        lat = np.array(latencies)
+        return {
+            "backend": self.name,
+            "frames": len(lat),
+            "input_size": self.input_size,
+            "mean_ms": round(float(lat.mean()), 2),
+            "p50_ms": round(float(np.percentile(lat, 50)), 2),
+            "p90_ms": round(float(np.percentile(lat, 90)), 2),
+            "p99_ms": round(float(np.percentile(lat, 99)), 2),
+            "max_ms": round(float(lat.max()), 2),
+            "fps": round(1000.0 / float(lat.mean()), 1),
+        }
+
+class UltralyticsBackend(InferenceBackend):
+    name = "ultralytics"
+    default_model = "yolov8n.pt"
+
+    def load(self):
+        from ultralytics import YOLO
+        self.model = YOLO(self.model_path)
+
+    def infer(self, frame) -> Detections:
+        chunks = []
+        names = self.names
+        for result in self.model(frame, stream=True, verbose=False, imgsz=self.input_size, conf=self.conf_threshold):
+            names = result.names
+            # boxes.data is already N x 6 (xyxy, conf, cls); one transfer, no per-box tolist()
+            chunks.append(result.boxes.data.cpu().numpy())
+        if not chunks:
+            return Detections(names=names)
+        return Detections(np.concatenate(chunks).astype(np.float32, copy=False), names)
+
+class _YoloOnnxBackend(InferenceBackend):
+    """
+    Shared pre/post-processing for exported YOLOv8 ONNX models: letterbox into a
+    preallocated fixed-size buffer, then decode the (1, 4 + classes, anchors)
+    output with confidence filtering and NMS.
+    """
+    default_model = "yolov8n.onnx"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        size = self.input_size
+        self._canvas = np.full((size, size, 3), 114, dtype=np.uint8)
+        self._blob = np.empty((1, 3, size, size), dtype=np.float32)
+        self._scale = 1.0
+        self._pad = (0, 0)
+
+    def _letterbox(self, frame):
+        size = self.input_size
+        h, w = frame.shape[:2]
+        scale = min(size / w, size / h)
+        new_w, new_h = int(round(w * scale)), int(round(h * scale))
+        pad_x, pad_y = (size - new_w) // 2, (size - new_h) // 2
+        if (scale, (pad_x, pad_y)) != (self._scale, self._pad):
+            self._canvas[:] = 114
+        self._scale, self._pad = scale, (pad_x, pad_y)
+        cv2.resize(frame, (new_w, new_h), dst=self._canvas[pad_y:pad_y + new_h, pad_x:pad_x + new_w],
+                   interpolation=cv2.INTER_LINEAR)
+        return self._canvas
+
+    def _to_blob(self, canvas):
+        # HWC BGR uint8 -> NCHW RGB float32 in [0, 1], into the preallocated blob
+        np.divide(canvas[:, :, ::-1].transpose(2, 0, 1), 255.0, out=self._blob[0])
+        return self._blob
+
+    def _decode(self, output) -> Detections:
+        preds = output[0].T # (anchors, 4 + classes)
+        scores = preds[:, 4:]
+        class_ids = scores.argmax(axis=1)
+        confidences = scores[np.arange(len(scores)), class_ids]
+        keep = confidences >= self.conf_threshold
+        if not keep.any():
+            return Detections(names=self.names)
+        preds, class_ids, confidences = preds[keep], class_ids[keep], confidences[keep]
+
+        cx, cy, bw, bh = preds[:, 0], preds[:, 1], preds[:, 2], preds[:, 3]
+        boxes = np.stack([cx - bw / 2, cy - bh / 2, cx + bw / 2, cy + bh / 2], axis=1)
+        # Class-aware NMS via per-class offsets
+        offset = class_ids[:, None] * 4096.0
+        nms_boxes = boxes + offset
+        indices = cv2.dnn.NMSBoxes(
+            [[float(b[0]), float(b[1]), float(b[2] - b[0]), float(b[3] - b[1])] for b in nms_boxes],
+            confidences.tolist(), self.conf_threshold, self.iou_threshold)
+        indices = np.array(indices).reshape(-1)
+
+        boxes = boxes[indices]
+        boxes[:, [0, 2]] -= self._pad[0]
+        boxes[:, [1, 3]] -= self._pad[1]
+        boxes /= self._scale
+        data = np.column_stack([boxes, confidences[indices], class_ids[indices]]).astype(np.float32)
+        return Detections(data, self.names)
+
+class OnnxRuntimeBackend(_YoloOnnxBackend):
+    name = "onnxruntime"
+
+    def load(self):
+        import onnxruntime as ort
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = ort.InferenceSession(self.model_path, options, providers=["CPUExecutionProvider"])
+        self.input_name = self.session.get_inputs()[0].name
+
+    def infer(self, frame) -> Detections:
+        blob = self._to_blob(self._letterbox(frame))
+        output = self.session.run(None, {self.input_name: blob})[0]
+        return self._decode(output)
+
+class OpenCVDnnBackend(_YoloOnnxBackend):
+    name = "opencv"
+
+    def load(self):
+        self.net = cv2.dnn.readNetFromONNX(self.model_path)
+        self.net.setPreferableBackend(cv2.dnn.DNN_BACKEND_OPENCV)
+        self.net.setPreferableTarget(cv2.dnn.DNN_TARGET_CPU)
+
+    def infer(self, frame) -> Detections:
+        self.net.setInput(self._to_blob(self._letterbox(frame)))
+        return self._decode(self.net.forward())
+
+class StubBackend(InferenceBackend):
+    """
+    Deterministic, dependency-free backend for tests and simulation. Returns
+    the configured detections (N x 6 rows in frame pixels) for every frame,
+    optionally after a fixed artificial latency.
+    """
+    name = "stub"
+
+    def __init__(self, detections=None, latency: float = 0.0, **kwargs):
+        super().__init__(**kwargs)
+        self.rows = np.zeros((0, 6), dtype=np.float32) if detections is None else np.asarray(detections, dtype=np.float32).reshape(-1, 6)
+        self.latency = latency
+
+    def infer(self, frame) -> Detections:
+        if self.latency:
+            time.sleep(self.latency)
+        return Detections(self.rows.copy(), self.names)
+
+BACKENDS = {
+    UltralyticsBackend.name: UltralyticsBackend,
+    OnnxRuntimeBackend.name: OnnxRuntimeBackend,
+    OpenCVDnnBackend.name: OpenCVDnnBackend,
+    StubBackend.name: StubBackend,
+}
+
+def create_backend(name: str = None, **kwargs):
+    """
+    Build, load and warm up the backend selected by name (default
+    settings.AI_BACKEND). Returns None when AI is disabled or loading fails.
+    """
+    name = (name or settings.AI_BACKEND).lower()
+    if name in ("", "none", "disabled"):
+        return None
+    if name not in BACKENDS:
+        print(f"Unknown AI backend '{name}'. AI features disabled.")
+        return None
+    try:
+        backend = BACKENDS[name](**kwargs)
+        backend.load()
+        backend.warmup()
+        print(f"AI backend '{name}' loaded ({backend.model_path}, {backend.input_size}px).")
+        return backend
+    except ImportError as e:
+        print(f"AI backend '{name}' unavailable ({e}). AI features disabled.")
+    except Exception as e:
+        print(f"Failed to load AI backend '{name}': {e}")
+    return None
+
+if __name__ == "__main__":
+    # Compare backends on this machine, e.g.:
+    #   python -m app.services.inference_backends ultralytics onnxruntime --frames 50
+    import argparse
+    parser = argparse.ArgumentParser(description="Benchmark inference backends")
+    parser.add_argument("backends", nargs="*", default=list(BACKENDS))
+    parser.add_argument("--frames", type=int, default=30)
+    parser.add_argument("--size", type=int, default=None, help="model input size")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    frames = [rng.integers(0, 255, (300, 400, 3), dtype=np.uint8) for _ in range(args.frames)]
+    for backend_name in args.backends:
+        backend = create_backend(backend_name, input_size=args.size)
+        if backend is not None:
+            print(backend.benchmark(frames))
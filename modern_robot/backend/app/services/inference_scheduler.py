@@ -0,0 +1,103 @@
+import time
+import cv2
+import numpy as np
+from app.core.config import settings
+
+class InferencePlan:
+    """What the scheduler wants done with a frame: 'full', 'roi' (with box) or 'skip'."""
+    __slots__ = ("kind", "roi", "reason")
+
+    def __init__(self, kind, roi=None, reason=""):
+        self.kind = kind
+        self.roi = roi # (x1, y1, x2, y2) crop in frame pixels for kind == 'roi'
+        self.reason = reason
+
+class InferenceScheduler:
+    """
+    Decides whether and where the detector runs on a frame:
+    - a budget caps inferences per second,
+    - a downsampled-luma difference against the last inferred frame skips static scenes,
+    - while a target is tracked only a crop around its last bbox is inferred,
+    - a full-frame pass still runs every `full_frame_interval` seconds as a fallback.
+    """
+    LUMA_SIZE = (80, 60)
+
+    def __init__(self,
+                 max_rate: float = None,
+                 motion_threshold: float = None,
+                 full_frame_interval: float = None,
+                 roi_margin: float = 0.5,
+                 roi_min_size: int = 160,
+                 target_label: str = "person"):
+        self.max_rate = max_rate or settings.AI_MAX_INFERENCE_RATE
+        self.motion_threshold = motion_threshold if motion_threshold is not None else settings.AI_MOTION_THRESHOLD
+        self.full_frame_interval = full_frame_interval or settings.AI_FULL_FRAME_INTERVAL
+        self.roi_margin = roi_margin
+        self.roi_min_size = roi_min_size
+        self.target_label = target_label
+
+        self.last_run = 0.0
+        self.last_full = 0.0
+        self.reference_luma = None # luma of the last frame that was actually inferred
+        self.target_box = None     # last bbox of target_label in frame pixels
+        self.counters = {"executed_full": 0, "executed_roi": 0, "skipped_static": 0}
+
+    def time_until_allowed(self, now=None) -> float:
+        """Seconds until the inference budget allows another run."""
+        now = now if now is not None else time.monotonic()
+        return max(0.0, self.last_run + 1.0 / self.max_rate - now)
+
+    def _luma(self, frame):
+        small = cv2.resize(frame, self.LUMA_SIZE, interpolation=cv2.INTER_AREA)
+        return cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+
+    def plan(self, frame, now=None) -> InferencePlan:
+        now = now if now is not None else time.monotonic()
+        luma = self._luma(frame)
+
+        if now - self.last_full >= self.full_frame_interval:
+            plan = InferencePlan("full", reason="periodic")
+        elif self.reference_luma is not None and \
+                float(cv2.absdiff(luma, self.reference_luma).mean()) < self.motion_threshold:
+            self.counters["skipped_static"] += 1
+            return InferencePlan("skip", reason="static")
+        elif self.target_box is not None:
+            plan = InferencePlan("roi", roi=self._roi(frame.shape), reason="tracking")
+        else:
+            plan = InferencePlan("full", reason="motion")
+
+        self.reference_luma = luma
+        self.last_run = now
+        if plan.kind == "full":
+            self.last_full = now
+            self.counters["executed_full"] += 1
+        else:
+            self.counters["executed_roi"] += 1
+        return plan
+
+    def _roi(self, shape):
+        h, w = shape[:2]
+        x1, y1, x2, y2 = self.target_box
+        bw = max(x2 - x1, 1) * (1 + 2 * self.roi_margin)
+        bh = max(y2 - y1, 1) * (1 + 2 * self.roi_margin)
+        bw = min(max(bw, self.roi_min_size), w)
+        bh = min(max(bh, self.roi_min_size), h)
+        cx = (x1 + x2) / 2
+        cy = (y1 + y2) / 2
+        rx1 = int(min(max(cx - bw / 2, 0), w - bw))
+        ry1 = int(min(max(cy - bh / 2, 0), h - bh))
+        return rx1, ry1, int(rx1 + bw), int(ry1 + bh)
+
+    def update(self, detections):
+        """Feed back detections (frame coordinates) so the next plan can crop around the target."""
+        target = detections.best(self.target_label)
+        self.target_box = None if target is None else tuple(float(v) for v in detections.boxes[target])
+
+    def reset(self):
+        self.reference_luma = None
+        self.target_box = None
+        self.last_full = 0.0
+
+    def stats(self) -> dict:
+        executed = self.counters["executed_full"] + self.counters["executed_roi"]
+        return dict(self.counters, executed=executed, skipped=self.counters["skipped_static"])
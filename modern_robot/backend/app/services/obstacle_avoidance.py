@@ -0,0 +1,223 @@
+import math
+from app.core.config import settings
+
+CRUISE, SCAN, TURN, ESCAPE = "cruise", "scan", "turn", "escape"
+
+def angle_diff(a, b):
+    """Signed smallest difference a - b in radians (-pi..pi]."""
+    return (a - b + math.pi) % (2 * math.pi) - math.pi
+
+class PolarHistogram:
+    """
+    VFH-style polar map around the robot: nearest obstacle distance (cm) per
+    heading sector in the odometry frame. Sectors are forgotten after
+    `memory` seconds, since the estimated heading drifts and the robot moves.
+    Only sectors the front sensor has swept can be chosen as a way out; rear
+    readings just mark obstacles.
+    """
+    def __init__(self, bins: int = 36, memory: float = 3.0):
+        self.bins = bins
+        self.width = 2 * math.pi / bins
+        self.memory = memory
+        self.distance = [None] * bins
+        self.updated = [0.0] * bins
+        self.swept = [0.0] * bins   # last time the front sensor covered the sector
+
+    def index(self, heading):
+        return int(round(heading / self.width)) % self.bins
+
+    def heading_of(self, index):
+        return angle_diff(index * self.width, 0.0)
+
+    def get(self, index, now):
+        if now - self.updated[index] > self.memory:
+            return None
+        return self.distance[index]
+
+    def add(self, heading, distance, now, spread: int = 1, front: bool = True):
+        """Record a reading; the sensor cone also bounds the `spread` sectors on each side."""
+        center = self.index(heading)
+        for offset in range(-spread, spread + 1):
+            i = (center + offset) % self.bins
+            current = self.get(i, now)
+            if offset == 0 or current is None:
+                self.distance[i] = distance
+            else:
+                self.distance[i] = min(current, distance)
+            self.updated[i] = now
+            if front:
+                self.swept[i] = now
+
+    def free_valley(self, now, clear: float, min_width: int = 3):
+        """Heading at the centre of the widest run of front-swept sectors all farther than `clear`, or None."""
+        free = [(d is not None and d >= clear and now - self.swept[i] <= self.memory)
+                for i, d in ((i, self.get(i, now)) for i in range(self.bins))]
+        if all(free):
+            return None # nothing seen yet, or no obstacles anywhere: not a decision
+        best_start, best_len = None, 0
+        # Walk runs starting right after a blocked sector so wrap-around runs stay whole
+        start = next(i for i in range(self.bins) if not free[i]) + 1
+        run_start, run_len = None, 0
+        for k in range(self.bins):
+            i = (start + k) % self.bins
+            if free[i]:
+                if run_start is None:
+                    run_start, run_len = i, 0
+                run_len += 1
+                if run_len > best_len:
+                    best_start, best_len = run_start, run_len
+            else:
+                run_start = None
+        if best_len < min_width:
+            return None
+        return self.heading_of(best_start + (best_len - 1) / 2)
+
+    def farthest(self, now):
+        """(heading, distance) of the most open known sector, or None."""
+        known = [(d, i) for i, d in ((i, self.get(i, now)) for i in range(self.bins)) if d is not None]
+        if not known:
+            return None
+        distance, i = max(known)
+        return self.heading_of(i), distance
+
+class ObstacleAvoidancePlanner:
+    """
+    Reactive obstacle avoidance, one step per sensor update.
+
+    Heading comes from the odometry estimate. Every ultrasonic
+    reading is dropped into a PolarHistogram at the heading it was taken, so
+    the robot keeps sampling while it rotates. States:
+    - cruise: drive forward, slowing down near obstacles; if the range ahead
+              stops shrinking the robot is pressed against something the
+              beam misses (e.g. a wall at a grazing angle), which counts as
+              an obstacle too,
+    - scan:   rotate in place until the histogram shows a free valley,
+    - turn:   rotate to the chosen heading, then cruise again,
+    - escape: back off and spin away from a cliff edge.
+    step() never blocks; the caller drives the returned (x, y).
+    """
+    def __init__(self):
+        self.stop_distance = settings.AVOID_STOP_DISTANCE
+        self.slow_distance = settings.AVOID_SLOW_DISTANCE
+        self.clear_distance = settings.AVOID_CLEAR_DISTANCE
+        self.turn_speed = 0.35
+        self.valley_width = 7        # sectors (70 deg) a way out must span, so its centre clears the edges
+        self.stall_time = 3.0        # s of cruising without the front range changing = blocked
+        self.progress_distance = 5.0 # cm the front range must change by to count as progress
+        self.period = 2 * settings.ULTRASONIC_SLOT_TIME # one round of both sensors
+        self.histogram = PolarHistogram()
+
+        self.heading = 0.0
+        self.state = CRUISE
+        self.state_since = None
+        self.scan_direction = 1  # +1 = counter-clockwise (left)
+        self.scan_turned = 0.0
+        self.goal = None
+        self._last_front = 0.0
+        self._last_rear = 0.0
+        self._progress = None    # (time, front distance) of the last progress while cruising
+
+    def _enter(self, state, now):
+        self.state = state
+        self.state_since = now
+        self._progress = None
+
+    def _rotate(self, direction):
+        # Positive x turns right (clockwise), see MotorController.mix
+        return -direction * self.turn_speed, 0.0
+
+    def step(self, now, front, rear, cliff, heading):
+        """
+        front/rear: (distance cm or None, timestamp) of the latest ultrasonic readings,
+        cliff: any IR sensor active, heading: odometry heading (rad, counter-clockwise).
+        Returns the (x, y) drive command.
+        """
+        if self.state_since is None:
+            self.state_since = now
+        previous_heading = self.heading
+        self.heading = heading
+        if self.state == SCAN:
+            self.scan_turned += abs(angle_diff(self.heading, previous_heading))
+
+        front_dist, front_time = front
+        if front_dist is not None and front_time > self._last_front:
+            self._last_front = front_time
+            self.histogram.add(self.heading, front_dist, now)
+        rear_dist, rear_time = rear
+        if rear_dist is not None and rear_time > self._last_rear:
+            self._last_rear = rear_time
+            self.histogram.add(self.heading + math.pi, rear_dist, now, front=False)
+        # A front sensor that never reported is as unsafe as one that went quiet
+        front_stale = not front_time or now - front_time > settings.SENSOR_MAX_AGE
+
+        if cliff and self.state != ESCAPE:
+            print("Cliff detected! Backing up from edge.")
+            self._enter(ESCAPE, now)
+
+        if self.state == ESCAPE:
+            elapsed = now - self.state_since
+            if elapsed < 0.5:
+                return 0.0, -0.3
+            if elapsed < 1.0:
+                return 0.5, 0.0 # Spin away
+            self._enter(CRUISE, now)
+
+        if front_stale:
+            return 0.0, 0.0 # no recent front reading: hold still until there is one
+
+        if self.state == CRUISE:
+            if front_dist is not None and front_dist < self.stop_distance:
+                print(f"Obstacle detected at {front_dist}cm. Scanning.")
+                self._start_scan(now)
+            elif self._stalled(now, front_dist):
+                print("No progress ahead. Scanning.")
+                # Keep the valley search away from the blocked heading
+                self.histogram.add(self.heading, 0.0, now)
+                self._start_scan(now)
+            elif front_dist is not None and front_dist < self.slow_distance:
+                return 0.0, 0.15
+            else:
+                return 0.0, 0.25
+
+        if self.state == SCAN:
+            goal = self.histogram.free_valley(now, self.clear_distance, self.valley_width)
+            if goal is None and self.scan_turned >= 2 * math.pi:
+                # Full turn without a clear valley: head for the most open sector
+                farthest = self.histogram.farthest(now)
+                goal = farthest[0] if farthest else self.heading + math.pi
+            if goal is not None:
+                print(f"Heading for {math.degrees(goal):.0f} deg")
+                self.goal = goal
+                self._enter(TURN, now)
+            else:
+                return self._rotate(self.scan_direction)
+
+        if self.state == TURN:
+            error = angle_diff(self.goal, self.heading)
+            if abs(error) < math.radians(10):
+                self._enter(CRUISE, now)
+                if front_dist is not None and front_dist < self.stop_distance:
+                    self._start_scan(now)
+                    return self._rotate(self.scan_direction)
+                return 0.0, 0.15
+            return self._rotate(1 if error > 0 else -1)
+
+        return 0.0, 0.0
+
+    def _stalled(self, now, front_dist):
+        """True once the front range has not changed by progress_distance for stall_time while cruising."""
+        if front_dist is None:
+            self._progress = None
+            return False
+        if self._progress is None or abs(front_dist - self._progress[1]) >= self.progress_distance:
+            self._progress = (now, front_dist)
+            return False
+        return now - self._progress[0] > self.stall_time
+
+    def _start_scan(self, now):
+        self.scan_turned = 0.0
+        # Rotate towards the side the histogram remembers as more open
+        left = self.histogram.get(self.histogram.index(self.heading + math.pi / 2), now) or 0
+        right = self.histogram.get(self.histogram.index(self.heading - math.pi / 2), now) or 0
+        self.scan_direction = 1 if left >= right else -1
+        self._enter(SCAN, now)
@@ -0,0 +1,193 @@
+import asyncio
+import copy
+import time
+from collections import deque
+from app.core.config import settings
+
+# Patch value of a removed key (None is a legitimate state value)
+DELETED = object()
+
+def diff_state(old, new):
+    """
+    Nested patch that turns `old` into `new`: changed values, recursing into
+    dicts present on both sides. Removed keys are marked DELETED.
+    """
+    patch = {}
+    for key, value in new.items():
+        if key not in old:
+            patch[key] = value
+        elif isinstance(value, dict) and isinstance(old[key], dict):
+            sub = diff_state(old[key], value)
+            if sub:
+                patch[key] = sub
+        elif old[key] != value:
+            patch[key] = value
+    for key in old:
+        if key not in new:
+            patch[key] = DELETED
+    return patch
+
+def split_deletions(patch, path=()):
+    """Wire form of a patch: (patch without DELETED markers, list of key paths to remove)."""
+    values, deleted = {}, []
+    for key, value in patch.items():
+        if value is DELETED:
+            deleted.append(list(path) + [key])
+        elif isinstance(value, dict):
+            sub, sub_deleted = split_deletions(value, path + (key,))
+            deleted.extend(sub_deleted)
+            if sub or not sub_deleted:
+                values[key] = sub
+        else:
+            values[key] = value
+    return values, deleted
+
+def merge_patch(first, second):
+    """Combine two consecutive patches into one (second wins)."""
+    merged = dict(first)
+    for key, value in second.items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = merge_patch(merged[key], value)
+        else:
+            merged[key] = value
+    return merged
+
+class StatusClient:
+    __slots__ = ("sid", "version", "last_send")
+
+    def __init__(self, sid):
+        self.sid = sid
+        self.version = 0     # last status version this client has
+        self.last_send = 0.0
+
+class StatusPublisher:
+    """
+    Versioned robot status broadcaster.
+
+    publish() only marks the state dirty; a burst of calls within `window`
+    seconds is folded into one new version. Each version stores the patch
+    against the previous one, and every client is sent the merged patch from
+    the version it already has ('status_patch' event), at most `client_max_rate`
+    times per second. Clients that fall behind the patch history, and clients
+    that just connected, get the full snapshot ('status' event) instead.
+    """
+    def __init__(self, emit, get_state, window: float = None, client_max_rate: float = None, history: int = 32):
+        self.emit = emit           # async emit(event, data, to=sid), e.g. sio.emit
+        self.get_state = get_state
+        self.window = window if window is not None else settings.STATUS_COALESCE_WINDOW
+        self.client_max_rate = client_max_rate or settings.STATUS_CLIENT_MAX_RATE
+        self.version = 0
+        self.snapshot = {}
+        self.patches = deque(maxlen=history) # (version, patch against version - 1)
+        self.clients = {}
+        self._dirty = None
+        self._task = None
+        self.stats = {"published": 0, "versions": 0, "patches_sent": 0, "snapshots_sent": 0}
+
+    def _ensure_task(self):
+        if self._task is None:
+            self._dirty = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+
+    async def publish(self, state=None):
+        """Robot.emit_status_callback: note that the state changed. Never blocks on clients."""
+        self._ensure_task()
+        self.stats["published"] += 1
+        self._dirty.set()
+
+    async def add_client(self, sid, **extra):
+        """Register a client and resync it with a full snapshot."""
+        self._ensure_task()
+        self._commit()
+        client = self.clients[sid] = StatusClient(sid)
+        await self._send_snapshot(client, time.monotonic(), **extra)
+
+    def remove_client(self, sid):
+        self.clients.pop(sid, None)
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def _commit(self):
+        """Fold the live state into a new version if anything changed."""
+        snapshot = copy.deepcopy(self.get_state())
+        patch = diff_state(self.snapshot, snapshot)
+        if not patch:
+            return
+        self.version += 1
+        self.snapshot = snapshot
+        self.patches.append((self.version, patch))
+        self.stats["versions"] += 1
+
+    def _patch_since(self, version):
+        """Merged patch from `version` to the current one, or None if history no longer covers it."""
+        if not self.patches or self.patches[0][0] > version + 1:
+            return None
+        merged = {}
+        for patch_version, patch in self.patches:
+            if patch_version > version:
+                merged = merge_patch(merged, patch)
+        return merged
+
+    async def _send_snapshot(self, client, now, **extra):
+        await self.emit('status', dict(extra, version=self.version, robot_state=self.snapshot), to=client.sid)
+        client.version = self.version
+        client.last_send = now
+        self.stats["snapshots_sent"] += 1
+
+    async def _send_due(self):
+        """Send pending versions to clients whose rate limit allows it; returns seconds until the next one does."""
+        now = time.monotonic()
+        interval = 1.0 / self.client_max_rate
+        next_due = None
+        # Clients on the same base version share one merged patch
+        groups = {}
+        for client in list(self.clients.values()):
+            if client.version >= self.version:
+                continue
+            wait = client.last_send + interval - now
+            if wait > 0:
+                next_due = wait if next_due is None else min(next_due, wait)
+                continue
+            groups.setdefault(client.version, []).append(client)
+
+        for base, clients in groups.items():
+            patch = self._patch_since(base)
+            if patch is not None:
+                values, deleted = split_deletions(patch)
+            for client in clients:
+                try:
+                    if patch is None:
+                        await self._send_snapshot(client, now)
+                        continue
+                    await self.emit('status_patch', {"version": self.version, "base": base,
+                                                     "patch": values, "deleted": deleted}, to=client.sid)
+                except Exception as e:
+                    # One failing client must not hold up the others
+                    print(f"Status send to {client.sid} failed: {e}")
+                    continue
+                client.version = self.version
+                client.last_send = now
+                self.stats["patches_sent"] += 1
+        return next_due
+
+    async def _run(self):
+        while True:
+            await self._dirty.wait()
+            # Let the rest of the burst arrive before diffing
+            await asyncio.sleep(self.window)
+            self._dirty.clear()
+            try:
+                self._commit()
+                wait = await self._send_due()
+                # Rate-limited clients get the newest version once they are due again
+                while wait is not None and not self._dirty.is_set():
+                    await asyncio.sleep(wait)
+                    wait = await self._send_due()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # Keep the broadcaster alive; the next publish retries
+                print(f"Status broadcast error: {e}")
@@ -0,0 +1,299 @@
+import glob
+import json
+import math
+import os
+import struct
+import threading
+import time
+from collections import deque
+from app.core import clock
+from app.core.config import settings
+
+# Log file: MAGIC, then a u32-length-prefixed JSON header, then records of
+# RECORD (payload length, clock.monotonic() timestamp, kind) + payload.
+MAGIC = b"RTLM\x01"
+LENGTH = struct.Struct("<I")
+RECORD = struct.Struct("<IdB")
+SIGNAL = struct.Struct("<Bd")   # signal index (header "signals"), value (NaN for None)
+
+KIND_SIGNAL, KIND_COMMAND, KIND_MODE, KIND_KEYFRAME = 1, 2, 3, 4
+KINDS = {KIND_SIGNAL: "signal", KIND_COMMAND: "command", KIND_MODE: "mode", KIND_KEYFRAME: "keyframe"}
+
+SIGNALS = ("ultrasonic_front", "ultrasonic_rear", "infrared", "motor_left", "motor_right", "battery")
+
+class TelemetryRecorder:
+    """
+    Append-only flight recorder for post-mortems.
+
+    record() only appends a tuple to a bounded deque, so callers on the
+    motion, sensor or asyncio threads never wait for the disk; when the
+    writer falls behind the oldest entries are dropped and counted. A
+    background thread packs records, writes them in batches and rotates
+    files at `max_bytes`, keeping the newest `max_files`.
+    """
+    def __init__(self, directory: str = None, max_bytes: int = None, max_files: int = None,
+                 queue_size: int = 20000, flush_interval: float = 0.5):
+        self.directory = directory or settings.TELEMETRY_DIR
+        self.max_bytes = max_bytes or settings.TELEMETRY_MAX_BYTES
+        self.max_files = max_files or settings.TELEMETRY_MAX_FILES
+        self.flush_interval = flush_interval
+        self._queue = deque(maxlen=queue_size)
+        self._signal_index = {name: i for i, name in enumerate(SIGNALS)}
+        self._wake = threading.Event()
+        self._file = None
+        self._file_bytes = 0
+        self._file_seq = 0
+        self.path = None
+        self.stats = {"records": 0, "written_bytes": 0, "dropped": 0, "files": 0}
+        self.is_running = False
+        self._thread = None
+
+    # --- Producers (any thread, never block) ---
+
+    def record(self, kind: int, payload, timestamp: float = None):
+        if not self.is_running:
+            return
+        if len(self._queue) == self._queue.maxlen:
+            self.stats["dropped"] += 1
+        self._queue.append((kind, payload, clock.monotonic() if timestamp is None else timestamp))
+
+    def on_signal(self, name, value, timestamp):
+        """WorldState subscriber: every sensor reading and motor output."""
+        index = self._signal_index.get(name)
+        if index is not None:
+            self.record(KIND_SIGNAL, (index, value), timestamp)
+
+    def command(self, command_data: dict):
+        self.record(KIND_COMMAND, command_data)
+
+    def mode(self, **fields):
+        self.record(KIND_MODE, fields)
+
+    def keyframe(self, frame):
+        """BGR frame (a private copy); JPEG encoding happens on the writer thread."""
+        self.record(KIND_KEYFRAME, frame)
+
+    # --- Writer thread ---
+
+    def start(self):
+        if self.is_running:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        self.is_running = True
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        print(f"Telemetry recording to {self.directory}/")
+
+    def _open(self):
+        self._file_seq += 1
+        name = time.strftime("telemetry-%Y%m%d-%H%M%S") + f"-{self._file_seq:03d}.bin"
+        self.path = os.path.join(self.directory, name)
+        self._file = open(self.path, "wb", buffering=1 << 16)
+        header = json.dumps({"version": 1, "signals": SIGNALS,
+                             "wall_time": time.time(), "monotonic": clock.monotonic()}).encode()
+        self._file.write(MAGIC + LENGTH.pack(len(header)) + header)
+        self._file_bytes = len(MAGIC) + LENGTH.size + len(header)
+        self.stats["files"] += 1
+        # Keep only the newest max_files logs
+        logs = sorted(glob.glob(os.path.join(self.directory, "telemetry-*.bin")))
+        for old in logs[:-self.max_files]:
+            try:
+                os.remove(old)
+            except OSError:
+                pass
+
+    def _pack(self, kind, payload, timestamp):
+        if kind == KIND_SIGNAL:
+            index, value = payload
+            data = SIGNAL.pack(index, math.nan if value is None else float(value))
+        elif kind == KIND_KEYFRAME:
+            import cv2
+            ok, jpeg = cv2.imencode(".jpg", payload, [cv2.IMWRITE_JPEG_QUALITY, 70])
+            if not ok:
+                return b""
+            data = jpeg.tobytes()
+        else:
+            data = json.dumps(payload, default=str).encode()
+        return RECORD.pack(len(data), timestamp, kind) + data
+
+    def _write_batch(self):
+        chunks = []
+        size = 0
+        while self._queue:
+            try:
+                entry = self._queue.popleft()
+            except IndexError:
+                break
+            try:
+                chunk = self._pack(*entry)
+            except Exception as e:
+                print(f"Telemetry: cannot pack {KINDS.get(entry[0])} record: {e}")
+                continue
+            if self._file is None or self._file_bytes + size + len(chunk) > self.max_bytes:
+                if chunks:
+                    self._write(chunks, size)
+                    chunks, size = [], 0
+                if self._file is not None:
+                    self._file.close()
+                self._open()
+            chunks.append(chunk)
+            size += len(chunk)
+            self.stats["records"] += 1
+        if chunks:
+            self._write(chunks, size)
+        if self._file is not None:
+            self._file.flush()
+
+    def _write(self, chunks, size):
+        self._file.write(b"".join(chunks))
+        self._file_bytes += size
+        self.stats["written_bytes"] += size
+
+    def _run(self):
+        while self.is_running:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self._write_batch()
+            except OSError as e:
+                print(f"Telemetry write failed: {e}")
+        self._write_batch()
+
+    def close(self):
+        self.is_running = False
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2.0)
+            self._thread = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def get_stats(self) -> dict:
+        return dict(self.stats, queued=len(self._queue), path=self.path)
+
+def read_log(path):
+    """
+    Yield (timestamp, kind, value) from one log; value is (signal name, value)
+    for signals, a dict for commands and modes, JPEG bytes for keyframes.
+    A record cut short by a crash ends the iteration quietly.
+    """
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not a telemetry log")
+        (length,) = LENGTH.unpack(f.read(LENGTH.size))
+        header = json.loads(f.read(length))
+        signals = header.get("signals", SIGNALS)
+        while True:
+            head = f.read(RECORD.size)
+            if len(head) < RECORD.size:
+                return
+            length, timestamp, kind = RECORD.unpack(head)
+            data = f.read(length)
+            if len(data) < length:
+                return
+            if kind == KIND_SIGNAL:
+                index, value = SIGNAL.unpack(data)
+                yield timestamp, "signal", (signals[index], None if math.isnan(value) else value)
+            elif kind == KIND_KEYFRAME:
+                yield timestamp, "keyframe", data
+            else:
+                yield timestamp, KINDS.get(kind, str(kind)), json.loads(data)
+
+def read_header(path) -> dict:
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not a telemetry log")
+        (length,) = LENGTH.unpack(f.read(LENGTH.size))
+        return json.loads(f.read(length))
+
+def to_rows(paths, keyframe_dir=None):
+    """Flatten logs into dict rows (time relative to the first record); keyframes go to files."""
+    start = None
+    for path in paths:
+        header = read_header(path)
+        for timestamp, kind, value in read_log(path):
+            start = timestamp if start is None else start
+            row = {"t": round(timestamp - start, 4), "wall_time": header["wall_time"] + timestamp - header["monotonic"],
+                   "kind": kind, "name": "", "value": ""}
+            if kind == "signal":
+                row["name"], row["value"] = value
+            elif kind == "keyframe":
+                if keyframe_dir:
+                    os.makedirs(keyframe_dir, exist_ok=True)
+                    row["value"] = os.path.join(keyframe_dir, f"{timestamp:.3f}.jpg")
+                    with open(row["value"], "wb") as f:
+                        f.write(value)
+            else:
+                row["name"] = value.get("command", "") if kind == "command" else value.get("status", "")
+                row["value"] = json.dumps(value)
+            yield row
+
+def replay(paths, step: float = 0.01):
+    """
+    Drive the simulator with the logged motor outputs on a virtual clock and
+    yield (t, x, y, theta, logged front cm, simulated front cm) per step, to
+    compare the recorded ranges with what the map predicts along that path.
+    """
+    from app.sim.clock import VirtualClock
+    from app.sim.simulator import SimMap, Simulator
+
+    virtual = VirtualClock()
+    clock.use(virtual.monotonic)
+    try:
+        sim = Simulator(SimMap.load(settings.SIM_MAP) if settings.SIM_MAP else SimMap.default())
+        records = [(t, value) for path in paths for t, kind, value in read_log(path) if kind == "signal"]
+        if not records:
+            return
+        offset = virtual.now - records[0][0]
+        tracks = [0.0, 0.0]
+        front = None
+        sim.advance_to(virtual.now)
+        for timestamp, (name, value) in records:
+            target = timestamp + offset
+            while virtual.now + step <= target:
+                virtual.advance(step)
+                sim.advance_to(virtual.now)
+                yield (round(virtual.now - offset - records[0][0], 3), *sim.pose, front, round(sim.range("front") * 100, 1))
+            if name in ("motor_left", "motor_right") and value is not None:
+                tracks[name == "motor_right"] = value
+                virtual.now = max(virtual.now, target)
+                sim.set_tracks(*tracks)
+            elif name == "ultrasonic_front":
+                front = value
+    finally:
+        clock.use(None)
+
+if __name__ == "__main__":
+    # Post-mortem tools, e.g.:
+    #   python -m app.services.telemetry dump telemetry/telemetry-*.bin --csv incident.csv --keyframes frames/
+    #   python -m app.services.telemetry replay telemetry/telemetry-20250101-120000-001.bin --csv path.csv
+    import argparse
+    import csv
+    import sys
+    parser = argparse.ArgumentParser(description="Dump or replay telemetry logs")
+    parser.add_argument("action", choices=("dump", "replay"))
+    parser.add_argument("logs", nargs="+")
+    parser.add_argument("--csv", help="write CSV here (default: stdout)")
+    parser.add_argument("--parquet", help="write Parquet here (dump only, needs pandas + pyarrow)")
+    parser.add_argument("--keyframes", help="directory for keyframe JPEGs (dump only)")
+    args = parser.parse_args()
+
+    if args.action == "dump":
+        rows = to_rows(args.logs, args.keyframes)
+        fields = ["t", "wall_time", "kind", "name", "value"]
+    else:
+        fields = ["t", "x", "y", "theta", "logged_front_cm", "sim_front_cm"]
+        rows = (dict(zip(fields, values)) for values in replay(args.logs))
+
+    if args.parquet:
+        import pandas as pd
+        pd.DataFrame(list(rows), columns=fields).to_parquet(args.parquet)
+    else:
+        out = open(args.csv, "w", newline="") if args.csv else sys.stdout
+        writer = csv.DictWriter(out, fieldnames=fields)
+        writer.writeheader()
+        for row in rows:
+            writer.writerow(row)
+        if args.csv:
+            out.close()
@@ -0,0 +1,138 @@
+import threading
+import time
+import numpy as np
+from app.core.config import settings
+
+def iou_matrix(a, b):
+    """Pairwise IoU between N x 4 and M x 4 xyxy box arrays."""
+    if len(a) == 0 or len(b) == 0:
+        return np.zeros((len(a), len(b)), dtype=np.float32)
+    x1 = np.maximum(a[:, None, 0], b[None, :, 0])
+    y1 = np.maximum(a[:, None, 1], b[None, :, 1])
+    x2 = np.minimum(a[:, None, 2], b[None, :, 2])
+    y2 = np.minimum(a[:, None, 3], b[None, :, 3])
+    inter = np.clip(x2 - x1, 0, None) * np.clip(y2 - y1, 0, None)
+    area_a = (a[:, 2] - a[:, 0]) * (a[:, 3] - a[:, 1])
+    area_b = (b[:, 2] - b[:, 0]) * (b[:, 3] - b[:, 1])
+    return inter / np.maximum(area_a[:, None] + area_b[None, :] - inter, 1e-6)
+
+class Track:
+    """
+    One tracked object. Kalman state is (cx, cy, w, h, vx, vy) in pixels and
+    pixels/second: a constant-velocity model on the box centre, static size.
+    """
+    __slots__ = ("id", "class_id", "label", "x", "P", "timestamp", "last_seen", "hits", "confidence")
+
+    def __init__(self, track_id, class_id, label, box, confidence, timestamp):
+        self.id = track_id
+        self.class_id = class_id
+        self.label = label
+        x1, y1, x2, y2 = box
+        self.x = np.array([(x1 + x2) / 2, (y1 + y2) / 2, x2 - x1, y2 - y1, 0.0, 0.0])
+        self.P = np.diag([10.0, 10.0, 10.0, 10.0, 1000.0, 1000.0])
+        self.timestamp = timestamp # time the filter state refers to
+        self.last_seen = timestamp # time of the last matching detection
+        self.hits = 1
+        self.confidence = confidence
+
+    def box_at(self, timestamp):
+        """Predicted xyxy box at `timestamp` without changing the filter state."""
+        dt = max(0.0, timestamp - self.timestamp)
+        cx = self.x[0] + self.x[4] * dt
+        cy = self.x[1] + self.x[5] * dt
+        w, h = self.x[2], self.x[3]
+        return np.array([cx - w / 2, cy - h / 2, cx + w / 2, cy + h / 2])
+
+class BoxTracker:
+    """
+    Propagates detections between detector runs so the controller gets a box
+    at its own rate. Tracks are associated greedily by IoU against their
+    predicted boxes, keep their IDs across frames, and are dropped after
+    `max_age` seconds without a matching detection.
+    """
+    def __init__(self, iou_threshold=0.2, max_age=None, process_noise=200.0, measurement_noise=4.0):
+        self.iou_threshold = iou_threshold
+        self.max_age = max_age or settings.AI_TRACK_MAX_AGE
+        self.process_noise = process_noise
+        self.measurement_noise = measurement_noise
+        self.tracks = []
+        self.next_id = 1
+        self.lock = threading.Lock()
+        self._H = np.hstack([np.eye(4), np.zeros((4, 2))])
+        self._R = np.eye(4) * measurement_noise ** 2
+
+    def _predict(self, track, timestamp):
+        dt = max(0.0, timestamp - track.timestamp)
+        F = np.eye(6)
+        F[0, 4] = F[1, 5] = dt
+        Q = np.diag([dt, dt, dt, dt, 1.0, 1.0]) * self.process_noise * dt
+        track.x = F @ track.x
+        track.P = F @ track.P @ F.T + Q
+        track.timestamp = timestamp
+
+    def _correct(self, track, box, confidence):
+        x1, y1, x2, y2 = box
+        z = np.array([(x1 + x2) / 2, (y1 + y2) / 2, x2 - x1, y2 - y1])
+        S = self._H @ track.P @ self._H.T + self._R
+        K = track.P @ self._H.T @ np.linalg.inv(S)
+        track.x = track.x + K @ (z - self._H @ track.x)
+        track.P = (np.eye(6) - K @ self._H) @ track.P
+        track.hits += 1
+        track.confidence = confidence
+        track.last_seen = track.timestamp
+
+    def update(self, detections, timestamp=None):
+        """Fold in a detector result taken at `timestamp` (frame capture time)."""
+        timestamp = timestamp if timestamp is not None else time.monotonic()
+        with self.lock:
+            for track in self.tracks:
+                self._predict(track, timestamp)
+
+            boxes = detections.boxes
+            predicted = np.array([t.box_at(timestamp) for t in self.tracks]).reshape(-1, 4)
+            ious = iou_matrix(predicted, boxes)
+            # Only associate detections of the same class
+            for i, track in enumerate(self.tracks):
+                ious[i, detections.data[:, 5] != track.class_id] = 0.0
+
+            matched_tracks, matched_dets = set(), set()
+            while ious.size and ious.max() >= self.iou_threshold:
+                i, j = np.unravel_index(np.argmax(ious), ious.shape)
+                self._correct(self.tracks[i], boxes[j], float(detections.data[j, 4]))
+                matched_tracks.add(i)
+                matched_dets.add(j)
+                ious[i, :] = 0.0
+                ious[:, j] = 0.0
+
+            for j in range(len(detections)):
+                if j not in matched_dets:
+                    self.tracks.append(Track(self.next_id, int(detections.data[j, 5]), detections.label(j),
+                                             boxes[j], float(detections.data[j, 4]), timestamp))
+                    self.next_id += 1
+
+            # Unmatched tracks coast on their prediction until they age out
+            self.tracks = [t for t in self.tracks if timestamp - t.last_seen <= self.max_age]
+
+    def predict(self, timestamp=None):
+        """All live tracks as (track_id, label, predicted xyxy box) at `timestamp`."""
+        timestamp = timestamp if timestamp is not None else time.monotonic()
+        with self.lock:
+            return [(t.id, t.label, t.box_at(timestamp)) for t in self.tracks
+                    if timestamp - t.last_seen <= self.max_age]
+
+    def target(self, label, timestamp=None):
+        """
+        (track_id, predicted box) of the preferred track for `label`: the most
+        established one (most hits), which keeps the robot on the same person.
+        """
+        timestamp = timestamp if timestamp is not None else time.monotonic()
+        with self.lock:
+            candidates = [t for t in self.tracks if t.label == label and timestamp - t.last_seen <= self.max_age]
+            if not candidates:
+                return None
+            best = max(candidates, key=lambda t: (t.hits, t.confidence))
+            return best.id, best.box_at(timestamp)
+
+    def reset(self):
+        with self.lock:
+            self.tracks = []
@@ -0,0 +1,128 @@
+"""
+Headless benchmark of the autonomous loops on the simulator, on a virtual clock.
+
+    python -m app.sim.bench line --laps 5
+    python -m app.sim.bench obstacle --duration 3600 --seed 3
+    python -m app.sim.bench line --map arena.json --duration 600 --verbose
+
+Runs Robot._line_tracking_loop / _obstacle_avoidance_loop unchanged against
+the simulated hardware, stepping the motion loop, ultrasonic sampler and
+physics at their real rates on simulated time, and reports completion time
+plus the wall-clock and CPU time the run took. Same seed, same result.
+"""
+import argparse
+import asyncio
+import contextlib
+import math
+import os
+import time
+from app.core import clock
+from app.core.config import settings
+from app.sim.clock import VirtualClock, VirtualTimeLoop
+
+LOOPS = {"line": "_line_tracking_loop", "obstacle": "_obstacle_avoidance_loop"}
+
+async def run(mode, duration, laps=None, distance=None, world_map=None, seed=None):
+    from app.core.robot import Robot
+    from app.sim.simulator import SimMap, Simulator, set_simulator
+
+    sim = Simulator(world_map or SimMap.default(), seed=seed)
+    set_simulator(sim)
+    robot = Robot()
+    await robot.initialize(("motors", "ultrasonic", "infrared", "leds"))
+    drive, ultrasonic = robot.drive, robot.ultrasonic
+    drive.start()
+    robot.is_running = True
+
+    period = 1.0 / drive.rate
+    start = now = clock.monotonic()
+    sim.advance_to(now)
+    next_slot = now
+    result = {"mode": mode, "laps": 0, "lap_times": [], "off_line": 0.0, "min_clearance": float("inf")}
+    off_line_ticks = ticks = 0
+    line_length = sim.map.line_length
+
+    wall_start, cpu_start = time.perf_counter(), time.process_time()
+    task = asyncio.create_task(getattr(robot, LOOPS[mode])())
+    try:
+        while now - start < duration:
+            await asyncio.sleep(period)
+            now = clock.monotonic()
+            sim.advance_to(now)
+            drive.tick(now, period)
+            while next_slot <= now:
+                ultrasonic.sample_next()
+                next_slot += ultrasonic.slot_time
+
+            ticks += 1
+            if sim.ir_state == 0:
+                off_line_ticks += 1
+            if mode == "obstacle":
+                clearance = sim.map.wall_distance(sim.x, sim.y) - sim.BODY_RADIUS
+                result["min_clearance"] = min(result["min_clearance"], clearance)
+            if line_length and int(abs(sim.line_progress) // line_length) > result["laps"]:
+                result["laps"] += 1
+                result["lap_times"].append(round(now - start - sum(result["lap_times"]), 2))
+            if laps and result["laps"] >= laps:
+                break
+            if distance and sim.distance >= distance:
+                break
+            if task.done():
+                break # the loop ended (or crashed) on its own
+    finally:
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        wall = time.perf_counter() - wall_start
+        cpu = time.process_time() - cpu_start
+        drive.close()
+        ultrasonic.close()
+    if task.done() and not task.cancelled() and task.exception():
+        raise task.exception()
+
+    simulated = now - start
+    result.update(simulated_s=round(simulated, 2),
+                  wall_s=round(wall, 3),
+                  cpu_s=round(cpu, 3),
+                  speedup=round(simulated / wall, 1) if wall else None,
+                  distance_m=round(sim.distance, 2),
+                  collisions=sim.collisions,
+                  off_line=round(off_line_ticks / max(ticks, 1), 3),
+                  motion=drive.get_stats()["ticks"])
+    if math.isinf(result["min_clearance"]):
+        result["min_clearance"] = None
+    else:
+        result["min_clearance"] = round(result["min_clearance"], 3)
+    return result
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark autonomous loops on the simulator")
+    parser.add_argument("mode", choices=sorted(LOOPS))
+    parser.add_argument("--duration", type=float, default=600.0, help="simulated seconds (upper bound)")
+    parser.add_argument("--laps", type=int, help="stop after this many laps of the line")
+    parser.add_argument("--distance", type=float, help="stop after driving this many metres")
+    parser.add_argument("--map", help="SimMap JSON (default: built-in arena)")
+    parser.add_argument("--seed", type=int, default=settings.SIM_SEED)
+    parser.add_argument("--verbose", action="store_true", help="show the robot's log output")
+    args = parser.parse_args()
+
+    settings.SIMULATION = True
+    from app.sim.simulator import SimMap
+    world_map = SimMap.load(args.map) if args.map else None
+
+    virtual = VirtualClock()
+    clock.use(virtual.monotonic)
+    loop = VirtualTimeLoop(virtual)
+    try:
+        with contextlib.ExitStack() as stack:
+            if not args.verbose:
+                stack.enter_context(contextlib.redirect_stdout(stack.enter_context(open(os.devnull, "w"))))
+            result = loop.run_until_complete(run(args.mode, args.duration, args.laps, args.distance, world_map, args.seed))
+    finally:
+        loop.close()
+        clock.use(None)
+
+    for key, value in result.items():
+        print(f"{key:>14}: {value}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+import asyncio
+import selectors
+
+class VirtualClock:
+    """Simulated monotonic time; only moves when advance() is called."""
+    def __init__(self, start: float = 1000.0):
+        # Not zero: timestamp 0.0 means "never set" for world-state signals
+        self.now = start
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def advance(self, dt: float):
+        self.now += dt
+
+class _FastForwardSelector:
+    """
+    Selector that never waits for timers: when the event loop would sleep
+    until its next scheduled callback, the virtual clock jumps there instead.
+    Real I/O (e.g. call_soon_threadsafe wakeups) is still polled.
+    """
+    def __init__(self, clock: VirtualClock):
+        self._clock = clock
+        self._selector = selectors.DefaultSelector()
+
+    def select(self, timeout=None):
+        if timeout is None:
+            # Nothing scheduled: only real I/O or another thread can wake the loop
+            return self._selector.select(None)
+        events = self._selector.select(0)
+        if not events and timeout > 0:
+            self._clock.advance(timeout)
+        return events
+
+    def __getattr__(self, name):
+        return getattr(self._selector, name)
+
+class VirtualTimeLoop(asyncio.SelectorEventLoop):
+    """
+    Event loop on a VirtualClock: asyncio.sleep(), wait_for() timeouts and
+    call_later() complete as fast as the CPU allows, in the same order they
+    would in real time. Install the clock with app.core.clock.use() as well,
+    so timestamps taken outside the loop agree with loop.time().
+    """
+    def __init__(self, clock: VirtualClock):
+        super().__init__(_FastForwardSelector(clock))
+        self.clock = clock
+
+    def time(self) -> float:
+        return self.clock.monotonic()
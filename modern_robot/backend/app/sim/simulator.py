@@ -0,0 +1,296 @@
+import json
+import math
+import random
+import threading
+import time
+import numpy as np
+from app.core import clock
+from app.core.config import settings
+
+class SimMap:
+    """
+    Flat world for the simulator, in metres: wall segments (x1, y1, x2, y2),
+    a painted line as a polyline, and the robot start pose (x, y, theta).
+
+    JSON files use the same keys: {"walls": [[x1, y1, x2, y2], ...],
+    "line": [[x, y], ...], "line_width": 0.02, "closed": true, "start": [x, y, theta]}
+    """
+    def __init__(self, walls, line=None, line_width: float = 0.02, closed: bool = True, start=(0.0, 0.0, 0.0)):
+        self.walls = np.asarray(walls, dtype=np.float64).reshape(-1, 4)
+        line = np.asarray(line if line is not None else np.zeros((0, 2)), dtype=np.float64).reshape(-1, 2)
+        if closed and len(line) > 1:
+            line = np.vstack([line, line[:1]])
+        self.line = line
+        self.line_width = line_width
+        self.start = tuple(start)
+        # Line segments and cumulative arc length, for IR hits and progress along the line
+        self._seg_a = line[:-1]
+        self._seg_d = line[1:] - line[:-1]
+        seg_len = np.hypot(self._seg_d[:, 0], self._seg_d[:, 1])
+        self._seg_len2 = np.maximum(seg_len ** 2, 1e-12)
+        self._seg_s = np.concatenate([[0.0], np.cumsum(seg_len)])[:-1]
+        self.line_length = float(seg_len.sum())
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as f:
+            data = json.load(f)
+        return cls(data["walls"], data.get("line"), data.get("line_width", 0.02),
+                   data.get("closed", True), data.get("start", (0.0, 0.0, 0.0)))
+
+    @classmethod
+    def default(cls):
+        """3 x 2 m room, an oval line around a box, and a second box in a corner."""
+        walls = [(0, 0, 3, 0), (3, 0, 3, 2), (3, 2, 0, 2), (0, 2, 0, 0)]
+        for x1, y1, x2, y2 in ((1.3, 0.85, 1.7, 1.15), (2.6, 0.15, 2.85, 0.4)):
+            walls += [(x1, y1, x2, y1), (x2, y1, x2, y2), (x2, y2, x1, y2), (x1, y2, x1, y1)]
+        angles = np.linspace(0, 2 * np.pi, 200, endpoint=False)
+        line = np.stack([1.5 + 1.0 * np.cos(angles), 1.0 + 0.6 * np.sin(angles)], axis=1)
+        return cls(walls, line, start=(2.5, 1.0, math.pi / 2))
+
+    def raycast(self, x, y, heading, max_range):
+        """Distance to the nearest wall along a ray, or None if nothing within max_range."""
+        dx, dy = math.cos(heading), math.sin(heading)
+        ax, ay = self.walls[:, 0], self.walls[:, 1]
+        ex, ey = self.walls[:, 2] - ax, self.walls[:, 3] - ay
+        denom = dx * ey - dy * ex
+        with np.errstate(divide="ignore", invalid="ignore"):
+            t = ((ax - x) * ey - (ay - y) * ex) / denom  # along the ray
+            u = ((ax - x) * dy - (ay - y) * dx) / denom  # along the wall
+        hit = (np.abs(denom) > 1e-12) & (t >= 0) & (u >= 0) & (u <= 1)
+        if not hit.any():
+            return None
+        distance = float(t[hit].min())
+        return distance if distance <= max_range else None
+
+    def wall_distance(self, x, y):
+        """Distance from a point to the nearest wall."""
+        a = self.walls[:, :2]
+        d = self.walls[:, 2:] - a
+        t = np.clip(((x - a[:, 0]) * d[:, 0] + (y - a[:, 1]) * d[:, 1]) / np.maximum((d ** 2).sum(axis=1), 1e-12), 0, 1)
+        return float(np.hypot(a[:, 0] + t * d[:, 0] - x, a[:, 1] + t * d[:, 1] - y).min())
+
+    def project(self, x, y):
+        """(distance to the line, arc length of the closest line point)."""
+        if not len(self._seg_a):
+            return float("inf"), 0.0
+        a, d = self._seg_a, self._seg_d
+        t = np.clip(((x - a[:, 0]) * d[:, 0] + (y - a[:, 1]) * d[:, 1]) / self._seg_len2, 0, 1)
+        dist = np.hypot(a[:, 0] + t * d[:, 0] - x, a[:, 1] + t * d[:, 1] - y)
+        i = int(dist.argmin())
+        return float(dist[i]), float(self._seg_s[i] + t[i] * math.sqrt(self._seg_len2[i]))
+
+class Simulator:
+    """
+    2D kinematic tank in a SimMap, standing in for the motor, ultrasonic,
+    infrared and camera hardware when settings.SIMULATION is on.
+
+    Tracks follow the commanded values with a first-order lag and a stall
+    deadband; the body is a circle that stops at walls. Ultrasonic readings
+    are the nearest of three rays across the sensor cone plus gaussian noise,
+    IR sensors report whether they are over the painted line. Physics is
+    integrated in fixed sub-steps up to the current clock time, so it works
+    on the real clock (a background thread keeps the IR edges flowing) and on
+    a virtual one (the benchmark harness calls advance_to()).
+    """
+    BODY_RADIUS = 0.1        # m
+    SENSOR_OFFSET = 0.1      # m, ultrasonic sensors ahead of / behind the centre
+    CONE = math.radians(15)  # HC-SR04 beam width
+    MAX_RANGE = 3.0          # m
+    IR_AHEAD = 0.09          # m, IR sensor row ahead of the centre
+    IR_SPACING = 0.015       # m between neighbouring IR sensors
+    MOTOR_LAG = 0.05         # s, track speed time constant
+    DEADBAND = 0.1           # track value below which the motors stall
+    STEP = 0.005             # s, physics sub-step
+
+    def __init__(self, world_map: SimMap = None, seed: int = None, noise: float = 0.005):
+        self.map = world_map or SimMap.default()
+        self.random = random.Random(settings.SIM_SEED if seed is None else seed)
+        self.noise = noise # ultrasonic noise, m (1 sigma)
+        self.lock = threading.Lock()
+        self.x, self.y, self.theta = self.map.start
+        self.command = (0.0, 0.0)
+        self.speed = [0.0, 0.0]      # actual track speeds, m/s
+        self.time = None             # clock time the physics has reached
+        self.distance = 0.0          # m driven
+        self.collisions = 0
+        self.in_contact = False
+        self.line_progress = 0.0     # m along the line, unwrapped
+        self._line_s = self.map.project(self.x, self.y)[1]
+        self.ir_state = self._infrared()
+        self._ir_listeners = []
+        self.is_running = False
+        self._thread = None
+
+    # --- Actuators ---
+
+    def set_tracks(self, left: float, right: float):
+        with self.lock:
+            self._advance(clock.monotonic())
+            self.command = (left, right)
+
+    # --- Physics ---
+
+    def _track_speed(self, value):
+        if abs(value) < self.DEADBAND:
+            return 0.0
+        return value * settings.DRIVE_MAX_SPEED
+
+    def _step(self, dt):
+        blend = 1 - math.exp(-dt / self.MOTOR_LAG)
+        for i in (0, 1):
+            self.speed[i] += (self._track_speed(self.command[i]) - self.speed[i]) * blend
+        v = (self.speed[0] + self.speed[1]) / 2
+        w = (self.speed[1] - self.speed[0]) / settings.DRIVE_TRACK_WIDTH
+        self.theta = (self.theta + w * dt) % (2 * math.pi)
+        x = self.x + v * dt * math.cos(self.theta)
+        y = self.y + v * dt * math.sin(self.theta)
+        contact = self.map.wall_distance(x, y) < self.BODY_RADIUS
+        if contact:
+            if not self.in_contact:
+                self.collisions += 1
+        else:
+            self.distance += math.hypot(x - self.x, y - self.y)
+            self.x, self.y = x, y
+        self.in_contact = contact
+
+        # Unwrapped progress along a closed line (positive = towards increasing arc length)
+        _, s = self.map.project(self.x, self.y)
+        length = self.map.line_length
+        if length:
+            delta = s - self._line_s
+            if delta > length / 2:
+                delta -= length
+            elif delta < -length / 2:
+                delta += length
+            self.line_progress += delta
+            self._line_s = s
+
+    def _advance(self, now):
+        if self.time is None:
+            self.time = now
+            return
+        while now - self.time >= self.STEP:
+            self._step(self.STEP)
+            self.time += self.STEP
+
+    def advance_to(self, now: float = None):
+        """Integrate up to `now` (default: the clock) and deliver IR edges."""
+        with self.lock:
+            self._advance(clock.monotonic() if now is None else now)
+            state = self._infrared()
+            changed = state != self.ir_state
+            self.ir_state = state
+        if changed:
+            for listener in self._ir_listeners:
+                listener(state)
+
+    # --- Sensors ---
+
+    def range(self, name: str):
+        """Ultrasonic distance (m) for "front" or "rear", MAX_RANGE if nothing echoes."""
+        with self.lock:
+            self._advance(clock.monotonic())
+            heading = self.theta if name == "front" else self.theta + math.pi
+            sx = self.x + self.SENSOR_OFFSET * math.cos(heading)
+            sy = self.y + self.SENSOR_OFFSET * math.sin(heading)
+            hits = [self.map.raycast(sx, sy, heading + offset, self.MAX_RANGE)
+                    for offset in (-self.CONE / 2, 0.0, self.CONE / 2)]
+            hits = [h for h in hits if h is not None]
+            if not hits:
+                return self.MAX_RANGE
+            return max(0.02, min(hits) + self.random.gauss(0, self.noise))
+
+    def _infrared(self):
+        state = 0
+        c, s = math.cos(self.theta), math.sin(self.theta)
+        for i, lateral in enumerate((self.IR_SPACING, 0.0, -self.IR_SPACING)): # Left, Center, Right
+            px = self.x + self.IR_AHEAD * c - lateral * s
+            py = self.y + self.IR_AHEAD * s + lateral * c
+            if self.map.project(px, py)[0] <= self.map.line_width / 2:
+                state |= 1 << (2 - i)
+        return state
+
+    def add_infrared_listener(self, callback):
+        """Call `callback(state)` with the packed L/C/R bits whenever they change."""
+        self._ir_listeners.append(callback)
+
+    # --- Camera ---
+
+    def render(self, width: int, height: int):
+        """Top-down BGR view of the map with the robot, for the simulated camera."""
+        import cv2
+        frame = np.full((height, width, 3), 230, dtype=np.uint8)
+        bounds = np.concatenate([self.map.walls[:, :2], self.map.walls[:, 2:]])
+        lo, hi = bounds.min(axis=0), bounds.max(axis=0)
+        scale = 0.95 * min(width / max(hi[0] - lo[0], 1e-6), height / max(hi[1] - lo[1], 1e-6))
+        offset = np.array([width, height]) / 2 - (lo + hi) / 2 * [scale, -scale]
+
+        def px(points):
+            return np.round(np.asarray(points) * [scale, -scale] + offset).astype(np.int32)
+
+        if len(self.map.line) > 1:
+            thickness = max(1, int(self.map.line_width * scale))
+            cv2.polylines(frame, [px(self.map.line)], False, (30, 30, 30), thickness)
+        for wall in self.map.walls:
+            cv2.line(frame, tuple(px(wall[:2])), tuple(px(wall[2:])), (60, 60, 160), 2)
+        with self.lock:
+            x, y, theta = self.x, self.y, self.theta
+        center = tuple(px((x, y)))
+        cv2.circle(frame, center, max(2, int(self.BODY_RADIUS * scale)), (40, 160, 40), 2)
+        nose = px((x + self.BODY_RADIUS * math.cos(theta), y + self.BODY_RADIUS * math.sin(theta)))
+        cv2.line(frame, center, tuple(nose), (40, 160, 40), 2)
+        return frame
+
+    # --- Real-time mode ---
+
+    def start(self, rate: float = 200.0):
+        """Step the physics on a thread (real clock only; the harness steps a virtual one)."""
+        if self.is_running or clock.is_virtual():
+            return
+        self.is_running = True
+        self._thread = threading.Thread(target=self._run, args=(1.0 / rate,), daemon=True)
+        self._thread.start()
+        print("Simulator running in real time")
+
+    def _run(self, period):
+        while self.is_running:
+            self.advance_to()
+            time.sleep(period)
+
+    def close(self):
+        self.is_running = False
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+
+    @property
+    def pose(self):
+        return self.x, self.y, self.theta
+
+    def get_stats(self) -> dict:
+        with self.lock:
+            return {"pose": [round(self.x, 3), round(self.y, 3), round(math.degrees(self.theta), 1)],
+                    "distance": round(self.distance, 3),
+                    "collisions": self.collisions,
+                    "line_progress": round(self.line_progress, 3),
+                    "infrared": self.ir_state}
+
+_simulator = None
+_simulator_lock = threading.Lock()
+
+def get_simulator() -> Simulator:
+    """The process-wide simulator the hardware classes attach to (created on first use)."""
+    global _simulator
+    with _simulator_lock:
+        if _simulator is None:
+            world_map = SimMap.load(settings.SIM_MAP) if settings.SIM_MAP else SimMap.default()
+            _simulator = Simulator(world_map)
+            _simulator.start()
+        return _simulator
+
+def set_simulator(simulator: Simulator):
+    """Use `simulator` for hardware created from now on (benchmark harness)."""
+    global _simulator
+    with _simulator_lock:
+        _simulator = simulator
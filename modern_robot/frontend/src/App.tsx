@@ -1,14 +1,50 @@
-import React, { useEffect, useState } from 'react';
+import React, { useEffect, useRef, useState } from 'react';
 import { socket, getRobotIp } from './lib/socket';
 import { Wifi, WifiOff, Gamepad2, Settings as SettingsIcon } from 'lucide-react';
 import Dashboard from './components/Dashboard';
 import SettingsModal from './components/SettingsModal';
 
+// Apply a status patch: nested objects merge, other values (null included) replace
+function mergePatch(state: any, patch: any): any {
+  const merged = { ...(state || {}) };
+  for (const [key, value] of Object.entries(patch)) {
+    if (typeof value === 'object' && value !== null && !Array.isArray(value) && typeof merged[key] === 'object' && merged[key] !== null && !Array.isArray(merged[key])) {
+      merged[key] = mergePatch(merged[key], value);
+    } else {
+      merged[key] = value;
+    }
+  }
+  return merged;
+}
+
+// Remove the key paths listed in a patch's "deleted" field (copying the objects on the way)
+function deletePaths(state: any, paths: string[][]): any {
+  let result = state;
+  for (const path of paths) {
+    const copy = { ...(result || {}) };
+    let node = copy;
+    for (const key of path.slice(0, -1)) {
+      if (typeof node[key] !== 'object' || node[key] === null) {
+        node = null;
+        break;
+      }
+      node[key] = { ...node[key] };
+      node = node[key];
+    }
+    if (node) {
+      delete node[path[path.length - 1]];
+    }
+    result = copy;
+  }
+  return result;
+}
+
 function App() {
   const [isConnected, setIsConnected] = useState(socket.connected);
   const [robotState, setRobotState] = useState<any>(null);
   const [isSettingsOpen, setIsSettingsOpen] = useState(false);
   const [robotIp, setRobotIp] = useState(getRobotIp());
+  const statusVersion = useRef(0);
 
   useEffect(() => {
     function onConnect() {
@@ -20,8 +56,20 @@ function App() {
     }
 
     function onStatus(value: any) {
+       // Full snapshot (on connect or resync)
+       statusVersion.current = value.version ?? 0;
        setRobotState(value.robot_state);
     }
+
+    function onStatusPatch(value: any) {
+       if (value.base !== statusVersion.current) {
+         // Missed an update; ask for a fresh snapshot
+         socket.emit('status_resync');
+         return;
+       }
+       statusVersion.current = value.version;
+       setRobotState((state: any) => mergePatch(deletePaths(state, value.deleted ?? []), value.patch));
+    }
     
     function onRobotResponse(value: any) {
         console.log("Robot Response:", value);
@@ -30,12 +78,14 @@ function App() {
     socket.on('connect', onConnect);
     socket.on('disconnect', onDisconnect);
     socket.on('status', onStatus);
+    socket.on('status_patch', onStatusPatch);
     socket.on('robot_response', onRobotResponse);
 
     return () => {
       socket.off('connect', onConnect);
       socket.off('disconnect', onDisconnect);
       socket.off('status', onStatus);
+      socket.off('status_patch', onStatusPatch);
       socket.off('robot_response', onRobotResponse);
     };
   }, []);
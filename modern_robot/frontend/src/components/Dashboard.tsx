@@ -1,6 +1,7 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useRef } from 'react';
 import { Camera, Zap, Shield, Trash2, UserCheck, RotateCcw, Lightbulb, Footprints, AlertOctagon, ZoomIn, ArrowUp, ArrowDown, ArrowLeft, ArrowRight, X } from 'lucide-react';
 import { Socket } from 'socket.io-client';
+import { ControlChannel } from '../lib/controlChannel';
 
 interface DashboardProps {
   socket: Socket;
@@ -16,19 +17,53 @@ const Dashboard: React.FC<DashboardProps> = ({ socket, robotState, robotIp }) =>
   const [ledMode, setLedMode] = useState("static");
   const [zoomLevel, setZoomLevel] = useState(1.0);
   const [activeKeys, setActiveKeys] = useState<{ [key: string]: boolean }>({});
+  const [controlRtt, setControlRtt] = useState<number | null>(null);
+  const control = useRef<ControlChannel | null>(null);
+  // Move currently held by keys/buttons; resent periodically because the robot's
+  // motion loop stops on its own when moves stop arriving (deadman watchdog)
+  const heldMove = useRef<[number, number] | null>(null);
 
-  const handleMove = (x: number, y: number) => {
+  // Binary control channel for moves; falls back to Socket.IO while it is not open
+  useEffect(() => {
+    const port = localStorage.getItem('robot_port') || '8000';
+    const channel = new ControlChannel(`ws://${robotIp}:${port}/api/control`);
+    channel.connect();
+    control.current = channel;
+    const ping = setInterval(() => {
+      channel.ping();
+      setControlRtt(channel.rttMs);
+    }, 1000);
+    return () => {
+      clearInterval(ping);
+      channel.close();
+      control.current = null;
+    };
+  }, [robotIp]);
+
+  const sendMove = (x: number, y: number) => {
+    if (control.current?.move(x, y)) return;
     socket.emit('control_command', {
         command: 'move',
         params: { x, y }
     });
   };
 
+  useEffect(() => {
+    const resend = setInterval(() => {
+      if (heldMove.current) sendMove(...heldMove.current);
+    }, 100);
+    return () => clearInterval(resend);
+  }, [socket]);
+
+  const handleMove = (x: number, y: number) => {
+    heldMove.current = [x, y];
+    sendMove(x, y);
+  };
+
   const handleStop = () => {
-    socket.emit('control_command', {
-        command: 'move',
-        params: { x: 0, y: 0 }
-    });
+    heldMove.current = null;
+    if (control.current?.stop()) return;
+    sendMove(0, 0);
   };
 
   // Keyboard Control Logic
@@ -43,10 +78,8 @@ const Dashboard: React.FC<DashboardProps> = ({ socket, robotState, robotIp }) =>
         if (keysPressed['ArrowLeft']) x -= 1;
         if (keysPressed['ArrowRight']) x += 1;
         
-        socket.emit('control_command', {
-            command: 'move',
-            params: { x, y }
-        });
+        heldMove.current = (x !== 0 || y !== 0) ? [x, y] : null;
+        sendMove(x, y);
         setActiveKeys({...keysPressed});
     };
 
@@ -195,6 +228,7 @@ const Dashboard: React.FC<DashboardProps> = ({ socket, robotState, robotIp }) =>
              <div className="bg-gray-800/50 rounded-xl p-3">
                 <div className="text-gray-400 text-sm mb-1">Status</div>
                 <div className="text-xl font-bold text-white capitalize">{robotState?.status || 'Offline'}</div>
+                <div className="text-xs text-gray-500 mt-1">Control RTT: {controlRtt !== null ? `${controlRtt.toFixed(0)} ms` : '--'}</div>
             </div>
         </div>
       </div>
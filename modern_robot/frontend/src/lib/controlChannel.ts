@@ -0,0 +1,98 @@
+// Binary joystick channel to /api/control (see backend app/services/control_channel.py).
+// Frames are little-endian (seq uint32, x float32, y float32, flags uint16) = 14 bytes.
+const FRAME_SIZE = 14;
+export const FLAG_ACK = 0x1;
+export const FLAG_STOP = 0x2;
+export const FLAG_PING = 0x4;
+
+export class ControlChannel {
+  private ws: WebSocket | null = null;
+  private seq = 0;
+  private sentAt = new Map<number, number>();
+  private pingSentAt = 0;
+  // Reconnect with exponential backoff until close() is called
+  private wanted = false;
+  private retryMs = 500;
+  private retryTimer: ReturnType<typeof setTimeout> | null = null;
+  rttMs: number | null = null;
+  superseded = 0;
+
+  constructor(private url: string) {}
+
+  connect() {
+    this.wanted = true;
+    this.open();
+  }
+
+  private open() {
+    this.retryTimer = null;
+    const ws = new WebSocket(this.url);
+    ws.binaryType = 'arraybuffer';
+    ws.onopen = () => { this.retryMs = 500; };
+    ws.onmessage = (event) => this.onAck(event.data as ArrayBuffer);
+    ws.onclose = () => {
+      this.sentAt.clear();
+      if (this.ws !== ws || !this.wanted) return;
+      this.ws = null;
+      this.retryTimer = setTimeout(() => this.open(), this.retryMs);
+      this.retryMs = Math.min(this.retryMs * 2, 8000);
+    };
+    this.ws = ws;
+  }
+
+  close() {
+    this.wanted = false;
+    if (this.retryTimer !== null) clearTimeout(this.retryTimer);
+    this.retryTimer = null;
+    this.ws?.close();
+    this.ws = null;
+  }
+
+  get isOpen() {
+    return this.ws?.readyState === WebSocket.OPEN;
+  }
+
+  private send(x: number, y: number, flags: number) {
+    if (!this.ws || this.ws.readyState !== WebSocket.OPEN) return false;
+    // A frame still buffered means the link is congested; the server keeps only the newest anyway
+    const seq = (flags & FLAG_PING) ? 0 : ++this.seq;
+    const view = new DataView(new ArrayBuffer(FRAME_SIZE));
+    view.setUint32(0, seq, true);
+    view.setFloat32(4, x, true);
+    view.setFloat32(8, y, true);
+    view.setUint16(12, flags, true);
+    this.ws.send(view.buffer);
+    if (flags & FLAG_PING) {
+      this.pingSentAt = performance.now();
+    } else {
+      this.sentAt.set(seq, performance.now());
+      if (this.sentAt.size > 256) this.sentAt.delete(this.sentAt.keys().next().value as number);
+    }
+    return true;
+  }
+
+  move(x: number, y: number) {
+    return this.send(x, y, 0);
+  }
+
+  stop() {
+    return this.send(0, 0, FLAG_STOP | FLAG_ACK);
+  }
+
+  ping() {
+    return this.send(0, 0, FLAG_PING);
+  }
+
+  private onAck(data: ArrayBuffer) {
+    const view = new DataView(data);
+    const seq = view.getUint32(0, true);
+    this.superseded = view.getUint32(4, true);
+    const flags = view.getUint16(8, true);
+    const sent = (flags & FLAG_PING) ? this.pingSentAt : this.sentAt.get(seq);
+    if (sent !== undefined) this.rttMs = performance.now() - sent;
+    // Everything up to the acked seq is settled
+    for (const key of this.sentAt.keys()) {
+      if (key <= seq) this.sentAt.delete(key);
+    }
+  }
+}